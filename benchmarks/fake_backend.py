@@ -0,0 +1,193 @@
+"""
+Local stand-in for the code-embedding-ai backend used by the benchmarks
+
+Serves the endpoints FastAPIClient calls with synthetic results whose latency,
+result count and payload size are configurable. Runs uvicorn in a background
+thread so the benchmark's own event loop is not disturbed.
+"""
+import asyncio
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+@dataclass
+class BackendProfile:
+    """가짜 백엔드 응답 특성"""
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    results: int = 10
+    content_chars: int = 400
+    projects: int = 3
+    # 지연 꼬리 재현: slow_fraction 비율의 요청은 slow_ms만큼 추가로 지연
+    slow_fraction: float = 0.0
+    slow_ms: float = 0.0
+    # 유사 코드 검색에서 query_embedding 없이 스니펫을 임베딩하는 비용
+    embed_ms: float = 0.0
+    embedding_dim: int = 384
+
+
+def _content(seed: str, index: int, chars: int) -> str:
+    """chars 길이 정도의 함수 코드 조각 생성"""
+    lines = [f"def {seed}_{index}(items):", "    total = 0"]
+    n = 0
+    while sum(len(line) + 1 for line in lines) < chars:
+        lines.append(f"    total += items[{n}].value  # step {n}")
+        n += 1
+    lines.append("    return total")
+    return "\n".join(lines)
+
+
+def _results(profile: BackendProfile, seed: str, count: int, project_id: Optional[str]) -> List[Dict[str, Any]]:
+    name = "".join(c if c.isalnum() else "_" for c in seed)[:40] or "fn"
+    return [
+        {
+            "chunk_id": f"{project_id or 'proj_0'}:{name}:{i}",
+            "project_id": project_id or "proj_0",
+            "file_path": f"src/module_{i % 7}/file_{i}.py",
+            "content": _content(name, i, profile.content_chars),
+            "similarity": round(0.95 - i * 0.01, 3),
+            "line_start": 10 * i + 1,
+            "line_end": 10 * i + 9,
+            "chunk_type": "function",
+            "name": f"{name}_{i}"
+        }
+        for i in range(count)
+    ]
+
+
+def create_app(profile: BackendProfile) -> Starlette:
+    """프로필에 따라 응답하는 Starlette 앱"""
+
+    async def delay() -> None:
+        latency = profile.latency_ms + random.uniform(-profile.jitter_ms, profile.jitter_ms)
+        if profile.slow_fraction and random.random() < profile.slow_fraction:
+            latency += profile.slow_ms
+        if latency > 0:
+            await asyncio.sleep(latency / 1000.0)
+
+    def project(i: int) -> Dict[str, Any]:
+        return {
+            "id": f"proj_{i}",
+            "name": f"Project {i}",
+            "path": f"/repos/project_{i}",
+            "index_version": "1"
+        }
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    async def semantic(request: Request) -> JSONResponse:
+        body = await request.json()
+        await delay()
+        count = min(int(body.get("top_k", 10)), profile.results)
+        return JSONResponse({"results": _results(profile, body.get("query", ""), count, body.get("project_id"))})
+
+    async def similar(request: Request) -> JSONResponse:
+        body = await request.json()
+        await delay()
+        if body.get("query_embedding") is None and profile.embed_ms > 0:
+            await asyncio.sleep(profile.embed_ms / 1000.0)
+        count = min(int(body.get("top_k", 5)), profile.results)
+        response: Dict[str, Any] = {"results": _results(profile, "similar", count, body.get("project_id"))}
+        if body.get("return_embedding"):
+            rng = random.Random(body.get("code_snippet", ""))
+            response["query_embedding"] = [round(rng.uniform(-1, 1), 6) for _ in range(profile.embedding_dim)]
+        return JSONResponse(response)
+
+    async def metadata(request: Request) -> JSONResponse:
+        filters = await request.json()
+        await delay()
+        count = min(int(request.query_params.get("top_k", 10)), profile.results, 3)
+        results = _results(profile, filters.get("name", "symbol"), count, filters.get("project_id"))
+        for r in results:
+            r["name"] = filters.get("name", r["name"])
+            r["class_name"] = filters.get("class_name")
+        return JSONResponse({"results": results})
+
+    async def projects(request: Request) -> JSONResponse:
+        await delay()
+        return JSONResponse({"projects": [project(i) for i in range(profile.projects)]})
+
+    async def get_project(request: Request) -> JSONResponse:
+        await delay()
+        project_id = request.path_params["project_id"]
+        for i in range(profile.projects):
+            if f"proj_{i}" == project_id:
+                return JSONResponse(project(i))
+        return JSONResponse({"detail": "Project not found"}, status_code=404)
+
+    async def stats(request: Request) -> JSONResponse:
+        await delay()
+        return JSONResponse({
+            "total_chunks": 1000,
+            "total_files": 120,
+            "languages": ["python", "java"],
+            "chunk_types": ["function", "class", "method"]
+        })
+
+    return Starlette(routes=[
+        Route("/health", health),
+        Route("/search/semantic", semantic, methods=["POST"]),
+        Route("/search/similar-code", similar, methods=["POST"]),
+        Route("/search/metadata", metadata, methods=["POST"]),
+        Route("/projects/", projects),
+        Route("/projects/{project_id}", get_project),
+        Route("/projects/{project_id}/stats", stats),
+    ])
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeBackend:
+    """백그라운드 스레드에서 uvicorn으로 가짜 백엔드 실행 (컨텍스트 매니저)"""
+
+    def __init__(self, profile: Optional[BackendProfile] = None, port: Optional[int] = None):
+        self.profile = profile or BackendProfile()
+        self.port = port or _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(
+            create_app(self.profile),
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            access_log=False
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "FakeBackend":
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake backend failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakeBackend":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
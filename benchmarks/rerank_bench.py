@@ -0,0 +1,80 @@
+"""
+Benchmark the local re-ranking stage on a synthetic over-fetch
+
+Builds `--candidates` result chunks of roughly `--chunk-chars` characters and
+times `rerank_results` over them, the work `search_code` does per call when
+`rerank` is enabled.
+
+Usage:
+    python -m benchmarks.rerank_bench --candidates 500 --chunk-chars 1000
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from src.rerank import rerank_results
+
+_WORDS = [
+    "def", "return", "self", "if", "None", "for", "in", "range", "items", "value", "key",
+    "config", "logger", "cache", "get_user_by_id", "UserRepository", "fetchAll", "request"
+]
+
+
+def make_candidates(count: int, chunk_chars: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """유사도 내림차순의 가짜 검색 결과"""
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(count):
+        lines, size = [], 0
+        while size < chunk_chars:
+            line = "    " + " ".join(rng.choices(_WORDS, k=8))
+            lines.append(line)
+            size += len(line) + 1
+        candidates.append({
+            "file_path": f"src/module_{i}.py",
+            "content": "\n".join(lines),
+            "similarity": round(0.95 - i * 0.25 / count, 4)
+        })
+    return candidates
+
+
+def run_benchmark(
+    candidates: int = 500,
+    chunk_chars: int = 1000,
+    runs: int = 50,
+    query: str = "get user by id from UserRepository"
+) -> Dict[str, float]:
+    results = make_candidates(candidates, chunk_chars)
+    rerank_results(results, query)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        rerank_results(results, query, top_k=10)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "candidates": candidates,
+        "chunk_chars": chunk_chars,
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark local re-ranking of search results")
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(candidates=args.candidates, chunk_chars=args.chunk_chars, runs=args.runs)
+    print(
+        f"{report['candidates']} candidates x ~{report['chunk_chars']} chars: "
+        f"median {report['median_ms']} ms, p95 {report['p95_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
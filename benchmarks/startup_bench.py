@@ -0,0 +1,125 @@
+"""
+Benchmark MCP server cold start: spawn to initialize response over stdio
+
+Spawns `python -m src.server` repeatedly and measures how long a client waits
+for the `initialize` response and for the first `list_tools`, plus the bare
+`import src.server` time in a fresh interpreter. No backend is needed: the
+handshake and tool listing never call it.
+
+Usage:
+    python -m benchmarks.startup_bench --runs 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.stdio_bench import _write_config
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 새 인터프리터에서 src.server import 시간(초)을 출력하는 스크립트
+_IMPORT_SCRIPT = "import time; t = time.perf_counter(); import src.server; print(time.perf_counter() - t)"
+
+
+def _import_seconds(env: Dict[str, str]) -> float:
+    """새 프로세스에서 src.server import에 걸린 시간"""
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SCRIPT],
+        cwd=str(ROOT), env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def _handshake_seconds(params: StdioServerParameters) -> tuple:
+    """서버 프로세스 시작 → (initialize 응답, 첫 list_tools 응답)까지 걸린 시간"""
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                initialized = time.perf_counter() - start
+                await session.list_tools()
+                listed = time.perf_counter() - start
+    return initialized, listed
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 1),
+        "min_ms": round(ordered[0] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1)
+    }
+
+
+async def run_benchmark(runs: int = 10) -> Dict[str, Any]:
+    """runs번 서버를 새로 띄워 시작 시간 측정
+
+    Returns:
+        {"runs", "import", "initialize", "list_tools"} 항목별 median/min/max (ms)
+    """
+    imports: List[float] = []
+    initializes: List[float] = []
+    listings: List[float] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 연결할 수 없는 백엔드 주소 - 핸드셰이크 경로에서 백엔드를 호출하지 않는지도 확인됨
+        config_path = _write_config(["http://127.0.0.1:9"], tmp)
+        env = {**os.environ, "PYTHONPATH": str(ROOT), "CODE_AGENT_MCP_CONFIG": config_path}
+        params = StdioServerParameters(command=sys.executable, args=["-m", "src.server"], cwd=str(ROOT), env=env)
+
+        for _ in range(runs):
+            imports.append(_import_seconds(env))
+            initialized, listed = await _handshake_seconds(params)
+            initializes.append(initialized)
+            listings.append(listed)
+
+    return {
+        "runs": runs,
+        "import": _summary(imports),
+        "initialize": _summary(initializes),
+        "list_tools": _summary(listings)
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """시작 시간 결과 표"""
+    header = f"{'phase':<28} {'median ms':>10} {'min ms':>9} {'max ms':>9}"
+    lines = [header, "-" * len(header)]
+    for phase, label in (
+        ("import", "import src.server"),
+        ("initialize", "spawn -> initialize"),
+        ("list_tools", "spawn -> first list_tools")
+    ):
+        s = report[phase]
+        lines.append(f"{label:<28} {s['median_ms']:>10} {s['min_ms']:>9} {s['max_ms']:>9}")
+    lines.append(f"\n{report['runs']} runs")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark MCP server cold start over stdio")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_benchmark(runs=args.runs))
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Benchmark the MCP server hot paths over real stdio against a fake backend
+
+Starts the fake backend, launches `python -m src.server` as a subprocess with a
+temporary config pointing at it, and drives call_tool / get_prompt /
+read_resource at increasing concurrency. Reports throughput, latency
+percentiles and the server's peak RSS.
+
+Usage:
+    python -m benchmarks.stdio_bench --concurrency 1 4 16 --requests 50
+    python -m benchmarks.stdio_bench --replicas 2 --slow-fraction 0.05 --slow-ms 500 --hedge-percentile 95
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.fake_backend import BackendProfile, FakeBackend
+from src.config import MCPConfig
+from src.metrics import Histogram, LATENCY_BUCKETS
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 벤치마크 시나리오 이름 (기본값: 전체)
+SCENARIOS = (
+    "search_code",
+    "find_similar_code",
+    "get_function_implementation",
+    "prompt:code-review",
+    "resource:project_stats"
+)
+
+
+@dataclass
+class ScenarioResult:
+    """시나리오 × 동시성 수준 하나의 측정 결과"""
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+
+
+def _write_config(api_urls: List[str], directory: str, overrides: Optional[Dict[str, Any]] = None) -> str:
+    """가짜 백엔드(첫 번째 외에는 레플리카)를 가리키고 영속 상태(디스크 캐시, 심볼 스냅샷)를 끈 임시 설정 파일"""
+    data = MCPConfig.from_file().to_dict()
+    data["api"].update(base_url=api_urls[0], replicas=api_urls[1:], disk_cache_dir="")
+    data["tools"].update(symbol_index_path="", metrics_prometheus_path="", resources_poll_interval=0)
+    data["logging"]["level"] = "WARNING"
+    for section, values in (overrides or {}).items():
+        data.setdefault(section, {}).update(values)
+
+    path = os.path.join(directory, "mcp_config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def _request_factory(session: ClientSession, scenario: str) -> Callable[[int], Awaitable[bool]]:
+    """시나리오별 요청 함수 (i: 요청 번호, 캐시를 피하도록 인자에 반영). 성공 여부 반환"""
+
+    async def call_tool(name: str, arguments: Dict[str, Any]) -> bool:
+        result = await session.call_tool(name, arguments)
+        text = result.content[0].text if result.content else ""
+        return not result.isError and not text.startswith(("Error executing tool", f"Tool '{name}' timed out"))
+
+    if scenario == "search_code":
+        return lambda i: call_tool("search_code", {"query": f"parse configuration file {i}", "top_k": 10})
+    if scenario == "find_similar_code":
+        return lambda i: call_tool("find_similar_code", {
+            "code_snippet": f"def total_{i}(items):\n    return sum(x.value for x in items)",
+            "language": "python"
+        })
+    if scenario == "get_function_implementation":
+        return lambda i: call_tool("get_function_implementation", {"function_name": f"handler_{i}"})
+    if scenario == "prompt:code-review":
+        async def prompt(i: int) -> bool:
+            result = await session.get_prompt("code-review", {"code_query": f"authentication flow {i}"})
+            return bool(result.messages)
+        return prompt
+    if scenario == "resource:project_stats":
+        async def resource(i: int) -> bool:
+            result = await session.read_resource(f"project://proj_{i % 3}/stats")
+            return bool(result.contents)
+        return resource
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def _run_level(
+    request: Callable[[int], Awaitable[bool]],
+    counter: "itertools.count[int]",
+    concurrency: int,
+    requests: int
+) -> tuple:
+    """동시성 concurrency로 requests개 요청 실행 → (지연 히스토그램, 오류 수, 소요 시간)"""
+    latencies = Histogram(LATENCY_BUCKETS, window=max(requests, 1))
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await request(next(counter))
+            except Exception:
+                ok = False
+            latencies.observe(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+
+async def run_benchmark(
+    scenarios: tuple = SCENARIOS,
+    concurrency_levels: tuple = (1, 4, 16),
+    requests: int = 50,
+    profile: Optional[BackendProfile] = None,
+    config_overrides: Optional[Dict[str, Any]] = None,
+    replicas: int = 1
+) -> Dict[str, Any]:
+    """가짜 백엔드(replicas개) + stdio 서버 프로세스로 벤치마크 실행
+
+    Returns:
+        {"profile", "results": [ScenarioResult...], "server": server_metrics 스냅샷}
+    """
+    profile = profile or BackendProfile()
+    results: List[ScenarioResult] = []
+    counter = itertools.count()
+
+    with ExitStack() as stack:
+        backends = [stack.enter_context(FakeBackend(profile)) for _ in range(max(1, replicas))]
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        config_path = _write_config([backend.url for backend in backends], tmp, config_overrides)
+        params = StdioServerParameters(
+            command=sys.executable,
+            args=["-m", "src.server"],
+            cwd=str(ROOT),
+            env={**os.environ, "PYTHONPATH": str(ROOT), "CODE_AGENT_MCP_CONFIG": config_path}
+        )
+        async with stdio_client(params, errlog=sys.stderr) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                # 프로젝트 목록 조회로 서버 워밍업 (첫 요청의 연결 수립 비용 제외)
+                await session.call_tool("list_projects", {})
+
+                for scenario in scenarios:
+                    request = _request_factory(session, scenario)
+                    for concurrency in concurrency_levels:
+                        latencies, errors, seconds = await _run_level(request, counter, concurrency, requests)
+                        results.append(ScenarioResult(
+                            scenario=scenario,
+                            concurrency=concurrency,
+                            requests=requests,
+                            errors=errors,
+                            seconds=round(seconds, 3),
+                            throughput=round(requests / seconds, 1) if seconds else 0.0,
+                            p50_ms=_ms(latencies.percentile(50)),
+                            p95_ms=_ms(latencies.percentile(95)),
+                            p99_ms=_ms(latencies.percentile(99))
+                        ))
+
+                metrics_result = await session.call_tool("server_metrics", {})
+                server_metrics = json.loads(metrics_result.content[0].text)
+
+    return {
+        "profile": asdict(profile),
+        "results": [asdict(r) for r in results],
+        "server": server_metrics
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """벤치마크 결과 표"""
+    header = f"{'scenario':<30} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    lines = [header, "-" * len(header)]
+    for r in report["results"]:
+        lines.append(
+            f"{r['scenario']:<30} {r['concurrency']:>5} {r['throughput']:>9} "
+            f"{r['p50_ms']!s:>9} {r['p95_ms']!s:>9} {r['p99_ms']!s:>9} {r['errors']:>7}"
+        )
+    process = report["server"].get("process", {})
+    if process.get("max_rss_bytes"):
+        lines.append(f"\nServer peak RSS: {process['max_rss_bytes'] / (1024 * 1024):.1f} MiB")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the MCP server over stdio against a fake backend")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario and concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Backend latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--results", type=int, default=10, help="Results returned per search")
+    parser.add_argument("--content-chars", type=int, default=400, help="Approximate size of each result's content")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Fraction of backend requests that are slow")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="Extra latency of a slow backend request")
+    parser.add_argument("--embed-ms", type=float, default=0.0, help="Backend cost of embedding a similar-code snippet")
+    parser.add_argument("--replicas", type=int, default=1, help="Number of fake backend replicas")
+    parser.add_argument("--hedge-percentile", type=float, default=0.0, help="api.hedge_percentile (0 disables)")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report to this file")
+    args = parser.parse_args(argv)
+
+    profile = BackendProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        results=args.results,
+        content_chars=args.content_chars,
+        slow_fraction=args.slow_fraction,
+        slow_ms=args.slow_ms,
+        embed_ms=args.embed_ms
+    )
+    report = asyncio.run(run_benchmark(
+        scenarios=tuple(args.scenarios),
+        concurrency_levels=tuple(args.concurrency),
+        requests=args.requests,
+        profile=profile,
+        config_overrides={"api": {"hedge_percentile": args.hedge_percentile}},
+        replicas=args.replicas
+    ))
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
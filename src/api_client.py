@@ -1,19 +1,329 @@
 """
 FastAPI client for communicating with code-embedding-ai server
 """
+import asyncio
+import hashlib
+import textwrap
+import time
 import httpx
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import structlog
+from .cache import DiskCache, TTLCache
+from .config import APIConfig
+from .metrics import Histogram, LATENCY_BUCKETS, metrics
+from .projects import project_version
+from .replicas import Replica, ReplicaSet
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, is_backend_failure
+from .singleflight import SingleFlight
+from .streaming import iter_json_array
 
 logger = structlog.get_logger(__name__)
 
 
+# 백엔드가 모르는 요청 필드(return_embedding/query_embedding)를 거부할 때의 상태 코드
+EMBEDDING_REJECTED_STATUSES = (400, 422)
+
+# 헤징 대상 엔드포인트 (조회 전용이고 지연 꼬리가 긴 검색 호출)
+HEDGED_ENDPOINTS = ("/search/semantic", "/search/similar-code", "/search/metadata")
+
+# 헤징 지연을 정하기 전에 필요한 최소 지연 표본 수
+HEDGE_MIN_SAMPLES = 20
+
+
+def snippet_key(code_snippet: str, language: str) -> str:
+    """임베딩 캐시 키 (언어 + 줄바꿈/줄 끝 공백/공통 들여쓰기/앞뒤 빈 줄을 정규화한 스니펫의 해시)"""
+    text = textwrap.dedent(code_snippet.replace("\r\n", "\n")).strip("\n")
+    normalized = "\n".join(line.rstrip() for line in text.split("\n"))
+    return hashlib.sha256(f"{language.lower()}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def _content_length(response: httpx.Response) -> Optional[int]:
+    """응답 본문 크기 (바이트, 알 수 없으면 None)"""
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, (bytes, bytearray)) else None
+
+
 class FastAPIClient:
     """FastAPI 서버와 통신하는 클라이언트"""
 
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        config: Optional[APIConfig] = None
+    ):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.config = config or APIConfig(base_url=base_url)
+        # httpx 클라이언트는 첫 백엔드 호출 때 생성 (생성 시 httpcore/SSL 초기화 비용이 큼)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.search_cache = TTLCache(
+            ttl=self.config.cache_ttl,
+            max_entries=self.config.cache_max_entries,
+            max_bytes=self.config.cache_max_bytes
+        )
+        # 서버 재시작 후에도 유지되는 디스크 캐시 (설정된 경우)
+        self.disk_cache = None
+        if self.config.disk_cache_dir:
+            self.disk_cache = DiskCache(
+                self.config.disk_cache_dir,
+                max_bytes=self.config.disk_cache_max_bytes,
+                ttl=self.config.disk_cache_ttl
+            )
+        # 유사 코드 검색 스니펫의 질의 임베딩 (정규화한 스니펫 해시 → 벡터)
+        self.embedding_cache = TTLCache(
+            ttl=self.config.embedding_cache_ttl,
+            max_entries=self.config.embedding_cache_max_entries,
+            max_bytes=self.config.embedding_cache_max_bytes
+        )
+        # 백엔드가 return_embedding/query_embedding 필드를 거부하면 False로 바꾸고 더 보내지 않음
+        self.embedding_protocol = True
+        # 마지막으로 확인한 프로젝트별 인덱싱 버전
+        self.project_versions: Dict[str, Optional[str]] = {}
+        # 전체 프로젝트 목록으로 버전을 확인했는지 (전체 검색의 디스크 캐시 사용 조건)
+        self.projects_synced = False
+        # 동시에 들어온 동일 요청은 하나의 백엔드 호출로 합침
+        self.inflight = SingleFlight()
+        # 일시적 오류 재시도 정책과 엔드포인트별 circuit breaker
+        self.retry_policy = RetryPolicy(
+            max_retries=self.config.max_retries,
+            base_delay=self.config.retry_backoff_base,
+            max_delay=self.config.retry_backoff_max
+        )
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # 같은 인덱스를 서빙하는 레플리카 집합 (base_url + api.replicas)
+        self.replicas = ReplicaSet([base_url, *self.config.replicas])
+        # 엔드포인트별 최근 응답 지연 (헤징 지연 계산용)
+        self.latencies: Dict[str, Histogram] = {}
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """백엔드 httpx 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None:
+            self._client = self._create_http_client(self.config)
+        return self._client
+
+    @client.setter
+    def client(self, value: httpx.AsyncClient) -> None:
+        self._client = value
+
+    @staticmethod
+    def _create_http_client(config: APIConfig) -> httpx.AsyncClient:
+        """설정에 맞는 커넥션 풀/타임아웃으로 httpx 클라이언트 생성"""
+        http2 = config.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                config.timeout,
+                connect=config.connect_timeout,
+                read=config.read_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            http2=http2
+        )
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=self.config.circuit_failure_threshold,
+                reset_timeout=self.config.circuit_reset_timeout
+            )
+            self.breakers[endpoint] = breaker
+        return breaker
+
+    @staticmethod
+    def _record_outcome(breaker: CircuitBreaker, error: Optional[BaseException]) -> None:
+        """요청 결과를 circuit breaker에 반영"""
+        if error is None or isinstance(error, httpx.HTTPStatusError) and not is_backend_failure(error):
+            # 4xx는 백엔드가 살아있다는 뜻
+            breaker.record_success()
+        elif is_backend_failure(error):
+            breaker.record_failure()
+        else:
+            breaker.release()
+
+    def _breaker_key(self, replica: Replica, endpoint: str) -> str:
+        """circuit breaker 구분 키 (레플리카가 여럿이면 레플리카별로 분리)"""
+        if len(self.replicas) == 1:
+            return endpoint
+        return f"{replica.base_url}{endpoint}"
+
+    def _pick_replica(self, endpoint: str, exclude: tuple = ()) -> Optional[Replica]:
+        """회로가 열리지 않은 레플리카 중 진행 중인 요청이 가장 적은 것"""
+        return self.replicas.pick(
+            exclude,
+            available=lambda r: self._breaker(self._breaker_key(r, endpoint)).available()
+        )
+
+    def _circuit_open(self, endpoint: str) -> CircuitOpenError:
+        retry_after = min(
+            self._breaker(self._breaker_key(r, endpoint)).retry_after() for r in self.replicas.replicas
+        )
+        return CircuitOpenError(endpoint, retry_after)
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        """헤징 요청을 보내기까지 기다릴 시간 (헤징하지 않으면 None)
+
+        최근 지연의 hedge_percentile 백분위수를 쓰므로 느린 꼬리 요청만 중복된다.
+        표본이 충분히 쌓이기 전에는 헤징하지 않는다.
+        """
+        if (
+            self.config.hedge_percentile <= 0
+            or endpoint not in HEDGED_ENDPOINTS
+            or len(self.replicas) < 2
+        ):
+            return None
+        latencies = self.latencies.get(endpoint)
+        if latencies is None or latencies.count < HEDGE_MIN_SAMPLES:
+            return None
+        return max(self.config.hedge_min_delay, latencies.percentile(self.config.hedge_percentile))
+
+    def _observe_latency(self, endpoint: str, seconds: float) -> None:
+        latencies = self.latencies.get(endpoint)
+        if latencies is None:
+            latencies = self.latencies[endpoint] = Histogram(LATENCY_BUCKETS, window=256)
+        latencies.observe(seconds)
+
+    async def _send(self, replica: Replica, method: str, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        """레플리카 하나에 요청 한 번 (outstanding 카운트와 circuit breaker 반영)"""
+        breaker = self._breaker(self._breaker_key(replica, endpoint))
+        if not breaker.allow():
+            raise self._circuit_open(endpoint)
+        start = time.perf_counter()
+        with self.replicas.acquire(replica):
+            try:
+                with metrics.track("backend", endpoint) as span:
+                    response = await getattr(self.client, method)(f"{replica.base_url}{path}", **kwargs)
+                    response.raise_for_status()
+                    span.response_bytes = _content_length(response)
+            except BaseException as e:
+                self._record_outcome(breaker, e)
+                raise
+        self._record_outcome(breaker, None)
+        self._observe_latency(endpoint, time.perf_counter() - start)
+        return response
+
+    async def _hedged_send(self, method: str, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        """첫 요청이 지연 백분위수를 넘기면 다른 레플리카에 중복 요청을 보내 먼저 성공한 응답 사용
+
+        진 쪽 요청은 취소한다. 한쪽이 실패해도 다른 쪽이 성공하면 그 응답을 쓴다.
+        """
+        primary = self._pick_replica(endpoint)
+        if primary is None:
+            raise self._circuit_open(endpoint)
+        delay = self._hedge_delay(endpoint)
+        if delay is None:
+            return await self._send(primary, method, endpoint, path, **kwargs)
+
+        first = asyncio.ensure_future(self._send(primary, method, endpoint, path, **kwargs))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                secondary = self._pick_replica(endpoint, exclude=(primary,))
+                if secondary is not None:
+                    self.hedged_requests += 1
+                    tasks.add(asyncio.ensure_future(self._send(secondary, method, endpoint, path, **kwargs)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # 함께 끝난 진 쪽 요청의 예외가 "never retrieved" 경고로 남지 않도록 소비
+                    task.exception()
+
+    async def _request(self, method: str, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        """재시도, circuit breaker, 레플리카 분산/헤징을 적용한 백엔드 요청
+
+        모든 백엔드 엔드포인트는 조회 전용(멱등)이므로 연결 오류, 타임아웃, 429/502/503/504는
+        지수 백오프로 재시도한다. endpoint는 circuit breaker 구분에 쓰는 경로 템플릿이다.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged_send(method, endpoint, path, **kwargs)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    raise
+                delay = self.retry_policy.delay(attempt, e)
+                logger.warning(
+                    "Backend request failed, retrying",
+                    endpoint=endpoint, attempt=attempt + 1, delay=round(delay, 3), error=str(e)
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def circuit_states(self) -> Dict[str, str]:
+        """엔드포인트별 circuit breaker 상태"""
+        return {endpoint: breaker.state for endpoint, breaker in self.breakers.items()}
+
+    def _disk_versioned(self, project_id: Optional[str]) -> bool:
+        """디스크 캐시를 써도 되는지 - 이 프로세스가 프로젝트 인덱싱 버전을 확인한 뒤에만 사용
+
+        재시작 후 버전을 확인하기 전에는 그 사이 재인덱싱된 프로젝트의 오래된 항목일 수 있다.
+        전체 검색(project_id 없음)은 전체 프로젝트 목록으로 버전을 확인했고 버전을 모르는
+        프로젝트가 없을 때만 사용한다.
+        """
+        if self.disk_cache is None:
+            return False
+        if project_id is None:
+            return self.projects_synced and all(v is not None for v in self.project_versions.values())
+        return self.project_versions.get(project_id) is not None
+
+    def _cache_get(self, key: tuple, project_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """메모리 → 디스크 순으로 검색 캐시 조회 (디스크 hit은 메모리로 승격)"""
+        cached = self.search_cache.get(key)
+        if cached is None and self._disk_versioned(project_id):
+            cached = self.disk_cache.get(key)
+            if cached is not None:
+                self.search_cache.set(key, cached)
+        return cached
+
+    def _cache_set(self, key: tuple, value: Dict[str, Any], project_id: Optional[str]) -> None:
+        """메모리 캐시와 (버전을 확인한 프로젝트면) 디스크 캐시에 저장"""
+        self.search_cache.set(key, value)
+        if self._disk_versioned(project_id):
+            self.disk_cache.set(key, value, project_id=project_id)
+
+    def _record_versions(self, projects: List[Dict[str, Any]]) -> None:
+        """프로젝트 인덱싱 버전 기록 (바뀐 프로젝트의 캐시 폐기)"""
+        for project in projects:
+            project_id = project.get("id")
+            if not project_id:
+                continue
+            version = project_version(project)
+            changed = self.project_versions.get(project_id, version) != version
+            self.project_versions[project_id] = version
+            if self.disk_cache is not None:
+                changed = self.disk_cache.sync_version(project_id, version) or changed
+            if changed:
+                # 재인덱싱된 프로젝트 - 메모리 검색 캐시는 프로젝트 구분 없이 비움
+                self.search_cache.clear()
 
     async def search_semantic(
         self,
@@ -22,23 +332,142 @@ class FastAPIClient:
         top_k: int = 10,
         min_similarity: float = 0.7
     ) -> Dict[str, Any]:
-        """시맨틱 검색"""
+        """시맨틱 검색 (동일 쿼리는 TTL 동안 캐시에서 반환)"""
+        # 공백 차이만 있는 쿼리는 같은 캐시 항목을 사용
+        cache_key = ("search_semantic", " ".join(query.split()), project_id, top_k, min_similarity)
+        cached = self._cache_get(cache_key, project_id)
+        if cached is not None:
+            return cached
+
+        async def fetch() -> Dict[str, Any]:
+            try:
+                response = await self._request(
+                    "post", "/search/semantic", "/search/semantic",
+                    json={
+                        "query": query,
+                        "project_id": project_id,
+                        "top_k": top_k,
+                        "min_similarity": min_similarity,
+                        "include_content": True
+                    }
+                )
+                result = response.json()
+            except Exception as e:
+                logger.error("Semantic search failed", error=str(e))
+                raise
+
+            self._cache_set(cache_key, result, project_id)
+            return result
+
+        return await self.inflight.do(cache_key, fetch)
+
+    async def search_semantic_stream(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        top_k: int = 10,
+        min_similarity: float = 0.7
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """시맨틱 검색 결과를 응답 본문이 도착하는 대로 하나씩 반환
+
+        전체 응답을 받은 뒤에는 search_semantic과 같은 캐시에 저장한다.
+        """
+        cache_key = ("search_semantic", " ".join(query.split()), project_id, top_k, min_similarity)
+        cached = self._cache_get(cache_key, project_id)
+        if cached is not None:
+            for r in cached.get("results") or []:
+                yield r
+            return
+
+        # 첫 결과를 내보내기 전까지만 재시도 (이미 전달한 결과는 되돌릴 수 없음)
+        results = []
+        attempt = 0
+        while True:
+            replica = self._pick_replica("/search/semantic")
+            breaker = self._breaker(self._breaker_key(replica, "/search/semantic")) if replica else None
+            if breaker is None or not breaker.allow():
+                raise self._circuit_open("/search/semantic")
+            try:
+                with self.replicas.acquire(replica), metrics.track("backend", "/search/semantic#stream") as span:
+                    async with self.client.stream(
+                        "POST",
+                        f"{replica.base_url}/search/semantic",
+                        json={
+                            "query": query,
+                            "project_id": project_id,
+                            "top_k": top_k,
+                            "min_similarity": min_similarity,
+                            "include_content": True
+                        }
+                    ) as response:
+                        response.raise_for_status()
+                        async for r in iter_json_array(response.aiter_bytes(), key="results"):
+                            results.append(r)
+                            yield r
+                        span.response_bytes = response.num_bytes_downloaded
+            except BaseException as e:
+                self._record_outcome(breaker, e)
+                if results or not isinstance(e, Exception) or not self.retry_policy.should_retry(e, attempt):
+                    if isinstance(e, Exception):
+                        logger.error("Streaming semantic search failed", error=str(e))
+                    raise
+                attempt += 1
+                await asyncio.sleep(self.retry_policy.delay(attempt - 1, e))
+                continue
+            self._record_outcome(breaker, None)
+            break
+
+        self._cache_set(cache_key, {"results": results}, project_id)
+
+    async def search_semantic_batch(
+        self,
+        queries: List[str],
+        project_id: Optional[str] = None,
+        top_k: int = 10,
+        min_similarity: float = 0.7,
+        concurrency: int = 4,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """여러 시맨틱 검색 동시 실행
+
+        공백만 다른 중복 쿼리는 한 번만 요청한다. 반환값은 정규화된 쿼리 → 결과
+        (실패한 쿼리는 예외 객체) 매핑이며 입력 순서를 유지한다. deadline(초)이 지나면
+        남은 검색은 취소하고 asyncio.TimeoutError로 표시한다.
+        """
+        unique_queries = list(dict.fromkeys(" ".join(q.split()) for q in queries))
+        semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+
+        async def run(query: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.search_semantic(
+                    query=query,
+                    project_id=project_id,
+                    top_k=top_k,
+                    min_similarity=min_similarity
+                )
+
+        if not unique_queries:
+            return {}
+
+        tasks = [asyncio.ensure_future(run(q)) for q in unique_queries]
         try:
-            response = await self.client.post(
-                f"{self.base_url}/search/semantic",
-                json={
-                    "query": query,
-                    "project_id": project_id,
-                    "top_k": top_k,
-                    "min_similarity": min_similarity,
-                    "include_content": True
-                }
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error("Semantic search failed", error=str(e))
-            raise
+            _, pending = await asyncio.wait(tasks, timeout=deadline)
+        finally:
+            # deadline 초과 또는 호출자 취소 - 진행 중인 백엔드 요청 취소
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if pending:
+            # 취소가 백엔드 요청까지 반영될 때까지 대기
+            await asyncio.wait(pending)
+
+        results = []
+        for task in tasks:
+            if task in pending:
+                results.append(asyncio.TimeoutError(f"Deadline of {deadline}s exceeded"))
+            else:
+                results.append(task.exception() or task.result())
+        return dict(zip(unique_queries, results))
 
     async def find_similar_code(
         self,
@@ -47,24 +476,49 @@ class FastAPIClient:
         project_id: Optional[str] = None,
         top_k: int = 5
     ) -> Dict[str, Any]:
-        """유사 코드 검색"""
+        """유사 코드 검색
+
+        처음 보는 스니펫은 백엔드에 질의 임베딩을 함께 돌려달라고 요청해 캐시하고, 같은
+        스니펫(정규화 기준)을 다시 검색할 때는 캐시한 벡터를 query_embedding으로 보내
+        백엔드가 다시 임베딩하지 않게 한다. 벡터는 결과에서 제거해 반환한다.
+        """
+        payload = {
+            "code_snippet": code_snippet,
+            "language": language,
+            "project_id": project_id,
+            "top_k": top_k,
+            "min_similarity": 0.7
+        }
+        key = snippet_key(code_snippet, language)
+        embedding = self.embedding_cache.get(key) if self.embedding_protocol else None
         try:
-            response = await self.client.post(
-                f"{self.base_url}/search/similar-code",
-                json={
-                    "code_snippet": code_snippet,
-                    "language": language,
-                    "project_id": project_id,
-                    "top_k": top_k,
-                    "min_similarity": 0.7
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+            if not self.embedding_protocol:
+                response = await self._similar_code_request(payload)
+            else:
+                extra = {"query_embedding": embedding} if embedding is not None else {"return_embedding": True}
+                try:
+                    response = await self._similar_code_request({**payload, **extra})
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code not in EMBEDDING_REJECTED_STATUSES:
+                        raise
+                    # 임베딩 필드 없이도 성공할 때만 필드를 모르는 백엔드로 보고 이후로는 원래 요청만 보냄
+                    response = await self._similar_code_request(payload)
+                    logger.warning("Backend rejected embedding fields, sending raw snippets", status=e.response.status_code)
+                    self.embedding_protocol = False
+                    self.embedding_cache.clear()
+            result = response.json()
         except Exception as e:
             logger.error("Similar code search failed", error=str(e))
             raise
 
+        vector = result.pop("query_embedding", None) if isinstance(result, dict) else None
+        if embedding is None and self.embedding_protocol and isinstance(vector, list) and vector:
+            self.embedding_cache.set(key, vector, size=8 * len(vector))
+        return result
+
+    async def _similar_code_request(self, payload: Dict[str, Any]) -> httpx.Response:
+        return await self._request("post", "/search/similar-code", "/search/similar-code", json=payload)
+
     async def search_by_metadata(
         self,
         filters: Dict[str, Any],
@@ -72,12 +526,11 @@ class FastAPIClient:
     ) -> Dict[str, Any]:
         """메타데이터 검색"""
         try:
-            response = await self.client.post(
-                f"{self.base_url}/search/metadata",
+            response = await self._request(
+                "post", "/search/metadata", "/search/metadata",
                 params={"top_k": top_k},
                 json=filters
             )
-            response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error("Metadata search failed", error=str(e))
@@ -85,26 +538,77 @@ class FastAPIClient:
 
     async def list_projects(self) -> Dict[str, Any]:
         """프로젝트 목록 조회"""
-        try:
-            response = await self.client.get(f"{self.base_url}/projects/")
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error("List projects failed", error=str(e))
-            raise
+        async def fetch() -> Dict[str, Any]:
+            try:
+                response = await self._request("get", "/projects/", "/projects/")
+                result = response.json()
+            except Exception as e:
+                logger.error("List projects failed", error=str(e))
+                raise
+
+            self._record_versions(result.get("projects") or [])
+            self.projects_synced = True
+            return result
+
+        return await self.inflight.do(("list_projects",), fetch)
+
+    async def get_project(self, project_id: str) -> Dict[str, Any]:
+        """단일 프로젝트 정보 조회"""
+        async def fetch() -> Dict[str, Any]:
+            try:
+                response = await self._request(
+                    "get", "/projects/{id}", f"/projects/{project_id}"
+                )
+                result = response.json()
+            except Exception as e:
+                logger.error("Get project failed", project_id=project_id, error=str(e))
+                raise
+
+            if result:
+                self._record_versions([result])
+            return result
+
+        return await self.inflight.do(("get_project", project_id), fetch)
 
     async def get_project_stats(self, project_id: str) -> Dict[str, Any]:
-        """프로젝트 통계 조회"""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/projects/{project_id}/stats"
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error("Get project stats failed", error=str(e))
-            raise
+        """프로젝트 통계 조회
+
+        프로젝트 인덱싱 버전을 알고 있으면 디스크 캐시를 사용한다 (버전이 바뀌면 폐기).
+        """
+        cache_key = ("get_project_stats", project_id)
+        versioned = self._disk_versioned(project_id)
+        if versioned:
+            cached = self.disk_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def fetch() -> Dict[str, Any]:
+            try:
+                response = await self._request(
+                    "get", "/projects/{id}/stats", f"/projects/{project_id}/stats"
+                )
+                result = response.json()
+            except Exception as e:
+                logger.error("Get project stats failed", error=str(e))
+                raise
+
+            if versioned:
+                self.disk_cache.set(cache_key, result, project_id=project_id)
+            return result
+
+        return await self.inflight.do(("get_project_stats", project_id), fetch)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """검색 캐시 통계 (hit/miss 카운터 포함)"""
+        stats = self.search_cache.stats()
+        if self.disk_cache is not None:
+            stats["disk"] = self.disk_cache.stats()
+        stats["embedding"] = self.embedding_cache.stats()
+        return stats
 
     async def close(self):
         """클라이언트 종료"""
-        await self.client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
@@ -0,0 +1,317 @@
+"""
+Result caches for API responses (in-process and on-disk)
+"""
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# 특정 프로젝트에 묶이지 않은(전체 검색) 항목의 project 키
+ALL_PROJECTS = "*"
+
+
+def estimate_size(value: Any) -> int:
+    """JSON 직렬화 기준 값의 대략적인 바이트 크기"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class TTLCache:
+    """TTL + LRU 기반 결과 캐시 (엔트리 수, 바이트 수 제한)
+
+    캐시된 값은 호출자 간에 공유되므로 읽기 전용으로 다뤄야 한다.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 256,
+        max_bytes: int = 16 * 1024 * 1024
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """캐시 조회 (만료된 항목은 제거하고 miss 처리)"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, size, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """캐시 저장 (용량 초과 시 가장 오래 사용되지 않은 항목부터 제거)"""
+        if not self.enabled:
+            return
+
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        self._data[key] = (time.monotonic() + self.ttl, size, value)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """특정 항목 제거"""
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """전체 캐시 비우기"""
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+
+class DiskCache:
+    """SQLite 기반 영속 결과 캐시 (서버 재시작 후에도 유지)
+
+    항목은 프로젝트에 묶여 저장되며, 프로젝트 인덱싱 버전이 바뀌면 해당 프로젝트와
+    전체 검색(ALL_PROJECTS) 항목이 함께 폐기된다. 전체 크기가 max_bytes를 넘으면
+    가장 오래 조회되지 않은 항목부터 제거한다. WAL 모드로 열어 쓰기 비용을 낮추고,
+    호출은 이벤트 루프에서 동기적으로 수행한다 (작은 로컬 쿼리라 스레드 전환보다 빠름).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 86400.0
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.path = Path(directory).expanduser() / "results.sqlite3"
+        # 데이터베이스는 첫 사용 시 연다 (서버 import 시점에 디렉터리 생성/스키마 작업을 하지 않도록)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """SQLite 연결 (첫 접근 시 생성)"""
+        if self._connection is None:
+            self._connection = self._open()
+        return self._connection
+
+    def _open(self) -> sqlite3.Connection:
+        """데이터베이스를 열고 스키마와 전체 크기를 준비
+
+        전체 크기는 meta 테이블에 기록해 두고 읽는다. SUM(size)는 value의 overflow
+        페이지까지 훑으므로 meta 행이 없는 기존 파일에서만 한 번 계산한다.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                project TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_project ON entries (project);
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+            CREATE TABLE IF NOT EXISTS versions (
+                project TEXT PRIMARY KEY,
+                version TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        row = conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()
+        if row is None:
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            conn.execute("INSERT INTO meta (name, value) VALUES ('bytes', ?)", row)
+            conn.commit()
+        self._bytes = row[0]
+        return conn
+
+    def _commit(self) -> None:
+        """전체 크기를 meta 행에 기록하고 커밋"""
+        self._conn.execute("UPDATE meta SET value = ? WHERE name = 'bytes'", (self._bytes,))
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(key: Hashable) -> str:
+        """캐시 키를 문자열로 직렬화"""
+        return json.dumps(key, ensure_ascii=False, default=str)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """캐시 조회 (만료된 항목은 제거하고 miss 처리)"""
+        db_key = self.make_key(key)
+        row = self._conn.execute(
+            "SELECT value, size, expires_at FROM entries WHERE key = ?", (db_key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+
+        value, size, expires_at = row
+        if expires_at <= now:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (db_key,))
+            self._bytes -= size
+            self._commit()
+            self.misses += 1
+            return None
+
+        self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, db_key))
+        self._conn.commit()
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: Hashable, value: Any, project_id: Optional[str] = None) -> None:
+        """캐시 저장 (용량 초과 시 LRU 순으로 제거)"""
+        db_key = self.make_key(key)
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (db_key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, project, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (db_key, project_id or ALL_PROJECTS, data, size, now + self.ttl, now)
+        )
+        self._bytes += size - (old[0] if old else 0)
+        if self._bytes > self.max_bytes:
+            self._evict()
+        self._commit()
+
+    def sync_version(self, project_id: str, version: Optional[str]) -> bool:
+        """프로젝트 인덱싱 버전 기록 - 바뀌었으면 관련 항목을 폐기하고 True 반환"""
+        row = self._conn.execute(
+            "SELECT version FROM versions WHERE project = ?", (project_id,)
+        ).fetchone()
+        if row is not None and row[0] == version:
+            return False
+
+        changed = row is not None
+        if changed:
+            self.invalidate_project(project_id)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO versions (project, version) VALUES (?, ?)",
+            (project_id, version)
+        )
+        self._commit()
+        return changed
+
+    def invalidate_project(self, project_id: str) -> None:
+        """프로젝트 항목과 전체 검색 항목 폐기"""
+        projects = (project_id, ALL_PROJECTS)
+        removed = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE project IN (?, ?)", projects
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM entries WHERE project IN (?, ?)", projects)
+        self._bytes -= removed
+        self._commit()
+        logger.info("Disk cache invalidated", project_id=project_id)
+
+    def clear(self) -> None:
+        """전체 캐시 비우기"""
+        self._conn.execute("DELETE FROM entries")
+        self._conn.execute("DELETE FROM versions")
+        self._bytes = 0
+        self._commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        lookups = self.hits + self.misses
+        entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _evict(self) -> None:
+        """max_bytes 이하가 될 때까지 가장 오래 조회되지 않은 항목 제거"""
+        now = time.time()
+        expired = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?", (now,)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        self._bytes -= expired
+
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at")
+        victims = []
+        for db_key, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            victims.append((db_key,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
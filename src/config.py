@@ -3,10 +3,14 @@ Configuration management for MCP server
 """
 import json
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 
+# 설정 파일 경로 / 백엔드 URL 환경 변수 (벤치마크, 배포 환경별 오버라이드용)
+CONFIG_PATH_ENV = "CODE_AGENT_MCP_CONFIG"
+API_URL_ENV = "CODE_AGENT_MCP_API_URL"
+
 
 @dataclass
 class ServerConfig:
@@ -14,6 +18,11 @@ class ServerConfig:
     name: str = "code-embedding-ai"
     version: str = "1.0.0"
     description: str = "MCP server for AI-powered code search"
+    transport: str = "stdio"
+    host: str = "127.0.0.1"
+    port: int = 8765
+    http_path: str = "/mcp"
+    json_response: bool = False
 
 
 @dataclass
@@ -21,6 +30,56 @@ class APIConfig:
     """FastAPI backend configuration"""
     base_url: str = "http://localhost:8000"
     timeout: int = 30
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    cache_ttl: float = 300.0
+    cache_max_entries: int = 256
+    cache_max_bytes: int = 16 * 1024 * 1024
+    disk_cache_dir: str = ""
+    disk_cache_max_bytes: int = 256 * 1024 * 1024
+    disk_cache_ttl: float = 3600.0
+    embedding_cache_ttl: float = 3600.0
+    embedding_cache_max_entries: int = 512
+    embedding_cache_max_bytes: int = 32 * 1024 * 1024
+    max_retries: int = 2
+    retry_backoff_base: float = 0.2
+    retry_backoff_max: float = 5.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    backends: List[Dict[str, Any]] = field(default_factory=list)
+    shard_timeout: float = 10.0
+    replicas: List[str] = field(default_factory=list)
+    hedge_percentile: float = 0.0
+    hedge_min_delay: float = 0.05
+
+
+@dataclass
+class ToolsConfig:
+    """Tool and resource handler configuration"""
+    batch_concurrency: int = 4
+    project_index_ttl: float = 60.0
+    resources_page_size: int = 50
+    resources_poll_interval: float = 60.0
+    max_tokens: int = 0
+    prompt_cache_ttl: float = 120.0
+    symbol_lookup_deadline: float = 5.0
+    symbol_index_path: str = ""
+    tool_deadline: float = 0.0
+    tool_deadlines: Dict[str, float] = field(default_factory=dict)
+    metrics_prometheus_path: str = ""
+    metrics_dump_interval: float = 15.0
+    output_format: str = "markdown"
+    federated_concurrency: int = 4
+    project_tags: Dict[str, List[str]] = field(default_factory=dict)
+    dedupe_results: bool = True
+    dedupe_overfetch: float = 1.5
+    rerank: bool = False
+    rerank_overfetch: int = 5
+    rerank_lexical_weight: float = 0.5
 
 
 @dataclass
@@ -36,29 +95,42 @@ class MCPConfig:
     server: ServerConfig
     api: APIConfig
     logging: LoggingConfig
+    tools: ToolsConfig = field(default_factory=ToolsConfig)
 
     @classmethod
     def from_file(cls, config_path: Optional[str] = None) -> "MCPConfig":
-        """Load configuration from file"""
+        """Load configuration from file
+
+        Without an explicit path, $CODE_AGENT_MCP_CONFIG is used if set, otherwise
+        mcp_config.json at the repository root. $CODE_AGENT_MCP_API_URL overrides
+        api.base_url.
+        """
         if config_path is None:
-            config_path = Path(__file__).parent.parent / "mcp_config.json"
+            config_path = os.environ.get(CONFIG_PATH_ENV) or Path(__file__).parent.parent / "mcp_config.json"
 
         if not os.path.exists(config_path):
             # Return default configuration
-            return cls(
+            config = cls(
                 server=ServerConfig(),
                 api=APIConfig(),
-                logging=LoggingConfig()
+                logging=LoggingConfig(),
+                tools=ToolsConfig()
             )
+        else:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
 
-        with open(config_path, 'r') as f:
-            data = json.load(f)
+            config = cls(
+                server=ServerConfig(**data.get('server', {})),
+                api=APIConfig(**data.get('api', {})),
+                logging=LoggingConfig(**data.get('logging', {})),
+                tools=ToolsConfig(**data.get('tools', {}))
+            )
 
-        return cls(
-            server=ServerConfig(**data.get('server', {})),
-            api=APIConfig(**data.get('api', {})),
-            logging=LoggingConfig(**data.get('logging', {}))
-        )
+        api_url = os.environ.get(API_URL_ENV)
+        if api_url:
+            config.api.base_url = api_url
+        return config
 
     def to_dict(self) -> dict:
         """Convert configuration to dictionary"""
@@ -66,14 +138,66 @@ class MCPConfig:
             "server": {
                 "name": self.server.name,
                 "version": self.server.version,
-                "description": self.server.description
+                "description": self.server.description,
+                "transport": self.server.transport,
+                "host": self.server.host,
+                "port": self.server.port,
+                "http_path": self.server.http_path,
+                "json_response": self.server.json_response
             },
             "api": {
                 "base_url": self.api.base_url,
-                "timeout": self.api.timeout
+                "timeout": self.api.timeout,
+                "connect_timeout": self.api.connect_timeout,
+                "read_timeout": self.api.read_timeout,
+                "max_connections": self.api.max_connections,
+                "max_keepalive_connections": self.api.max_keepalive_connections,
+                "keepalive_expiry": self.api.keepalive_expiry,
+                "http2": self.api.http2,
+                "cache_ttl": self.api.cache_ttl,
+                "cache_max_entries": self.api.cache_max_entries,
+                "cache_max_bytes": self.api.cache_max_bytes,
+                "disk_cache_dir": self.api.disk_cache_dir,
+                "disk_cache_max_bytes": self.api.disk_cache_max_bytes,
+                "disk_cache_ttl": self.api.disk_cache_ttl,
+                "embedding_cache_ttl": self.api.embedding_cache_ttl,
+                "embedding_cache_max_entries": self.api.embedding_cache_max_entries,
+                "embedding_cache_max_bytes": self.api.embedding_cache_max_bytes,
+                "max_retries": self.api.max_retries,
+                "retry_backoff_base": self.api.retry_backoff_base,
+                "retry_backoff_max": self.api.retry_backoff_max,
+                "circuit_failure_threshold": self.api.circuit_failure_threshold,
+                "circuit_reset_timeout": self.api.circuit_reset_timeout,
+                "backends": [dict(b) for b in self.api.backends],
+                "shard_timeout": self.api.shard_timeout,
+                "replicas": list(self.api.replicas),
+                "hedge_percentile": self.api.hedge_percentile,
+                "hedge_min_delay": self.api.hedge_min_delay
             },
             "logging": {
                 "level": self.logging.level,
                 "format": self.logging.format
+            },
+            "tools": {
+                "batch_concurrency": self.tools.batch_concurrency,
+                "project_index_ttl": self.tools.project_index_ttl,
+                "resources_page_size": self.tools.resources_page_size,
+                "resources_poll_interval": self.tools.resources_poll_interval,
+                "max_tokens": self.tools.max_tokens,
+                "prompt_cache_ttl": self.tools.prompt_cache_ttl,
+                "symbol_lookup_deadline": self.tools.symbol_lookup_deadline,
+                "symbol_index_path": self.tools.symbol_index_path,
+                "tool_deadline": self.tools.tool_deadline,
+                "tool_deadlines": dict(self.tools.tool_deadlines),
+                "metrics_prometheus_path": self.tools.metrics_prometheus_path,
+                "metrics_dump_interval": self.tools.metrics_dump_interval,
+                "output_format": self.tools.output_format,
+                "federated_concurrency": self.tools.federated_concurrency,
+                "project_tags": {tag: list(ids) for tag, ids in self.tools.project_tags.items()},
+                "dedupe_results": self.tools.dedupe_results,
+                "dedupe_overfetch": self.tools.dedupe_overfetch,
+                "rerank": self.tools.rerank,
+                "rerank_overfetch": self.tools.rerank_overfetch,
+                "rerank_lexical_weight": self.tools.rerank_lexical_weight
             }
         }
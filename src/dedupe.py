@@ -0,0 +1,141 @@
+"""
+Deduplication and overlap collapsing of search result chunks
+"""
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class DedupeResult:
+    """중복 제거 결과"""
+    results: List[Dict[str, Any]]
+    duplicates: int = 0
+    merged: int = 0
+
+    def details(self) -> Dict[str, Any]:
+        """structured 출력용 제거/병합된 청크 수 (변경이 없으면 빈 dict)"""
+        if not self.duplicates and not self.merged:
+            return {}
+        return {"deduplicated": {"duplicates": self.duplicates, "merged": self.merged}}
+
+
+def overfetch_k(top_k: int, factor: float) -> int:
+    """중복 제거 후에도 top_k를 채우기 위해 백엔드에 요청할 결과 수"""
+    return max(int(top_k), math.ceil(int(top_k) * max(1.0, factor)))
+
+
+def content_hash(result: Dict[str, Any]) -> Optional[str]:
+    """줄 끝 공백과 앞뒤 빈 줄을 무시한 내용 해시 (내용이 없으면 None)"""
+    content = (result.get("content") or "").strip()
+    if not content:
+        return None
+    normalized = "\n".join(line.rstrip() for line in content.splitlines())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _span(result: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    start, end = result.get("line_start"), result.get("line_end")
+    if not isinstance(start, int) or not isinstance(end, int) or end < start:
+        return None
+    return start, end
+
+
+def _lines(result: Dict[str, Any], span: Tuple[int, int]) -> Optional[List[str]]:
+    """라인 범위와 줄 수가 일치하는 내용의 줄 목록 (아니면 None - 이어 붙일 수 없음)"""
+    lines = (result.get("content") or "").split("\n")
+    return lines if len(lines) == span[1] - span[0] + 1 else None
+
+
+def _merge(first: Dict[str, Any], second: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """같은 파일에서 라인 범위가 겹치는 두 청크를 하나로 병합 (병합할 수 없으면 None)
+
+    한쪽이 다른 쪽을 포함하면 큰 청크를 남기고, 일부만 겹치면 라인 범위를 합치고
+    내용을 이어 붙인다. 유사도는 둘 중 높은 값을 쓴다.
+    """
+    a, b = _span(first), _span(second)
+    similarity = max(first.get("similarity") or 0, second.get("similarity") or 0)
+
+    if a[0] <= b[0] and b[1] <= a[1]:
+        return first
+    if b[0] <= a[0] and a[1] <= b[1]:
+        return {**second, "similarity": similarity}
+
+    lines_a, lines_b = _lines(first, a), _lines(second, b)
+    if lines_a is None or lines_b is None:
+        return None
+    if a[0] <= b[0]:
+        content = lines_a + lines_b[a[1] - b[0] + 1:]
+    else:
+        content = lines_b + lines_a[b[1] - a[0] + 1:]
+    return {
+        **first,
+        "line_start": min(a[0], b[0]),
+        "line_end": max(a[1], b[1]),
+        "content": "\n".join(content),
+        "similarity": similarity
+    }
+
+
+def _overlaps(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """같은 프로젝트/파일에서 라인 범위가 겹치는지"""
+    a, b = _span(first), _span(second)
+    return (
+        a is not None and b is not None
+        and first.get("file_path") == second.get("file_path")
+        and first.get("project_id") == second.get("project_id")
+        and a[0] <= b[1] and b[0] <= a[1]
+    )
+
+
+def collapse_results(results: List[Dict[str, Any]], top_k: Optional[int] = None) -> DedupeResult:
+    """내용이 같은 청크를 제거하고 같은 파일의 겹치는 라인 범위를 병합
+
+    결과는 유사도 순으로 들어온다고 가정하며, 병합된 청크는 먼저 나온(순위가 높은)
+    자리에 남는다. 원본 결과(캐시 공유 객체)는 수정하지 않는다.
+    """
+    kept: List[Dict[str, Any]] = []
+    hashes = set()
+    duplicates = merged = 0
+
+    for result in results:
+        digest = content_hash(result)
+        if digest is not None and digest in hashes:
+            duplicates += 1
+            continue
+
+        candidate, position = result, None
+        if result.get("file_path") and _span(result) is not None:
+            # 병합으로 범위가 넓어지면 다른 청크와 새로 겹칠 수 있으므로 더 병합할 것이 없을 때까지 반복
+            changed = True
+            while changed:
+                changed = False
+                for i, other in enumerate(kept):
+                    if i == position or not _overlaps(other, candidate):
+                        continue
+                    if position is None or i < position:
+                        combined = _merge(other, candidate)
+                    else:
+                        combined = _merge(candidate, other)
+                    if combined is None:
+                        continue
+                    merged += 1
+                    if position is None:
+                        position = i
+                    else:
+                        kept.pop(max(i, position))
+                        position = min(i, position)
+                    candidate = kept[position] = combined
+                    changed = True
+                    break
+
+        if position is None:
+            kept.append(candidate)
+        for value in {digest, content_hash(candidate)}:
+            if value is not None:
+                hashes.add(value)
+
+    if top_k is not None:
+        kept = kept[:max(0, int(top_k))]
+    return DedupeResult(results=kept, duplicates=duplicates, merged=merged)
@@ -0,0 +1,136 @@
+"""
+Federated semantic search over several projects with early stopping
+"""
+import asyncio
+import heapq
+import itertools
+import math
+from typing import Any, Dict, List
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+def normalized_score(result: Dict[str, Any]) -> float:
+    """프로젝트 간 비교용 점수 (유사도를 [0, 1]로 제한, 없으면 0)
+
+    모든 프로젝트가 같은 임베딩 모델의 코사인 유사도를 쓰므로 스케일은 같다. 프로젝트별
+    재조정(min-max 등)은 하지 않는다 - 조기 종료에 쓰는 점수 상한이 깨지기 때문이다.
+    """
+    similarity = result.get("similarity")
+    if similarity is None:
+        return 0.0
+    return min(1.0, max(0.0, float(similarity)))
+
+
+def merge_top_k(result_lists: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+    """프로젝트별 결과 목록을 정규화 점수 내림차순으로 k-way merge 해 상위 top_k개 반환"""
+    ordered = [sorted(results, key=normalized_score, reverse=True) for results in result_lists]
+    merged = heapq.merge(*ordered, key=normalized_score, reverse=True)
+    return list(itertools.islice(merged, max(0, int(top_k))))
+
+
+class _ProjectState:
+    """프로젝트 하나의 검색 상태"""
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.results: List[Dict[str, Any]] = []
+        self.exhausted = False
+
+    @property
+    def bound(self) -> float:
+        """이 프로젝트에서 아직 받지 않은 결과가 가질 수 있는 최대 점수"""
+        if self.exhausted:
+            return -math.inf
+        if not self.results:
+            return 1.0
+        return normalized_score(self.results[-1])
+
+
+async def federated_search(
+    client,
+    query: str,
+    project_ids: List[str],
+    top_k: int = 10,
+    min_similarity: float = 0.7,
+    concurrency: int = 4
+) -> Dict[str, Any]:
+    """여러 프로젝트를 동시에 검색해 상위 top_k개를 병합
+
+    1단계에서 모든 프로젝트를 적은 수(top_k / 프로젝트 수)로 탐색한다. 유사도 순으로
+    받은 마지막 결과의 점수가 그 프로젝트의 남은 결과 점수 상한이 된다. 2단계에서는
+    상한이 현재 k번째 점수를 넘는 프로젝트만 상한이 높은 순으로 top_k개를 다시 조회하며,
+    차례가 왔을 때 상한이 k번째 점수를 넘지 못하면 조회하지 않고 건너뛴다. 모든 조회는
+    concurrency개로 제한되고, 실패한 프로젝트는 "failed_projects"에 담아 나머지로 결과를 만든다.
+
+    Returns:
+        {"results", "searched": [...], "pruned": [...], "failed_projects"?: [...]}
+    """
+    project_ids = list(dict.fromkeys(project_ids))
+    top_k = max(1, int(top_k))
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    states = {project_id: _ProjectState(project_id) for project_id in project_ids}
+    failed: Dict[str, str] = {}
+    pruned: List[str] = []
+
+    def kth_score() -> float:
+        """현재 병합 결과의 k번째 점수 (결과가 k개 미만이면 -inf)"""
+        scores = heapq.nlargest(
+            top_k, (normalized_score(r) for s in states.values() for r in s.results)
+        )
+        return scores[-1] if len(scores) >= top_k else -math.inf
+
+    async def fetch(state: _ProjectState, k: int, skip_if_bounded: bool) -> None:
+        async with semaphore:
+            if skip_if_bounded:
+                threshold = kth_score()
+                if state.bound <= threshold:
+                    pruned.append(state.project_id)
+                    return
+                # k번째 점수보다 낮은 결과는 순위에 들 수 없으므로 백엔드에서 걸러냄
+                floor = max(min_similarity, threshold) if threshold > -math.inf else min_similarity
+            else:
+                floor = min_similarity
+            try:
+                result = await client.search_semantic(
+                    query=query, project_id=state.project_id, top_k=k, min_similarity=floor
+                )
+            except Exception as e:
+                logger.warning("Federated search failed for project", project_id=state.project_id, error=str(e))
+                failed[state.project_id] = str(e)
+                state.exhausted = True
+                return
+        results = [
+            {**r, "project_id": r.get("project_id") or state.project_id}
+            for r in result.get("results") or []
+        ]
+        state.results = sorted(results, key=normalized_score, reverse=True)
+        state.exhausted = len(results) < k
+
+    # 1단계: 프로젝트별 얕은 탐색
+    probe_k = min(top_k, max(1, math.ceil(top_k / max(1, len(project_ids)))))
+    await asyncio.gather(*(fetch(state, probe_k, False) for state in states.values()))
+
+    # 2단계: 상한이 k번째 점수를 넘는 프로젝트만 상한 순으로 깊게 조회
+    if probe_k < top_k:
+        threshold = kth_score()
+        candidates = sorted(
+            (s for s in states.values() if s.bound > threshold),
+            key=lambda s: s.bound,
+            reverse=True
+        )
+        pruned.extend(
+            s.project_id for s in states.values()
+            if s not in candidates and not s.exhausted
+        )
+        await asyncio.gather(*(fetch(state, top_k, True) for state in candidates))
+
+    output: Dict[str, Any] = {
+        "results": merge_top_k([s.results for s in states.values()], top_k),
+        "searched": [p for p in project_ids if p not in failed],
+        "pruned": [p for p in project_ids if p in pruned]
+    }
+    if failed:
+        output["failed_projects"] = sorted(failed)
+    return output
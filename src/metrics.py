@@ -0,0 +1,278 @@
+"""
+In-process latency, throughput and cache instrumentation
+"""
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Prometheus 메트릭 이름 접두사
+PREFIX = "code_agent_mcp"
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 응답 크기 히스토그램 버킷 (바이트)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """누적 버킷 카운트(Prometheus용) + 최근 샘플 윈도우(백분위수용) 히스토그램"""
+
+    def __init__(self, buckets: Tuple[float, ...], window: int = 1024):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._recent: deque = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            self.bucket_counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """최근 윈도우 기준 백분위수 (nearest-rank, 샘플이 없으면 None)"""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def summary(self, digits: int = 4) -> Dict[str, Any]:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, digits) if value is not None else None
+
+        return {
+            "count": self.count,
+            "sum": rounded(self.sum),
+            "p50": rounded(self.percentile(50)),
+            "p95": rounded(self.percentile(95)),
+            "p99": rounded(self.percentile(99))
+        }
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus le 라벨별 누적 카운트 (+Inf 포함)"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            result.append((_format_number(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class HandlerStats:
+    """핸들러(도구/프롬프트/리소스/백엔드 엔드포인트) 하나의 통계"""
+
+    def __init__(self, window: int = 1024):
+        self.latency = Histogram(LATENCY_BUCKETS, window)
+        self.response_bytes = Histogram(SIZE_BUCKETS, window)
+        self.in_flight = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.latency.count,
+            "in_flight": self.in_flight,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "latency_seconds": self.latency.summary(),
+            "response_bytes": self.response_bytes.summary(digits=0)
+        }
+
+
+class Span:
+    """track() 블록 안에서 결과를 기록하는 핸들"""
+
+    __slots__ = ("error", "response_bytes")
+
+    def __init__(self):
+        self.error = False
+        self.response_bytes: Optional[int] = None
+
+
+class Metrics:
+    """핸들러/백엔드 엔드포인트별 지연 시간, 동시 처리 수, 응답 크기, 오류와 캐시 통계 수집
+
+    kind는 "tool", "prompt", "resource", "backend" 중 하나이고 name은 도구 이름이나
+    엔드포인트 경로 템플릿이다. 캐시는 stats()를 돌려주는 함수를 등록해 조회 시점에 읽는다.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.started_at = time.time()
+        self._handlers: Dict[Tuple[str, str], HandlerStats] = {}
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    @contextmanager
+    def track(self, kind: str, name: str) -> Iterator[Span]:
+        """블록 실행 시간과 결과 기록 (예외는 오류, 취소는 cancelled로 집계)"""
+        stats = self._handlers.get((kind, name))
+        if stats is None:
+            stats = self._handlers[(kind, name)] = HandlerStats(self.window)
+
+        span = Span()
+        stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield span
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            raise
+        except Exception:
+            span.error = True
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.latency.observe(time.perf_counter() - start)
+            if span.error:
+                stats.errors += 1
+            if span.response_bytes is not None:
+                stats.response_bytes.observe(span.response_bytes)
+
+    def register_cache(self, name: str, stats_fn: Callable[[], Dict[str, Any]]) -> None:
+        """캐시 통계 함수 등록 (hits/misses/entries/bytes/hit_rate 키를 사용)"""
+        self._caches[name] = stats_fn
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """등록된 캐시 통계 (중첩된 하위 캐시는 '이름_하위' 로 펼침)"""
+        result = {}
+        for name, stats_fn in self._caches.items():
+            try:
+                stats = stats_fn()
+            except Exception as e:
+                logger.warning("Failed to read cache stats", cache=name, error=str(e))
+                continue
+            if not isinstance(stats, dict):
+                continue
+            result[name] = {k: v for k, v in stats.items() if not isinstance(v, dict)}
+            for sub, sub_stats in stats.items():
+                if isinstance(sub_stats, dict):
+                    result[f"{name}_{sub}"] = sub_stats
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON 직렬화 가능한 전체 통계"""
+        handlers: Dict[str, Dict[str, Any]] = {}
+        for (kind, name), stats in sorted(self._handlers.items()):
+            handlers.setdefault(kind, {})[name] = stats.summary()
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "process": {"max_rss_bytes": _max_rss_bytes()},
+            "handlers": handlers,
+            "caches": self.cache_stats()
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition 형식 덤프"""
+        lines: List[str] = []
+        items = sorted(self._handlers.items())
+
+        def header(metric: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{metric} {kind}")
+
+        def histogram(metric: str, attr: str) -> None:
+            for (kind, name), stats in items:
+                hist = getattr(stats, attr)
+                labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+                for le, count in hist.cumulative():
+                    lines.append(f'{PREFIX}_{metric}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{PREFIX}_{metric}_sum{{{labels}}} {_format_number(hist.sum)}")
+                lines.append(f"{PREFIX}_{metric}_count{{{labels}}} {hist.count}")
+
+        header("handler_latency_seconds", "histogram", "Handler latency in seconds.")
+        histogram("handler_latency_seconds", "latency")
+        header("handler_response_bytes", "histogram", "Handler response payload size in bytes.")
+        histogram("handler_response_bytes", "response_bytes")
+
+        for metric, kind_, attr, help_text in (
+            ("handler_in_flight", "gauge", "in_flight", "Handler calls currently in progress."),
+            ("handler_errors_total", "counter", "errors", "Handler calls that failed."),
+            ("handler_cancelled_total", "counter", "cancelled", "Handler calls that were cancelled.")
+        ):
+            header(metric, kind_, help_text)
+            for (kind, name), stats in items:
+                labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+                lines.append(f"{PREFIX}_{metric}{{{labels}}} {getattr(stats, attr)}")
+
+        max_rss = _max_rss_bytes()
+        if max_rss is not None:
+            header("process_max_rss_bytes", "gauge", "Peak resident set size of the server process.")
+            lines.append(f"{PREFIX}_process_max_rss_bytes {max_rss}")
+
+        caches = self.cache_stats()
+        for field, kind_, metric in (
+            ("hits", "counter", "cache_hits_total"),
+            ("misses", "counter", "cache_misses_total"),
+            ("entries", "gauge", "cache_entries"),
+            ("bytes", "gauge", "cache_bytes"),
+            ("hit_rate", "gauge", "cache_hit_ratio")
+        ):
+            header(metric, kind_, f"Cache {field.replace('_', ' ')}.")
+            for name, stats in sorted(caches.items()):
+                if isinstance(stats.get(field), (int, float)):
+                    lines.append(
+                        f'{PREFIX}_{metric}{{cache="{_escape(name)}"}} {_format_number(stats[field])}'
+                    )
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Prometheus 텍스트 덤프를 파일에 원자적으로 기록 (node_exporter textfile collector용)"""
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, target)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def reset(self) -> None:
+        """핸들러 통계 초기화 (캐시 등록은 유지)"""
+        self._handlers.clear()
+        self.started_at = time.time()
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """프로세스 최대 RSS (바이트, 지원하지 않는 플랫폼에서는 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KiB, macOS는 바이트 단위
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# 프로세스 전역 메트릭 레지스트리
+metrics = Metrics()
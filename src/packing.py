@@ -0,0 +1,155 @@
+"""
+Token-budget-aware packing of search results
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# 토큰 수 추정에 쓰는 평균 문자 수 (코드 기준 대략치)
+CHARS_PER_TOKEN = 4
+
+# 결과 하나당 헤더(파일 경로, 라인, 유사도, 코드 펜스)에 드는 대략적인 문자 수
+RESULT_OVERHEAD_CHARS = 80
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+
+
+@dataclass
+class PackResult:
+    """패킹 결과"""
+    results: List[Dict[str, Any]]
+    dropped: List[Dict[str, Any]] = field(default_factory=list)
+    trimmed: int = 0
+    used_chars: int = 0
+
+    def summary(self) -> Optional[str]:
+        """잘리거나 제외된 결과에 대한 안내 문구 (변경이 없으면 None)"""
+        if not self.dropped and not self.trimmed:
+            return None
+
+        parts = []
+        if self.trimmed:
+            parts.append(f"trimmed {self.trimmed} result(s) around the most relevant lines")
+        if self.dropped:
+            locations = ", ".join(
+                f"{r.get('file_path', '')}:{r.get('line_start')}-{r.get('line_end')}"
+                for r in self.dropped
+            )
+            parts.append(f"dropped {len(self.dropped)} result(s): {locations}")
+        return f"_Token budget reached: {'; '.join(parts)}._"
+
+
+def budget_chars(max_tokens: Optional[int] = None, max_chars: Optional[int] = None) -> Optional[int]:
+    """max_tokens / max_chars를 문자 예산으로 변환 (둘 다 없거나 0이면 무제한)"""
+    budgets = []
+    if max_tokens:
+        budgets.append(int(max_tokens) * CHARS_PER_TOKEN)
+    if max_chars:
+        budgets.append(int(max_chars))
+    return min(budgets) if budgets else None
+
+
+def _query_terms(query: Optional[str]) -> set:
+    if not query:
+        return set()
+    terms = set()
+    for token in _TOKEN_RE.findall(query):
+        terms.add(token.lower())
+        # camelCase / snake_case 분해
+        for part in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", token):
+            terms.add(part.lower())
+    return terms
+
+
+def trim_content(content: str, max_chars: int, query: Optional[str] = None) -> tuple[str, int, int]:
+    """가장 관련도 높은 라인을 중심으로 max_chars 이내로 내용을 자름
+
+    Returns:
+        (잘린 내용, 유지된 첫 라인 offset, 유지된 마지막 라인 offset)
+    """
+    lines = content.split("\n")
+    terms = _query_terms(query)
+
+    best = 0
+    if terms:
+        best_score = 0
+        for i, line in enumerate(lines):
+            score = sum(1 for token in _TOKEN_RE.findall(line) if token.lower() in terms)
+            if score > best_score:
+                best, best_score = i, score
+
+    # 중심 라인에서 위아래로 번갈아 확장
+    start = end = best
+    used = len(lines[best]) + 1
+    while True:
+        grew = False
+        if end + 1 < len(lines) and used + len(lines[end + 1]) + 1 <= max_chars:
+            end += 1
+            used += len(lines[end]) + 1
+            grew = True
+        if start > 0 and used + len(lines[start - 1]) + 1 <= max_chars:
+            start -= 1
+            used += len(lines[start]) + 1
+            grew = True
+        if not grew:
+            break
+
+    kept = lines[start:end + 1]
+    if used > max_chars:
+        # 중심 라인 하나만으로도 예산 초과
+        kept = [lines[best][:max(0, max_chars - 3)] + "..."]
+    if start > 0:
+        kept.insert(0, "...")
+    if end < len(lines) - 1:
+        kept.append("...")
+    return "\n".join(kept), start, end
+
+
+def _rank_score(result: Dict[str, Any]) -> float:
+    """패킹 우선순위 점수 (로컬 재정렬 점수가 있으면 그것을 사용)"""
+    score = result.get("rerank_score")
+    if score is None:
+        score = result.get("similarity")
+    return score or 0
+
+
+def pack_results(
+    results: List[Dict[str, Any]],
+    max_chars: Optional[int],
+    query: Optional[str] = None,
+    min_chunk_chars: int = 200
+) -> PackResult:
+    """유사도 순(재정렬된 결과는 rerank_score 순)으로 예산을 채우는 greedy 패킹
+
+    예산에 다 들어가지 않는 결과는 남은 예산이 min_chunk_chars 이상이면 관련 라인
+    중심으로 잘라 넣고, 아니면 제외한다. 원본 결과(캐시 공유 객체)는 수정하지 않는다.
+    """
+    if not max_chars:
+        return PackResult(results=list(results))
+
+    ordered = sorted(results, key=_rank_score, reverse=True)
+    packed = PackResult(results=[])
+    remaining = max_chars
+
+    for r in ordered:
+        content = r.get("content") or ""
+        overhead = RESULT_OVERHEAD_CHARS + len(r.get("file_path") or "")
+        cost = overhead + len(content)
+
+        if cost <= remaining:
+            packed.results.append(r)
+            remaining -= cost
+        elif remaining - overhead >= min_chunk_chars:
+            text, first, last = trim_content(content, remaining - overhead, query)
+            trimmed = dict(r, content=text, trimmed=True)
+            if r.get("line_start") is not None:
+                trimmed["line_start"] = r["line_start"] + first
+                trimmed["line_end"] = r["line_start"] + last
+            packed.results.append(trimmed)
+            packed.trimmed += 1
+            remaining -= overhead + len(text)
+        else:
+            packed.dropped.append(r)
+
+    packed.used_chars = max_chars - remaining
+    return packed
@@ -0,0 +1,121 @@
+"""
+Project metadata index for resolving project resources without listing
+"""
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+# 프로젝트 인덱싱 버전으로 사용할 수 있는 메타데이터 필드 (앞쪽 우선)
+VERSION_FIELDS = ("index_version", "indexed_at", "last_indexed", "updated_at")
+
+
+def project_version(project: Dict[str, Any]) -> Optional[str]:
+    """프로젝트의 인덱싱 버전 (백엔드가 제공하지 않으면 None)"""
+    for field in VERSION_FIELDS:
+        value = project.get(field)
+        if value is not None:
+            return str(value)
+    return None
+
+
+class ProjectIndex:
+    """프로젝트 ID → 메타데이터 인덱스
+
+    전체 목록은 list_projects 호출 시 갱신하고, 인덱스에 없거나 만료된 프로젝트는
+    단건 조회(/projects/{id})로 채운다. 항목별로 TTL을 적용한다.
+    전체 목록 스냅샷에는 내용 해시(version)가 붙어 변경 감지와 페이지 커서에 쓰인다.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self._projects: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._refreshed_at: Optional[float] = None
+        self._snapshot: List[Dict[str, Any]] = []
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """만료되지 않은 프로젝트 메타데이터 조회"""
+        fetched_at = self._fetched_at.get(project_id)
+        if fetched_at is None or time.monotonic() - fetched_at > self.ttl:
+            return None
+        return self._projects[project_id]
+
+    def put(self, project: Dict[str, Any]) -> None:
+        """단일 프로젝트 추가/갱신"""
+        project_id = project["id"]
+        self._projects[project_id] = project
+        self._fetched_at[project_id] = time.monotonic()
+
+    def replace_all(self, projects: List[Dict[str, Any]]) -> bool:
+        """전체 프로젝트 목록으로 인덱스 교체 (목록에서 사라진 프로젝트는 제거)
+
+        이전 스냅샷과 내용이 달라졌으면 True를 반환한다.
+        """
+        now = time.monotonic()
+        self._projects = {p["id"]: p for p in projects}
+        self._fetched_at = {project_id: now for project_id in self._projects}
+        self._refreshed_at = now
+        self._snapshot = list(projects)
+
+        version = hashlib.sha1(
+            json.dumps(projects, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        changed = self.version is not None and version != self.version
+        self.version = version
+        return changed
+
+    def projects(self) -> List[Dict[str, Any]]:
+        """마지막 전체 목록 스냅샷"""
+        return list(self._snapshot)
+
+    def tagged(self, tag: str) -> List[str]:
+        """메타데이터 tags에 tag가 있는 프로젝트 ID (대소문자 무시, 목록 순)"""
+        wanted = tag.lower()
+        return [
+            p["id"] for p in self._snapshot
+            if any(str(t).lower() == wanted for t in p.get("tags") or [])
+        ]
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """마지막 전체 목록 스냅샷의 일부 (offset부터 limit개)"""
+        return self._snapshot[offset:offset + limit]
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def is_stale(self) -> bool:
+        """전체 목록 갱신이 필요한지 여부"""
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.ttl
+
+    async def refresh(self, client) -> bool:
+        """백엔드에서 전체 프로젝트 목록을 받아 인덱스 갱신 (변경 여부 반환)"""
+        result = await client.list_projects()
+        return self.replace_all(result.get("projects") or [])
+
+    async def resolve(self, client, project_id: str) -> Optional[Dict[str, Any]]:
+        """프로젝트 메타데이터 조회 (인덱스 → 단건 조회 → 전체 목록 순)"""
+        project = self.get(project_id)
+        if project is not None:
+            return project
+
+        try:
+            project = await client.get_project(project_id)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (404, 405):
+                raise
+            # 미등록 프로젝트이거나 단건 조회를 지원하지 않는 백엔드 - 전체 목록으로 확인
+            if self.is_stale():
+                await self.refresh(client)
+            return self.get(project_id)
+
+        if not project:
+            return None
+        self.put(project)
+        return project
@@ -0,0 +1,66 @@
+"""
+Replica set with least-outstanding-requests balancing
+"""
+import itertools
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+class Replica:
+    """같은 인덱스를 서빙하는 백엔드 인스턴스 하나"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.outstanding = 0
+        self.requests = 0
+
+    def __repr__(self) -> str:
+        return f"Replica({self.base_url!r}, outstanding={self.outstanding})"
+
+
+class ReplicaSet:
+    """진행 중인 요청이 가장 적은 레플리카를 고르는 로드 밸런서
+
+    동률이면 라운드 로빈으로 돌아가며 고른다. 레플리카가 하나면 항상 그 레플리카를 고른다.
+    """
+
+    def __init__(self, base_urls: Iterable[str]):
+        self.replicas: List[Replica] = [Replica(url) for url in dict.fromkeys(base_urls)]
+        self._turn = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def pick(
+        self,
+        exclude: Iterable[Replica] = (),
+        available: Optional[Callable[[Replica], bool]] = None
+    ) -> Optional[Replica]:
+        """요청을 보낼 레플리카 (후보가 없으면 None)"""
+        excluded = set(map(id, exclude))
+        candidates = [
+            r for r in self.replicas
+            if id(r) not in excluded and (available is None or available(r))
+        ]
+        if not candidates:
+            return None
+        least = min(r.outstanding for r in candidates)
+        tied = [r for r in candidates if r.outstanding == least]
+        return tied[next(self._turn) % len(tied)]
+
+    @contextmanager
+    def acquire(self, replica: Replica) -> Iterator[Replica]:
+        """요청 하나가 진행되는 동안 outstanding 카운트 유지"""
+        replica.outstanding += 1
+        replica.requests += 1
+        try:
+            yield replica
+        finally:
+            replica.outstanding -= 1
+
+    def stats(self) -> dict:
+        """레플리카별 진행 중 / 누적 요청 수"""
+        return {
+            r.base_url: {"outstanding": r.outstanding, "requests": r.requests}
+            for r in self.replicas
+        }
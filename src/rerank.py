@@ -0,0 +1,144 @@
+"""
+Local lexical re-ranking of search results (BM25 + identifier overlap)
+"""
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+# camelCase / snake_case / 숫자 경계에서 나눈 단어 조각 (getUserById → get, User, By, Id)
+_SUBWORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _lower_aligned(text: str) -> str:
+    """글자 위치가 원문과 같은 소문자 문자열 (İ처럼 소문자가 두 글자가 되는 문자는 첫 글자만)"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = "".join(c.lower()[:1] for c in text)
+    return lowered
+
+
+def _subword_at(text: str, start: int, end: int) -> bool:
+    """text[start:end]가 _SUBWORD 기준 단어 조각 하나인지 (budget 안의 get은 아님)
+
+    끝 뒤에 소문자가 이어지면 안 되고, 시작은 글자가 아닌 문자 뒤, camelCase 전환
+    (소문자 → 대문자) 또는 약어 끝(HTTPServer의 S)이어야 한다.
+    """
+    if end < len(text) and "a" <= text[end] <= "z":
+        return False
+    before = text[start - 1] if start else ""
+    first = text[start]
+    if "a" <= before <= "z":
+        return "A" <= first <= "Z"
+    if "A" <= before <= "Z":
+        return "A" <= first <= "Z" and start + 1 < len(text) and "a" <= text[start + 1] <= "z"
+    return True
+
+
+def _count_subword(term: str, text: str, lowered: str) -> int:
+    """소문자 term이 text에 단어 조각으로 나오는 횟수 (lowered는 _lower_aligned(text))"""
+    count = 0
+    start = lowered.find(term)
+    while start != -1:
+        if _subword_at(text, start, start + len(term)):
+            count += 1
+        start = lowered.find(term, start + 1)
+    return count
+
+
+def _has_identifier(name: str, text: str) -> bool:
+    """name이 text에 식별자 전체로 나오는지 (대소문자 구분, get_user 안의 get은 아님)"""
+    start = text.find(name)
+    while start != -1:
+        end = start + len(name)
+        if not (start and _is_identifier_char(text[start - 1])) and not (
+            end < len(text) and _is_identifier_char(text[end])
+        ):
+            return True
+        start = text.find(name, start + 1)
+    return False
+
+
+def _is_identifier_char(char: str) -> bool:
+    return char == "_" or char.isascii() and char.isalnum()
+
+
+def query_terms(query: str) -> List[str]:
+    """BM25에 쓰는 질의 단어 조각 (소문자, 중복 제거, 한 글자 제외)"""
+    return list(dict.fromkeys(t.lower() for t in _SUBWORD.findall(query) if len(t) > 1))
+
+
+def query_identifiers(query: str) -> List[str]:
+    """식별자 겹침에 쓰는 질의 식별자 (세 글자 이상, 대소문자 구분)"""
+    return list(dict.fromkeys(name for name in _IDENTIFIER.findall(query) if len(name) > 2))
+
+
+def bm25_scores(terms: List[str], documents: List[str]) -> List[float]:
+    """후보 청크 집합을 말뭉치로 한 BM25 점수
+
+    documents는 원래 대소문자를 유지한 청크 내용이다 (camelCase 경계 판단에 필요).
+    질의 용어만 세면 되므로 청크를 토큰화하지 않고 용어별로 소문자 문자열에서 위치를 찾은 뒤
+    단어 조각 경계인 출현만 세어 열 단위로 누적한다. 청크 길이는 문자 수로 정규화한다.
+    """
+    n = len(documents)
+    scores = [0.0] * n
+    if not n:
+        return scores
+    lowered = [_lower_aligned(doc) for doc in documents]
+    lengths = [len(doc) for doc in documents]
+    avg_length = (sum(lengths) / n) or 1.0
+    norms = [BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) for length in lengths]
+
+    for term in terms:
+        frequencies = [_count_subword(term, doc, low) for doc, low in zip(documents, lowered)]
+        df = n - frequencies.count(0)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i, tf in enumerate(frequencies):
+            if tf:
+                scores[i] += idf * tf * (BM25_K1 + 1) / (tf + norms[i])
+    return scores
+
+
+def rerank_results(
+    results: List[Dict[str, Any]],
+    query: str,
+    lexical_weight: float = 0.5,
+    top_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """백엔드 유사도와 로컬 어휘 점수를 섞어 결과를 다시 정렬
+
+    점수 = (1 - lexical_weight) * 유사도 + lexical_weight * (BM25 + 식별자 겹침) / 2.
+    BM25는 후보 중 최댓값으로, 식별자 겹침은 질의 식별자 중 청크에 나오는 비율로 [0, 1]에
+    맞춘다. 각 결과에는 "rerank_score"가 붙고, 점수가 같으면 원래 순서를 유지한다.
+    """
+    if not results:
+        return []
+    weight = min(1.0, max(0.0, float(lexical_weight)))
+    contents = [f"{r.get('file_path') or ''}\n{r.get('content') or ''}" for r in results]
+
+    bm25 = bm25_scores(query_terms(query), contents)
+    top_bm25 = max(bm25) or 1.0
+
+    names = query_identifiers(query)
+    if names:
+        overlaps = [
+            sum(_has_identifier(name, content) for name in names) / len(names)
+            for content in contents
+        ]
+    else:
+        overlaps = [0.0] * len(results)
+
+    scores = []
+    for result, lexical, overlap in zip(results, bm25, overlaps):
+        similarity = min(1.0, max(0.0, float(result.get("similarity") or 0.0)))
+        scores.append((1 - weight) * similarity + weight * (lexical / top_bm25 + overlap) / 2)
+
+    order = sorted(range(len(results)), key=scores.__getitem__, reverse=True)
+    if top_k is not None:
+        order = order[:max(0, int(top_k))]
+    return [{**results[i], "rerank_score": round(scores[i], 4)} for i in order]
@@ -0,0 +1,143 @@
+"""
+Retry with backoff and per-endpoint circuit breaking for backend calls
+"""
+import random
+import time
+from typing import Optional
+import httpx
+
+# 재시도할 HTTP 상태 코드 (일시적인 과부하/게이트웨이 오류)
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 백엔드 호출 없이 즉시 실패"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(
+            f"Backend endpoint {endpoint} is unavailable "
+            f"(circuit open, retry in {retry_after:.1f}s)"
+        )
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """백엔드 장애로 볼 수 있는 오류인지 (연결 오류, 타임아웃, 5xx)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """재시도해볼 만한 일시적 오류인지"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+class RetryPolicy:
+    """지수 백오프 + full jitter 재시도 정책
+
+    attempt번째 재시도 전 대기 시간은 [0, min(max_delay, base_delay * 2^attempt)]
+    구간에서 무작위로 고른다. 응답에 Retry-After가 있으면 max_delay 이내에서 따른다.
+    """
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.2, max_delay: float = 5.0):
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """attempt번째(0부터) 시도가 error로 실패했을 때 재시도할지"""
+        return attempt < self.max_retries and is_retryable(error)
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """attempt번째 재시도 전 대기 시간 (초)"""
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    @staticmethod
+    def _retry_after(error: Optional[BaseException]) -> Optional[float]:
+        if not isinstance(error, httpx.HTTPStatusError):
+            return None
+        value = error.response.headers.get("retry-after")
+        try:
+            return max(0.0, float(value)) if value is not None else None
+        except ValueError:
+            return None
+
+
+class CircuitBreaker:
+    """엔드포인트 단위 circuit breaker (closed → open → half-open)
+
+    연속 실패가 failure_threshold에 도달하면 open 상태가 되어 reset_timeout 동안
+    즉시 실패한다. 이후 half-open 상태에서 한 번의 탐색 요청만 통과시키고, 성공하면
+    closed로, 실패하면 다시 open으로 돌아간다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_after(self) -> float:
+        """회로가 half-open이 될 때까지 남은 시간 (초)"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def available(self) -> bool:
+        """요청을 받을 수 있는 상태인지 (상태를 바꾸지 않는 allow())"""
+        if not self.enabled:
+            return True
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probing)
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지 (half-open에서는 탐색 요청 하나만 허용)"""
+        if not self.enabled:
+            return True
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """탐색 요청이 결과 없이 끝났을 때 (취소 등) 다음 탐색을 허용"""
+        self._probing = False
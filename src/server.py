@@ -1,31 +1,260 @@
 """
 MCP Server for code-embedding-ai
 """
-from mcp.server import Server
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import sys
+import weakref
+from mcp import types
+from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.shared.exceptions import McpError
 from typing import Any, Union
 import structlog
 from pydantic import AnyUrl
-from .api_client import FastAPIClient
+from .cache import TTLCache, estimate_size
 from .config import MCPConfig
+from .dedupe import DedupeResult, collapse_results, overfetch_k
+from .federation import federated_search
+from .metrics import metrics
+from .packing import PackResult, budget_chars, pack_results
+from .projects import ProjectIndex
+from .rerank import rerank_results
+from .sharding import create_api_client
+from .symbols import SymbolIndex
 
 logger = structlog.get_logger(__name__)
 
 # 설정 로드
 config = MCPConfig.from_file()
 
+
+class _Server(Server):
+    """리소스 목록 변경 알림을 기본으로 알리는 MCP 서버
+
+    HTTP 세션 매니저는 옵션 없이 create_initialization_options()를 호출하므로
+    stdio와 HTTP 세션이 같은 capability를 알리도록 기본값을 여기서 정한다.
+    """
+
+    def create_initialization_options(self, notification_options=None, experimental_capabilities=None):
+        return super().create_initialization_options(
+            notification_options or NotificationOptions(resources_changed=True),
+            experimental_capabilities
+        )
+
+
 # MCP 서버 인스턴스 생성
-app = Server("code-embedding-ai")
+app = _Server("code-embedding-ai")
 
 # API 클라이언트 인스턴스 (전역으로 유지)
-api_client = FastAPIClient(base_url=config.api.base_url)
+api_client = create_api_client(config.api)
+
+# 프로젝트 메타데이터 인덱스 (project://{id} 리소스 조회용)
+project_index = ProjectIndex(ttl=config.tools.project_index_ttl)
+
+# 로컬 심볼 인덱스 (get_function_implementation 정확 일치 조회용, 스냅샷은 첫 사용 시 로드)
+symbol_index = SymbolIndex(snapshot_path=config.tools.symbol_index_path or None)
+_symbols_loaded = False
+
+# 백그라운드 작업 참조 (GC 방지)
+_background_tasks: set = set()
+
+# 렌더링된 프롬프트 캐시 ((prompt, arguments) 기준)
+prompt_cache = TTLCache(ttl=config.tools.prompt_cache_ttl, max_entries=128)
+
+# 캐시 통계는 조회 시점에 읽음 (api_client 교체에도 따라가도록 전역 이름으로 참조)
+metrics.register_cache("search", lambda: api_client.cache_stats())
+metrics.register_cache("prompt", lambda: prompt_cache.stats())
+
+# 서버 메트릭 리소스 URI
+METRICS_URI = "metrics://server"
+METRICS_PROMETHEUS_URI = "metrics://server/prometheus"
+
+
+def _symbols() -> SymbolIndex:
+    """심볼 인덱스 (첫 사용 시 스냅샷 로드 - 시작 시 디스크 읽기로 initialize 응답이 늦어지지 않도록)"""
+    global _symbols_loaded
+    if not _symbols_loaded:
+        _symbols_loaded = True
+        loaded = symbol_index.load()
+        if loaded:
+            logger.info("Loaded symbols from snapshot", symbols=loaded)
+    return symbol_index
+
+
+def _format_search_result(r: dict) -> str:
+    """시맨틱 검색 결과 하나를 마크다운으로 포맷팅"""
+    return (
+        f"**{r.get('file_path', '')}** (lines {r.get('line_start')}-{r.get('line_end')}, "
+        f"similarity: {round(r.get('similarity', 0), 3)})\n"
+        f"Type: {r.get('chunk_type', '')}\n```\n{r.get('content', '')}\n```"
+    )
+
+
+def _format_search_results(results: list[dict]) -> str:
+    """시맨틱 검색 결과를 마크다운으로 포맷팅"""
+    return f"Found {len(results)} results:\n\n" + "\n\n".join(
+        _format_search_result(r) for r in results
+    )
+
+
+def _pack(results: list[dict], arguments: dict, query: str) -> PackResult:
+    """max_tokens / max_chars (또는 서버 기본값) 예산에 맞게 결과 패킹"""
+    max_chars = budget_chars(
+        max_tokens=arguments.get("max_tokens", config.tools.max_tokens),
+        max_chars=arguments.get("max_chars")
+    )
+    return pack_results(results, max_chars, query=query)
+
+
+def _with_budget_note(text: str, packed: PackResult) -> str:
+    """예산 때문에 잘리거나 제외된 결과가 있으면 안내 문구 추가"""
+    note = packed.summary()
+    return f"{text}\n\n{note}" if note else text
+
+
+def _with_shard_note(text: str, result: dict) -> str:
+    """응답하지 않은 백엔드 샤드가 있으면 부분 결과 안내 문구 추가"""
+    failed = result.get("failed_shards")
+    if not failed:
+        return text
+    return f"{text}\n\n_Partial results: backend shard(s) {', '.join(failed)} did not respond._"
+
+
+async def _resolve_symbol(
+    filters: dict,
+    query: str,
+    project_id: str | None,
+    deadline: float | None
+) -> tuple[str, list[dict]]:
+    """메타데이터 조회(정확 일치)와 시맨틱 검색(대체 결과)을 동시에 실행
+
+    메타데이터 결과가 도착하면 시맨틱 검색은 취소하고 바로 반환한다. 메타데이터가
+    비었거나 실패하면 deadline 안에 도착한 시맨틱 결과를 반환한다. deadline이 없거나
+    0 이하면 두 조회가 끝날 때까지 기다린다.
+
+    Returns:
+        ("exact" | "semantic" | "none", 결과 목록)
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline if deadline and deadline > 0 else None
+    metadata_task = asyncio.ensure_future(
+        api_client.search_by_metadata(filters=filters, top_k=5)
+    )
+    semantic_task = asyncio.ensure_future(
+        api_client.search_semantic(query=query, project_id=project_id, top_k=5, min_similarity=0.5)
+    )
+
+    try:
+        timeout = None if expires_at is None else max(0.0, expires_at - loop.time())
+        await asyncio.wait({metadata_task}, timeout=timeout)
+        metadata_error = None
+        if metadata_task.done():
+            metadata_error = metadata_task.exception()
+            if metadata_error is None and metadata_task.result().get("results"):
+                return "exact", metadata_task.result()["results"]
+            if metadata_error is not None:
+                logger.warning("Metadata lookup failed, using semantic fallback", error=str(metadata_error))
+
+        timeout = None if expires_at is None else max(0.0, expires_at - loop.time())
+        await asyncio.wait({semantic_task}, timeout=timeout)
+        if semantic_task.done() and semantic_task.exception() is None:
+            results = semantic_task.result().get("results") or []
+            if results:
+                return "semantic", results
+
+        if metadata_error is not None:
+            raise metadata_error
+        return "none", []
+    finally:
+        for task in (metadata_task, semantic_task):
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # 사용하지 않은 예외가 "never retrieved" 경고로 남지 않도록 소비
+                task.exception()
+
+
+async def _stream_search_results(arguments: dict, deadline: float | None = None) -> tuple[list[dict], bool]:
+    """검색 결과를 도착 순서대로 모으며 진행 상황 알림 전송
+
+    클라이언트가 progressToken을 보낸 경우 결과마다 progress 알림을 보내
+    전체 응답 전에 상위 결과를 확인할 수 있게 한다. deadline이 지나면 스트림을
+    닫고(백엔드 요청 취소) 그때까지 받은 결과를 반환한다.
+
+    Returns:
+        (도착한 결과 목록, deadline 초과 여부)
+    """
+    top_k = arguments.get("top_k", 10)
+    session = None
+    progress_token = None
+    try:
+        ctx = app.request_context
+        session = ctx.session
+        progress_token = ctx.meta.progressToken if ctx.meta else None
+    except LookupError:
+        pass
+
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline if deadline else None
+    stream = api_client.search_semantic_stream(
+        query=arguments["query"],
+        project_id=arguments.get("project_id"),
+        top_k=top_k,
+        min_similarity=arguments.get("min_similarity", 0.7)
+    )
+    results = []
+    timed_out = False
+    try:
+        while True:
+            timeout = None if expires_at is None else max(0.0, expires_at - loop.time())
+            try:
+                r = await asyncio.wait_for(stream.__anext__(), timeout)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                timed_out = True
+                break
+            results.append(r)
+            if progress_token is not None:
+                await session.send_progress_notification(
+                    progress_token,
+                    progress=len(results),
+                    total=top_k,
+                    message=f"{r.get('file_path', '')} (similarity: {round(r.get('similarity', 0), 3)})"
+                )
+    finally:
+        await stream.aclose()
+
+    if timed_out:
+        logger.warning("Streaming search deadline exceeded", deadline=deadline, partial=len(results))
+    return results, timed_out
+
+
+def _format_streamed_results(packed: PackResult, timed_out: bool, deadline: float | None) -> list[dict]:
+    """스트리밍 검색 결과(토큰 예산 적용 후)를 결과별 content item으로 포맷팅"""
+    items = [{"type": "text", "text": _format_search_result(r)} for r in packed.results]
+    budget_note = packed.summary()
+    if budget_note:
+        items.append({"type": "text", "text": budget_note})
+    if timed_out:
+        note = {"type": "text", "text": f"_Deadline of {deadline}s reached: returning {len(packed.results)} partial result(s)._"}
+        if not items:
+            return [{"type": "text", "text": "No results found before the deadline."}, note]
+        return [{"type": "text", "text": f"Found {len(packed.results)} results:"}] + items + [note]
+    if not items:
+        return [{"type": "text", "text": "No results found."}]
+    return [{"type": "text", "text": f"Found {len(packed.results)} results:"}] + items
 
 
 @app.list_tools()
 async def list_tools():
     """사용 가능한 도구 목록"""
-    return [
+    tools = [
         {
             "name": "search_code",
             "description": "코드베이스에서 시맨틱 검색으로 관련 코드 찾기",
@@ -49,11 +278,78 @@ async def list_tools():
                         "type": "number",
                         "description": "최소 유사도 (0.0-1.0)",
                         "default": 0.5
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "최대 실행 시간(초), 초과 시 백엔드 요청을 취소하고 시간 초과 안내 반환, stream 모드에서는 부분 결과 반환 (기본값: 서버 설정)"
+                    },
+                    "project_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "여러 프로젝트를 동시에 검색해 유사도 순으로 병합 (project_id 대신 사용)"
+                    },
+                    "project_tag": {
+                        "type": "string",
+                        "description": "태그가 붙은 프로젝트 전체를 검색 (설정 project_tags 또는 프로젝트 메타데이터 tags, project_ids와 함께 사용 가능)"
+                    },
+                    "concurrency": {
+                        "type": "number",
+                        "description": "여러 프로젝트 검색 시 최대 동시 요청 수 (기본값: 서버 설정)"
+                    },
+                    "stream": {
+                        "type": "boolean",
+                        "description": "결과를 도착 순서대로 개별 항목 + progress 알림으로 전달",
+                        "default": False
+                    },
+                    "max_tokens": {
+                        "type": "number",
+                        "description": "응답 토큰 예산 (초과 시 유사도 순으로 채우고 나머지는 잘라내거나 제외)"
+                    },
+                    "max_chars": {
+                        "type": "number",
+                        "description": "응답 문자 수 예산 (max_tokens와 함께 주면 더 작은 쪽 적용)"
                     }
                 },
                 "required": ["query"]
             }
         },
+        {
+            "name": "search_code_batch",
+            "description": "여러 검색 쿼리를 한 번에 동시 실행 (쿼리별 결과 반환)",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "검색 쿼리 목록 (중복은 한 번만 검색)"
+                    },
+                    "project_id": {
+                        "type": "string",
+                        "description": "프로젝트 ID (선택)"
+                    },
+                    "top_k": {
+                        "type": "number",
+                        "description": "쿼리별 반환할 최대 결과 수",
+                        "default": 10
+                    },
+                    "min_similarity": {
+                        "type": "number",
+                        "description": "최소 유사도 (0.0-1.0)",
+                        "default": 0.5
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "최대 실행 시간(초), 초과 시 완료된 쿼리 결과만 반환 (기본값: 서버 설정)"
+                    },
+                    "concurrency": {
+                        "type": "number",
+                        "description": "동시 실행할 최대 검색 수 (기본값: 서버 설정)"
+                    }
+                },
+                "required": ["queries"]
+            }
+        },
         {
             "name": "find_similar_code",
             "description": "특정 코드 스니펫과 유사한 코드 찾기 (리팩토링/중복 감지)",
@@ -76,6 +372,18 @@ async def list_tools():
                         "type": "number",
                         "description": "반환할 최대 결과 수",
                         "default": 5
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "최대 실행 시간(초), 초과 시 백엔드 요청을 취소하고 시간 초과 안내 반환 (기본값: 서버 설정)"
+                    },
+                    "max_tokens": {
+                        "type": "number",
+                        "description": "응답 토큰 예산 (초과 시 유사도 순으로 채우고 나머지는 잘라내거나 제외)"
+                    },
+                    "max_chars": {
+                        "type": "number",
+                        "description": "응답 문자 수 예산 (max_tokens와 함께 주면 더 작은 쪽 적용)"
                     }
                 },
                 "required": ["code_snippet", "language"]
@@ -95,9 +403,21 @@ async def list_tools():
                         "type": "string",
                         "description": "클래스 이름 (선택)"
                     },
+                    "deadline": {
+                        "type": "number",
+                        "description": "정확 일치가 없을 때 시맨틱 대체 결과를 기다릴 최대 시간(초)"
+                    },
                     "project_id": {
                         "type": "string",
                         "description": "프로젝트 ID (선택)"
+                    },
+                    "max_tokens": {
+                        "type": "number",
+                        "description": "응답 토큰 예산 (초과 시 유사도 순으로 채우고 나머지는 잘라내거나 제외)"
+                    },
+                    "max_chars": {
+                        "type": "number",
+                        "description": "응답 문자 수 예산 (max_tokens와 함께 주면 더 작은 쪽 적용)"
                     }
                 },
                 "required": ["function_name"]
@@ -117,6 +437,10 @@ async def list_tools():
             "inputSchema": {
                 "type": "object",
                 "properties": {
+                    "deadline": {
+                        "type": "number",
+                        "description": "최대 실행 시간(초), 초과 시 백엔드 요청을 취소하고 시간 초과 안내 반환 (기본값: 서버 설정)"
+                    },
                     "project_id": {
                         "type": "string",
                         "description": "프로젝트 ID"
@@ -124,161 +448,517 @@ async def list_tools():
                 },
                 "required": ["project_id"]
             }
+        },
+        {
+            "name": "server_metrics",
+            "description": "서버 메트릭 조회 (핸들러/백엔드별 지연 시간 p50/p95/p99, 동시 처리 수, 응답 크기, 오류, 캐시 적중률)",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "format": {
+                        "type": "string",
+                        "enum": ["json", "prometheus"],
+                        "description": "출력 형식",
+                        "default": "json"
+                    }
+                }
+            }
         }
     ]
+    for tool in tools:
+        if tool["name"] in _POSTPROCESSED_TOOLS:
+            tool["inputSchema"]["properties"]["dedupe"] = {
+                "type": "boolean",
+                "description": "내용이 같은 청크 제거 + 같은 파일의 겹치는 라인 범위 병합 (백엔드에서 더 받아 top_k를 채움, 기본값: 서버 설정)"
+            }
+            tool["inputSchema"]["properties"]["rerank"] = {
+                "type": "boolean",
+                "description": "top_k x N개를 받아 로컬 어휘 점수(BM25 + 식별자 겹침)로 다시 정렬 (기본값: 서버 설정)"
+            }
+        if tool["name"] in _STRUCTURED_TOOLS:
+            tool["inputSchema"]["properties"]["format"] = {
+                "type": "string",
+                "enum": list(OUTPUT_FORMATS),
+                "description": "출력 형식 - markdown: 사람이 읽는 텍스트, json: 백엔드 결과를 그대로 담은 structured content (기본값: 서버 설정)"
+            }
+    # SDK가 도구 정의를 이름으로 캐시하므로 Tool 모델로 반환
+    return [types.Tool(**tool) for tool in tools]
+
+
+# 도구 출력 형식 (json은 MCP structured content로 결과를 그대로 반환)
+OUTPUT_FORMATS = ("markdown", "json")
+
+# format 인자로 structured 출력을 지원하는 도구
+_STRUCTURED_TOOLS = (
+    "search_code",
+    "search_code_batch",
+    "find_similar_code",
+    "get_function_implementation",
+    "list_projects",
+    "get_project_stats"
+)
+
+# 결과 중복 제거/겹침 병합과 로컬 재정렬을 적용하는 도구
+_POSTPROCESSED_TOOLS = ("search_code", "search_code_batch", "find_similar_code")
+
+# 스스로 deadline을 적용하고 부분 결과를 반환하는 도구 (외부 wait_for로 감싸지 않음)
+_SELF_BOUNDED_TOOLS = ("search_code_batch", "get_function_implementation")
+
+
+def _tool_deadline(name: str, arguments: dict) -> float | None:
+    """도구 호출 deadline(초) - 인자 > 도구별 설정 > 심볼 조회 deadline(get_function_implementation)
+    > 기본 설정 순, 0 이하면 제한 없음"""
+    deadline = arguments.get("deadline")
+    if deadline is None:
+        deadline = config.tools.tool_deadlines.get(name)
+    if deadline is None and name == "get_function_implementation" and config.tools.symbol_lookup_deadline > 0:
+        deadline = config.tools.symbol_lookup_deadline
+    if deadline is None:
+        deadline = config.tools.tool_deadline
+    return float(deadline) if deadline and deadline > 0 else None
+
+
+def _structured_output(name: str, arguments: dict) -> bool:
+    """JSON(structured content)으로 응답할지 - 인자 > 서버 설정 순"""
+    if name not in _STRUCTURED_TOOLS:
+        return False
+    return (arguments.get("format") or config.tools.output_format) == "json"
 
 
 @app.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[Any]:
-    """도구 호출 핸들러"""
-    try:
-        if name == "search_code":
-            # 시맨틱 코드 검색
-            result = await api_client.search_semantic(
-                query=arguments["query"],
-                project_id=arguments.get("project_id"),
-                top_k=arguments.get("top_k", 10),
-                min_similarity=arguments.get("min_similarity", 0.7)
+async def call_tool(name: str, arguments: Any) -> Any:
+    """도구 호출 핸들러
+
+    deadline이 지나면 진행 중인 백엔드 요청을 취소하고, 가능한 도구는 그때까지 받은
+    부분 결과를 반환한다. MCP 요청이 취소되면 핸들러 취소가 같은 경로로 httpx 요청까지
+    전파된다. format이 json이면 결과 dict를 structured content로, 같은 내용의 압축
+    JSON을 텍스트로 함께 반환한다 (마크다운 변환 없음).
+    """
+    arguments = arguments or {}
+    deadline = _tool_deadline(name, arguments)
+    structured = _structured_output(name, arguments)
+    with metrics.track("tool", name) as span:
+        try:
+            handler = _call_tool(name, arguments, deadline, structured)
+            if deadline is None or name in _SELF_BOUNDED_TOOLS or arguments.get("stream"):
+                result = await handler
+            else:
+                result = await asyncio.wait_for(handler, deadline)
+
+        except asyncio.TimeoutError:
+            span.error = True
+            logger.warning("Tool deadline exceeded", tool=name, deadline=deadline)
+            message = (
+                f"Tool '{name}' timed out after {deadline}s without results. "
+                "Retry with a larger 'deadline' or a narrower query."
             )
+            result = {"error": message, "timed_out": True} if structured else [{"type": "text", "text": message}]
+
+        except Exception as e:
+            span.error = True
+            logger.error("Tool execution failed", tool=name, error=str(e))
+            message = f"Error executing tool '{name}': {str(e)}"
+            result = {"error": message} if structured else [{"type": "text", "text": message}]
+
+        if structured:
+            text = json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str)
+            span.response_bytes = len(text.encode("utf-8"))
+            return [types.TextContent(type="text", text=text)], result
+
+        span.response_bytes = estimate_size(result)
+        return result
+
+
+async def _federated_project_ids(arguments: dict) -> list[str]:
+    """project_ids와 project_tag(설정 project_tags + 프로젝트 메타데이터 tags)로 검색 대상 결정"""
+    project_ids = list(arguments.get("project_ids") or [])
+    tag = arguments.get("project_tag")
+    if tag:
+        if project_index.is_stale():
+            await _on_projects_refreshed(await project_index.refresh(api_client))
+        tagged = list(config.tools.project_tags.get(tag, [])) + project_index.tagged(tag)
+        if not tagged:
+            raise ValueError(f"No projects tagged '{tag}'")
+        project_ids += tagged
+    return list(dict.fromkeys(project_ids))
+
+
+async def _federated_search_code(arguments: dict, structured: bool) -> Any:
+    """여러 프로젝트에 걸친 search_code"""
+    project_ids = await _federated_project_ids(arguments)
+    top_k = arguments.get("top_k", 10)
+    result = await federated_search(
+        api_client,
+        query=arguments["query"],
+        project_ids=project_ids,
+        top_k=_fetch_k(arguments, top_k),
+        min_similarity=arguments.get("min_similarity", 0.7),
+        concurrency=arguments.get("concurrency", config.tools.federated_concurrency)
+    )
+    deduped = _postprocess(result["results"], arguments, top_k, arguments["query"])
+    packed = _pack(deduped.results, arguments, arguments["query"])
+    failed = result.get("failed_projects")
+
+    if structured:
+        output = {
+            "results": packed.results,
+            "searched": result["searched"],
+            "pruned": result["pruned"],
+            **deduped.details(),
+            **_budget_details(packed)
+        }
+        if failed:
+            output["failed_projects"] = failed
+        return output
+
+    if not packed.results:
+        text = f"No results found in {len(project_ids)} project(s)."
+    else:
+        text = _with_budget_note(
+            f"Found {len(packed.results)} results across {len(project_ids)} project(s):\n\n" +
+            "\n\n".join(f"[{r['project_id']}] {_format_search_result(r)}" for r in packed.results),
+            packed
+        )
+    if failed:
+        text += f"\n\n_Partial results: project(s) {', '.join(failed)} could not be searched._"
+    return [{"type": "text", "text": text}]
+
+
+def _enabled(arguments: dict, name: str, default: bool) -> bool:
+    value = arguments.get(name)
+    return default if value is None else bool(value)
+
+
+def _fetch_k(arguments: dict, top_k: int) -> int:
+    """백엔드에 요청할 결과 수 (중복 제거/재정렬 시 top_k를 다시 채우고 후보를 넓힐 만큼 더 요청)"""
+    fetch_k = top_k
+    if _enabled(arguments, "dedupe", config.tools.dedupe_results):
+        fetch_k = overfetch_k(top_k, config.tools.dedupe_overfetch)
+    if _enabled(arguments, "rerank", config.tools.rerank):
+        fetch_k = max(fetch_k, overfetch_k(top_k, config.tools.rerank_overfetch))
+    return fetch_k
+
+
+def _postprocess(results: list[dict], arguments: dict, top_k: int, query: str) -> DedupeResult:
+    """중복/겹치는 청크 정리 → 로컬 재정렬 → 상위 top_k개"""
+    if _enabled(arguments, "dedupe", config.tools.dedupe_results):
+        processed = collapse_results(results)
+    else:
+        processed = DedupeResult(results=list(results))
+    if _enabled(arguments, "rerank", config.tools.rerank):
+        processed.results = rerank_results(
+            processed.results, query, lexical_weight=config.tools.rerank_lexical_weight
+        )
+    processed.results = processed.results[:top_k]
+    return processed
+
+
+def _symbol_suggestions(function_name: str, project_id: str | None) -> list[str]:
+    """이름이 비슷한 알려진 심볼 (대소문자 무시 일치 / 접두사, 중복 제거)"""
+    suggestions = [e["name"] for e in _symbols().lookup(
+        function_name, project_id=project_id, case_insensitive=True
+    )]
+    suggestions += _symbols().prefix(function_name, project_id=project_id, limit=5)
+    return list(dict.fromkeys(suggestions))
+
+
+def _budget_details(packed: PackResult) -> dict:
+    """structured 출력용 토큰 예산 적용 내역 (변경이 없으면 빈 dict)"""
+    if not packed.dropped and not packed.trimmed:
+        return {}
+    return {
+        "budget": {
+            "trimmed": packed.trimmed,
+            "dropped": [
+                {"file_path": r.get("file_path", ""), "line_start": r.get("line_start"), "line_end": r.get("line_end")}
+                for r in packed.dropped
+            ]
+        }
+    }
+
+
+def _shard_details(result: dict) -> dict:
+    """structured 출력용 응답하지 않은 샤드 목록 (없으면 빈 dict)"""
+    failed = result.get("failed_shards")
+    return {"failed_shards": failed} if failed else {}
+
+
+async def _call_tool(name: str, arguments: dict, deadline: float | None, structured: bool = False) -> Any:
+    """도구별 처리 (structured면 마크다운 대신 결과 dict 반환)"""
+    if name == "search_code":
+        if arguments.get("project_ids") or arguments.get("project_tag"):
+            # 여러 프로젝트 동시 검색 + 병합
+            return await _federated_search_code(arguments, structured)
+
+        if arguments.get("stream"):
+            # 결과를 도착하는 대로 개별 항목으로 전달
+            results, timed_out = await _stream_search_results(arguments, deadline)
+            packed = _pack(results, arguments, arguments["query"])
+            if structured:
+                return {"results": packed.results, "partial": timed_out, **_budget_details(packed)}
+            return _format_streamed_results(packed, timed_out, deadline)
+
+        # 시맨틱 코드 검색 (중복 제거로 빠지는 만큼 더 받아 top_k를 채움)
+        top_k = arguments.get("top_k", 10)
+        result = await api_client.search_semantic(
+            query=arguments["query"],
+            project_id=arguments.get("project_id"),
+            top_k=_fetch_k(arguments, top_k),
+            min_similarity=arguments.get("min_similarity", 0.7)
+        )
+        deduped = _postprocess(result.get("results") or [], arguments, top_k, arguments["query"])
 
-            # 결과 포맷팅
-            if result.get("results"):
-                formatted_results = []
-                for r in result["results"]:
-                    formatted_results.append({
-                        "file_path": r.get("file_path", ""),
-                        "chunk_type": r.get("chunk_type", ""),
-                        "content": r.get("content", ""),
-                        "similarity": round(r.get("similarity", 0), 3),
-                        "line_start": r.get("line_start"),
-                        "line_end": r.get("line_end")
-                    })
-
-                return [{
-                    "type": "text",
-                    "text": f"Found {len(formatted_results)} results:\n\n" +
-                           "\n\n".join([
-                               f"**{r['file_path']}** (lines {r['line_start']}-{r['line_end']}, similarity: {r['similarity']})\n"
-                               f"Type: {r['chunk_type']}\n```\n{r['content']}\n```"
-                               for r in formatted_results
-                           ])
-                }]
-            else:
-                return [{"type": "text", "text": "No results found."}]
+        if structured:
+            packed = _pack(deduped.results, arguments, arguments["query"])
+            return {
+                "results": packed.results,
+                **deduped.details(),
+                **_budget_details(packed),
+                **_shard_details(result)
+            }
 
-        elif name == "find_similar_code":
-            # 유사 코드 검색
-            result = await api_client.find_similar_code(
-                code_snippet=arguments["code_snippet"],
-                language=arguments["language"],
-                project_id=arguments.get("project_id"),
-                top_k=arguments.get("top_k", 5)
-            )
+        # 결과 포맷팅 (토큰 예산 적용)
+        if deduped.results:
+            packed = _pack(deduped.results, arguments, arguments["query"])
+            return [{
+                "type": "text",
+                "text": _with_shard_note(
+                    _with_budget_note(_format_search_results(packed.results), packed),
+                    result
+                )
+            }]
+        else:
+            return [{"type": "text", "text": "No results found."}]
+
+    elif name == "search_code_batch":
+        # 여러 쿼리 동시 검색
+        queries = arguments["queries"]
+        top_k = arguments.get("top_k", 10)
+        batch_results = await api_client.search_semantic_batch(
+            queries=queries,
+            project_id=arguments.get("project_id"),
+            top_k=_fetch_k(arguments, top_k),
+            min_similarity=arguments.get("min_similarity", 0.7),
+            concurrency=arguments.get("concurrency", config.tools.batch_concurrency),
+            deadline=deadline
+        )
 
-            if result.get("results"):
-                formatted_results = []
-                for r in result["results"]:
-                    formatted_results.append({
-                        "file_path": r.get("file_path", ""),
-                        "content": r.get("content", ""),
-                        "similarity": round(r.get("similarity", 0), 3),
-                        "line_start": r.get("line_start"),
-                        "line_end": r.get("line_end")
-                    })
-
-                return [{
-                    "type": "text",
-                    "text": f"Found {len(formatted_results)} similar code snippets:\n\n" +
-                           "\n\n".join([
-                               f"**{r['file_path']}** (lines {r['line_start']}-{r['line_end']}, similarity: {r['similarity']})\n```\n{r['content']}\n```"
-                               for r in formatted_results
-                           ])
-                }]
+        deduped = {
+            query: _postprocess(result.get("results") or [], arguments, top_k, query)
+            for query, result in batch_results.items()
+            if not isinstance(result, Exception)
+        }
+
+        if structured:
+            return {"queries": [
+                {"query": query, "error": str(result)} if isinstance(result, Exception)
+                else {
+                    "query": query,
+                    "results": deduped[query].results,
+                    **deduped[query].details(),
+                    **_shard_details(result)
+                }
+                for query, result in batch_results.items()
+            ]}
+
+        sections = []
+        for i, (query, result) in enumerate(batch_results.items(), 1):
+            if isinstance(result, Exception):
+                body = f"Error: {str(result)}"
+            elif deduped[query].results:
+                body = _format_search_results(deduped[query].results)
             else:
-                return [{"type": "text", "text": "No similar code found."}]
+                body = "No results found."
+            sections.append(f"## Query {i}: {query}\n\n{body}")
 
-        elif name == "get_function_implementation":
-            # 함수 이름으로 검색
-            function_name = arguments["function_name"]
-            class_name = arguments.get("class_name")
+        return [{
+            "type": "text",
+            "text": f"Batch search ({len(batch_results)} queries):\n\n" +
+                   "\n\n".join(sections)
+        }]
 
-            # 검색 쿼리 구성
-            if class_name:
-                query = f"class {class_name} function {function_name}"
-            else:
-                query = f"function {function_name}"
+    elif name == "find_similar_code":
+        # 유사 코드 검색
+        top_k = arguments.get("top_k", 5)
+        result = await api_client.find_similar_code(
+            code_snippet=arguments["code_snippet"],
+            language=arguments["language"],
+            project_id=arguments.get("project_id"),
+            top_k=_fetch_k(arguments, top_k)
+        )
+        deduped = _postprocess(result.get("results") or [], arguments, top_k, arguments["code_snippet"])
 
-            # 메타데이터 필터로 함수 검색
-            filters = {
-                "chunk_type": "function",
-                "name": function_name
+        if structured:
+            packed = _pack(deduped.results, arguments, arguments["code_snippet"])
+            return {
+                "results": packed.results,
+                **deduped.details(),
+                **_budget_details(packed),
+                **_shard_details(result)
             }
-            if class_name:
-                filters["class_name"] = class_name
 
-            result = await api_client.search_by_metadata(
-                filters=filters,
-                top_k=5
-            )
+        if deduped.results:
+            packed = _pack(deduped.results, arguments, arguments["code_snippet"])
+            formatted_results = []
+            for r in packed.results:
+                formatted_results.append({
+                    "file_path": r.get("file_path", ""),
+                    "content": r.get("content", ""),
+                    "similarity": round(r.get("similarity", 0), 3),
+                    "line_start": r.get("line_start"),
+                    "line_end": r.get("line_end")
+                })
+
+            return [{
+                "type": "text",
+                "text": _with_shard_note(
+                    _with_budget_note(
+                        f"Found {len(formatted_results)} similar code snippets:\n\n" +
+                        "\n\n".join([
+                            f"**{r['file_path']}** (lines {r['line_start']}-{r['line_end']}, similarity: {r['similarity']})\n```\n{r['content']}\n```"
+                            for r in formatted_results
+                        ]),
+                        packed
+                    ),
+                    result
+                )
+            }]
+        else:
+            return [{"type": "text", "text": "No similar code found."}]
 
-            if result.get("results"):
-                formatted_results = []
-                for r in result["results"]:
-                    formatted_results.append({
-                        "file_path": r.get("file_path", ""),
-                        "content": r.get("content", ""),
-                        "line_start": r.get("line_start"),
-                        "line_end": r.get("line_end")
-                    })
-
-                return [{
-                    "type": "text",
-                    "text": f"Found {len(formatted_results)} implementations:\n\n" +
-                           "\n\n".join([
-                               f"**{r['file_path']}** (lines {r['line_start']}-{r['line_end']})\n```\n{r['content']}\n```"
-                               for r in formatted_results
-                           ])
-                }]
-            else:
-                return [{"type": "text", "text": f"Function '{function_name}' not found."}]
+    elif name == "get_function_implementation":
+        # 함수 이름으로 검색
+        function_name = arguments["function_name"]
+        class_name = arguments.get("class_name")
 
-        elif name == "list_projects":
-            # 프로젝트 목록 조회
-            result = await api_client.list_projects()
+        # 검색 쿼리 구성
+        if class_name:
+            query = f"class {class_name} function {function_name}"
+        else:
+            query = f"function {function_name}"
 
-            if result.get("projects"):
-                projects_text = "\n".join([
-                    f"- **{p['name']}** (ID: {p['id']})\n  Path: {p.get('path', 'N/A')}"
-                    for p in result["projects"]
-                ])
-                return [{
-                    "type": "text",
-                    "text": f"Registered projects ({len(result['projects'])}):\n\n{projects_text}"
-                }]
-            else:
-                return [{"type": "text", "text": "No projects registered."}]
+        # 메타데이터 필터로 함수 검색
+        filters = {
+            "chunk_type": "function",
+            "name": function_name
+        }
+        if class_name:
+            filters["class_name"] = class_name
+        if arguments.get("project_id"):
+            filters["project_id"] = arguments["project_id"]
+
+        # 로컬 심볼 인덱스가 이 조회 범위의 전체 답을 갖고 있으면 백엔드 호출 없이 반환
+        local_hits = []
+        if _symbols().covers(function_name, class_name, arguments.get("project_id")):
+            local_hits = _symbols().lookup(function_name, class_name, arguments.get("project_id"))
+        if local_hits and all(e.get("content") for e in local_hits):
+            match_type, results = "exact", local_hits
+        else:
+            # 메타데이터 조회와 시맨틱 검색을 동시에 실행, 정확히 일치하는 결과 우선
+            match_type, results = await _resolve_symbol(
+                filters=filters,
+                query=query,
+                project_id=arguments.get("project_id"),
+                deadline=deadline
+            )
+            if match_type == "exact":
+                _symbols().observe(
+                    results,
+                    project_id=arguments.get("project_id"),
+                    name=function_name,
+                    class_name=class_name,
+                    complete=True
+                )
 
-        elif name == "get_project_stats":
-            # 프로젝트 통계 조회
-            result = await api_client.get_project_stats(arguments["project_id"])
+        if structured:
+            packed = _pack(results, arguments, query)
+            output = {"function_name": function_name, "match": match_type, "results": packed.results}
+            if match_type == "none":
+                output["suggestions"] = _symbol_suggestions(function_name, arguments.get("project_id"))
+            return {**output, **_budget_details(packed)}
+
+        if match_type == "semantic":
+            packed = _pack(results, arguments, query)
+            return [{
+                "type": "text",
+                "text": _with_budget_note(
+                    f"No exact match for '{function_name}'. Closest semantic matches:\n\n" +
+                    "\n\n".join(_format_search_result(r) for r in packed.results),
+                    packed
+                )
+            }]
+
+        result = {"results": results}
+        if result.get("results"):
+            packed = _pack(result["results"], arguments, query)
+            formatted_results = []
+            for r in packed.results:
+                formatted_results.append({
+                    "file_path": r.get("file_path", ""),
+                    "content": r.get("content", ""),
+                    "line_start": r.get("line_start"),
+                    "line_end": r.get("line_end")
+                })
+
+            return [{
+                "type": "text",
+                "text": _with_budget_note(
+                    f"Found {len(formatted_results)} implementations:\n\n" +
+                    "\n\n".join([
+                        f"**{r['file_path']}** (lines {r['line_start']}-{r['line_end']})\n```\n{r['content']}\n```"
+                        for r in formatted_results
+                    ]),
+                    packed
+                )
+            }]
+        else:
+            text = f"Function '{function_name}' not found."
+            suggestions = _symbol_suggestions(function_name, arguments.get("project_id"))
+            if suggestions:
+                text += f" Did you mean: {', '.join(suggestions)}?"
+            return [{"type": "text", "text": text}]
+
+    elif name == "list_projects":
+        # 프로젝트 목록 조회
+        result = await api_client.list_projects()
+        await _on_projects_refreshed(project_index.replace_all(result.get("projects") or []))
+        if structured:
+            return {"projects": result.get("projects") or [], **_shard_details(result)}
+
+        if result.get("projects"):
+            projects_text = "\n".join([
+                f"- **{p['name']}** (ID: {p['id']})\n  Path: {p.get('path', 'N/A')}"
+                for p in result["projects"]
+            ])
+            return [{
+                "type": "text",
+                "text": f"Registered projects ({len(result['projects'])}):\n\n{projects_text}"
+            }]
+        else:
+            return [{"type": "text", "text": "No projects registered."}]
 
-            stats_text = f"""Project Statistics:
+    elif name == "get_project_stats":
+        # 프로젝트 통계 조회
+        result = await api_client.get_project_stats(arguments["project_id"])
+        if structured:
+            return result
+
+        stats_text = f"""Project Statistics:
 - Total chunks: {result.get('total_chunks', 0)}
 - Total files: {result.get('total_files', 0)}
 - Languages: {', '.join(result.get('languages', []))}
 - Chunk types: {', '.join(result.get('chunk_types', []))}
 """
-            return [{"type": "text", "text": stats_text}]
+        return [{"type": "text", "text": stats_text}]
 
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+    elif name == "server_metrics":
+        # 서버 메트릭 조회
+        if arguments.get("format") == "prometheus":
+            return [{"type": "text", "text": metrics.prometheus()}]
+        return [{"type": "text", "text": json.dumps(metrics.snapshot(), indent=2)}]
 
-    except Exception as e:
-        logger.error("Tool execution failed", tool=name, error=str(e))
-        return [{
-            "type": "text",
-            "text": f"Error executing tool '{name}': {str(e)}"
-        }]
+    else:
+        raise ValueError(f"Unknown tool: {name}")
 
 
 @app.list_prompts()
@@ -373,20 +1053,79 @@ async def list_prompts() -> list[dict]:
     ]
 
 
+async def _gather_context(failures: list[str], *sources) -> list:
+    """프롬프트 컨텍스트 소스를 동시에 조회 (실패한 소스는 기본값으로 대체하고 failures에 기록)
+
+    소스는 awaitable(실패 시 {}) 또는 (awaitable, 기본값) 쌍이다. 문자열을 돌려주는 소스는
+    기본값을 ""로 지정해 프롬프트에 "{}"가 찍히지 않게 한다.
+    """
+    pairs = [source if isinstance(source, tuple) else (source, {}) for source in sources]
+    results = await asyncio.gather(*(awaitable for awaitable, _ in pairs), return_exceptions=True)
+    context = []
+    for result, (_, default) in zip(results, pairs):
+        if isinstance(result, Exception):
+            logger.warning("Prompt context source failed", error=str(result))
+            failures.append(str(result))
+            result = default
+        context.append(result)
+    return context
+
+
+async def _project_context(project_id: str | None) -> str:
+    """프롬프트에 넣을 프로젝트 요약 (project_id가 없으면 빈 문자열)"""
+    if not project_id:
+        return ""
+    stats = await api_client.get_project_stats(project_id)
+    return (
+        f"\nProject context: {stats.get('total_files', 0)} files, "
+        f"{stats.get('total_chunks', 0)} chunks, "
+        f"languages: {', '.join(stats.get('languages', [])) or 'unknown'}\n"
+    )
+
+
 @app.get_prompt()
 async def get_prompt(name: str, arguments: dict) -> dict:
-    """프롬프트 템플릿 가져오기"""
+    """프롬프트 템플릿 가져오기 (같은 인자의 결과는 TTL 동안 캐시)"""
+    with metrics.track("prompt", name) as span:
+        cache_key = (name, tuple(sorted((arguments or {}).items())))
+        prompt = prompt_cache.get(cache_key)
+        if prompt is None:
+            prompt, complete = await _render_prompt(name, arguments)
+            # 컨텍스트 소스가 실패한 프롬프트는 캐시하지 않음 (일시적 오류가 TTL 동안 남지 않도록)
+            if complete:
+                prompt_cache.set(cache_key, prompt)
+        span.response_bytes = estimate_size(prompt)
+        return prompt
+
+
+async def _render_prompt(name: str, arguments: dict) -> tuple[dict, bool]:
+    """프롬프트 템플릿 생성
+
+    Returns:
+        (프롬프트, 모든 컨텍스트 소스가 성공했는지)
+    """
+    failures: list[str] = []
+    prompt = await _build_prompt(name, arguments, failures)
+    return prompt, not failures
+
+
+async def _build_prompt(name: str, arguments: dict, failures: list[str]) -> dict:
+    """프롬프트 템플릿 생성 (실패한 컨텍스트 소스는 failures에 기록)"""
     try:
         if name == "code-review":
             code_query = arguments["code_query"]
             project_id = arguments.get("project_id")
 
-            # 관련 코드 검색
-            search_result = await api_client.search_semantic(
-                query=code_query,
-                project_id=project_id,
-                top_k=5,
-                min_similarity=0.7
+            # 관련 코드 검색 + 프로젝트 정보 동시 조회
+            search_result, project_context = await _gather_context(
+                failures,
+                api_client.search_semantic(
+                    query=code_query,
+                    project_id=project_id,
+                    top_k=5,
+                    min_similarity=0.7
+                ),
+                (_project_context(project_id), "")
             )
 
             code_sections = []
@@ -397,7 +1136,7 @@ async def get_prompt(name: str, arguments: dict) -> dict:
                     )
 
             prompt_text = f"""You are conducting a code review for: {code_query}
-
+{project_context}
 Here is the relevant code found in the codebase:
 
 {chr(10).join(code_sections) if code_sections else "No relevant code found."}
@@ -429,12 +1168,16 @@ Provide specific, actionable feedback."""
             language = arguments["language"]
             project_id = arguments.get("project_id")
 
-            # 유사한 코드 검색
-            similar_result = await api_client.find_similar_code(
-                code_snippet=code_snippet,
-                language=language,
-                project_id=project_id,
-                top_k=5
+            # 유사한 코드 검색 + 프로젝트 정보 동시 조회
+            similar_result, project_context = await _gather_context(
+                failures,
+                api_client.find_similar_code(
+                    code_snippet=code_snippet,
+                    language=language,
+                    project_id=project_id,
+                    top_k=5
+                ),
+                (_project_context(project_id), "")
             )
 
             similar_sections = []
@@ -445,7 +1188,7 @@ Provide specific, actionable feedback."""
                     )
 
             prompt_text = f"""You are refactoring the following code:
-
+{project_context}
 ```{language}
 {code_snippet}
 ```
@@ -480,12 +1223,16 @@ Provide refactored code with explanations."""
             bug_description = arguments["bug_description"]
             project_id = arguments.get("project_id")
 
-            # 버그 관련 코드 검색
-            search_result = await api_client.search_semantic(
-                query=f"bug: {bug_description}",
-                project_id=project_id,
-                top_k=5,
-                min_similarity=0.6
+            # 버그 관련 코드 검색 + 프로젝트 정보 동시 조회
+            search_result, project_context = await _gather_context(
+                failures,
+                api_client.search_semantic(
+                    query=f"bug: {bug_description}",
+                    project_id=project_id,
+                    top_k=5,
+                    min_similarity=0.6
+                ),
+                (_project_context(project_id), "")
             )
 
             code_sections = []
@@ -496,7 +1243,7 @@ Provide refactored code with explanations."""
                     )
 
             prompt_text = f"""You are debugging the following issue:
-
+{project_context}
 **Bug Description:** {bug_description}
 
 Potentially relevant code:
@@ -528,10 +1275,24 @@ Provide clear, actionable debugging steps and a proposed fix."""
             function_or_class = arguments["function_or_class"]
             project_id = arguments.get("project_id")
 
-            # 함수/클래스 구현 검색
-            search_result = await api_client.search_by_metadata(
-                filters={"name": function_or_class},
-                top_k=3
+            # 함수/클래스 구현 + 기존 테스트 + 프로젝트 정보 동시 조회
+            filters = {"name": function_or_class}
+            if project_id:
+                filters["project_id"] = project_id
+
+            search_result, tests_result, project_context = await _gather_context(
+                failures,
+                api_client.search_by_metadata(
+                    filters=filters,
+                    top_k=3
+                ),
+                api_client.search_semantic(
+                    query=f"tests for {function_or_class}",
+                    project_id=project_id,
+                    top_k=3,
+                    min_similarity=0.6
+                ),
+                (_project_context(project_id), "")
             )
 
             code_sections = []
@@ -541,12 +1302,23 @@ Provide clear, actionable debugging steps and a proposed fix."""
                         f"File: {r['file_path']}\n```\n{r['content']}\n```"
                     )
 
-            prompt_text = f"""You are writing tests for: {function_or_class}
+            test_sections = []
+            if tests_result.get("results"):
+                for r in tests_result["results"]:
+                    test_sections.append(
+                        f"File: {r['file_path']} (lines {r['line_start']}-{r['line_end']})\n```\n{r['content']}\n```"
+                    )
 
+            prompt_text = f"""You are writing tests for: {function_or_class}
+{project_context}
 Implementation found:
 
 {chr(10).join(code_sections) if code_sections else "Implementation not found. Please provide the code manually."}
 
+Existing related tests:
+
+{chr(10).join(test_sections) if test_sections else "No existing tests found."}
+
 Please write comprehensive tests:
 1. **Unit tests**: Test individual functions/methods
 2. **Edge cases**: Test boundary conditions and edge cases
@@ -573,12 +1345,16 @@ Provide test code with clear assertions and descriptions."""
             code_description = arguments["code_description"]
             project_id = arguments.get("project_id")
 
-            # 코드 검색
-            search_result = await api_client.search_semantic(
-                query=code_description,
-                project_id=project_id,
-                top_k=3,
-                min_similarity=0.7
+            # 코드 검색 + 프로젝트 정보 동시 조회
+            search_result, project_context = await _gather_context(
+                failures,
+                api_client.search_semantic(
+                    query=code_description,
+                    project_id=project_id,
+                    top_k=3,
+                    min_similarity=0.7
+                ),
+                (_project_context(project_id), "")
             )
 
             code_sections = []
@@ -589,7 +1365,7 @@ Provide test code with clear assertions and descriptions."""
                     )
 
             prompt_text = f"""Please explain how this code works: {code_description}
-
+{project_context}
 Code found:
 
 {chr(10).join(code_sections) if code_sections else "Code not found. Try a different search query."}
@@ -624,16 +1400,110 @@ Make the explanation accessible to developers unfamiliar with this code."""
         raise
 
 
-@app.list_resources()
-async def list_resources() -> list[dict]:
-    """사용 가능한 리소스 목록"""
+def _encode_cursor(version: str, offset: int) -> str:
+    """리소스 페이지 커서 인코딩"""
+    raw = json.dumps({"v": version, "o": offset}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """리소스 페이지 커서 디코딩 (version, offset)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return data["v"], int(data["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _current_session():
+    """현재 요청의 MCP 세션 (요청 컨텍스트 밖이면 None)"""
     try:
-        # 프로젝트 목록 가져오기
-        projects_result = await api_client.list_projects()
-        resources = []
+        return app.request_context.session
+    except LookupError:
+        return None
+
 
-        if projects_result.get("projects"):
-            for project in projects_result["projects"]:
+# 리소스 목록을 조회한 세션 (목록 변경 알림 대상)
+_resource_sessions: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+async def _notify_resources_changed() -> None:
+    """리소스 목록을 조회한 세션에 resources/list_changed 알림 전송"""
+    for session in list(_resource_sessions):
+        try:
+            await session.send_resource_list_changed()
+        except Exception as e:
+            logger.warning("Failed to send resource list change", error=str(e))
+            _resource_sessions.discard(session)
+
+
+async def _refresh_symbols(project_id: str) -> None:
+    """재인덱싱된 프로젝트의 심볼을 백엔드에서 다시 적재"""
+    try:
+        count = await _symbols().refresh_project(api_client, project_id)
+        logger.info("Symbol index refreshed", project_id=project_id, symbols=count)
+    except Exception as e:
+        logger.warning("Symbol index refresh failed", project_id=project_id, error=str(e))
+
+
+async def _on_projects_refreshed(changed: bool) -> None:
+    """프로젝트 목록 갱신 후처리 (심볼 인덱스 버전 동기화, 리소스 변경 알림)"""
+    for project_id in _symbols().sync_versions(project_index.projects()):
+        task = asyncio.create_task(_refresh_symbols(project_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    if changed:
+        await _notify_resources_changed()
+
+
+async def _watch_projects(interval: float) -> None:
+    """프로젝트 목록을 주기적으로 확인해 변경 시 알림 (리소스를 조회한 세션이 있을 때만)"""
+    while True:
+        await asyncio.sleep(interval)
+        if not _resource_sessions:
+            continue
+        try:
+            await _on_projects_refreshed(await project_index.refresh(api_client))
+        except Exception as e:
+            logger.warning("Project watch failed", error=str(e))
+
+
+@app.list_resources()
+async def list_resources(request: types.ListResourcesRequest) -> types.ListResourcesResult:
+    """사용 가능한 리소스 목록 (커서 기반 페이지네이션)
+
+    프로젝트 목록 스냅샷은 TTL 동안 재사용하며, 커서에는 스냅샷 버전과 offset이 담긴다.
+    서버 메트릭 리소스는 마지막 페이지 끝에 붙는다.
+    """
+    with metrics.track("resource", "list") as span:
+        # 잘못된 커서는 빈 페이지가 아니라 invalid params 오류로 응답
+        cursor = request.params.cursor if request.params else None
+        try:
+            version, offset = _decode_cursor(cursor) if cursor else (None, 0)
+        except ValueError as e:
+            span.error = True
+            raise McpError(types.ErrorData(code=types.INVALID_PARAMS, message=str(e))) from e
+
+        try:
+            session = _current_session()
+            if session is not None:
+                _resource_sessions.add(session)
+
+            # 스냅샷이 만료된 경우에만 프로젝트 목록 갱신
+            if project_index.is_stale():
+                await _on_projects_refreshed(await project_index.refresh(api_client))
+
+            # 페이지 사이에 목록이 바뀌면 이전 offset이 다른 항목을 가리키므로 처음부터 다시 받게 함
+            if cursor and version != project_index.version:
+                logger.info("Resource list changed during pagination", cursor_version=version)
+                raise McpError(types.ErrorData(
+                    code=types.INVALID_PARAMS,
+                    message="Stale cursor: the resource list changed, restart from the first page"
+                ))
+
+            page_size = max(1, config.tools.resources_page_size)
+            resources = []
+            for project in project_index.page(offset, page_size):
                 project_id = project["id"]
                 project_name = project["name"]
 
@@ -653,87 +1523,256 @@ async def list_resources() -> list[dict]:
                     }
                 ])
 
-        return resources
+            next_offset = offset + page_size
+            next_cursor = None
+            if next_offset < len(project_index):
+                next_cursor = _encode_cursor(project_index.version, next_offset)
+            else:
+                resources.append({
+                    "uri": METRICS_URI,
+                    "name": "Server metrics",
+                    "description": "Per-handler latency percentiles, in-flight counts, payload sizes, errors and cache hit rates",
+                    "mimeType": "application/json"
+                })
 
-    except Exception as e:
-        logger.error("Failed to list resources", error=str(e))
-        return []
+            result = types.ListResourcesResult(resources=resources, nextCursor=next_cursor)
+
+        except McpError:
+            span.error = True
+            raise
+        except Exception as e:
+            span.error = True
+            logger.error("Failed to list resources", error=str(e))
+            result = types.ListResourcesResult(resources=[])
+
+        span.response_bytes = estimate_size(result.model_dump(mode="json"))
+        return result
+
+
+def _resource_route(uri_str: str) -> str:
+    """메트릭 라벨로 쓰는 리소스 URI 템플릿"""
+    if uri_str.startswith("project://"):
+        return "project://{id}/stats" if uri_str.endswith("/stats") else "project://{id}"
+    if uri_str in (METRICS_URI, METRICS_PROMETHEUS_URI):
+        return uri_str
+    return "unknown"
 
 
 @app.read_resource()
 async def read_resource(uri: AnyUrl) -> list[ReadResourceContents]:
     """리소스 읽기"""
-    import sys
-    import json
-    try:
-        # URI를 문자열로 변환
-        print(f"[DEBUG] Received URI: {uri}, type: {type(uri)}", file=sys.stderr, flush=True)
+    # AnyUrl 객체의 경우 unicode_string() 메서드 사용
+    if hasattr(uri, 'unicode_string'):
+        uri_str = uri.unicode_string()
+    else:
+        uri_str = str(uri)
+    logger.debug("Reading resource", uri=uri_str)
+
+    with metrics.track("resource", _resource_route(uri_str)) as span:
+        try:
+            contents = await _read_resource(uri_str)
+        except Exception as e:
+            logger.error("Failed to read resource", uri=uri_str, error=str(e))
+            raise
+        span.response_bytes = sum(len(c.content) for c in contents)
+        return contents
+
+
+async def _read_resource(uri_str: str) -> list[ReadResourceContents]:
+    """URI별 리소스 내용 생성"""
+    if uri_str == METRICS_URI:
+        content = json.dumps(metrics.snapshot(), indent=2)
+        return [ReadResourceContents(content=content, mime_type="application/json")]
+    if uri_str == METRICS_PROMETHEUS_URI:
+        return [ReadResourceContents(content=metrics.prometheus(), mime_type="text/plain")]
+
+    # URI 파싱: project://project_id 또는 project://project_id/stats
+    if not uri_str.startswith("project://"):
+        raise ValueError(f"Invalid resource URI: {uri_str}")
+
+    path = uri_str[len("project://"):]
+    parts = path.split("/")
+    project_id = parts[0]
+
+    if len(parts) == 1:
+        # project://project_id - 프로젝트 정보 (인덱스 우선, 없으면 단건 조회)
+        project = await project_index.resolve(api_client, project_id)
+        if project:
+            content = json.dumps(project, indent=2)
+            return [ReadResourceContents(content=content, mime_type="application/json")]
 
-        # AnyUrl 객체의 경우 unicode_string() 메서드 사용
-        if hasattr(uri, 'unicode_string'):
-            uri_str = uri.unicode_string()
-        else:
-            uri_str = str(uri)
+        raise ValueError(f"Project not found: {project_id}")
 
-        print(f"[DEBUG] Converted to string: {uri_str}, type: {type(uri_str)}", file=sys.stderr, flush=True)
+    elif len(parts) == 2 and parts[1] == "stats":
+        # project://project_id/stats - 프로젝트 통계
+        stats_result = await api_client.get_project_stats(project_id)
+        content = json.dumps(stats_result, indent=2)
+        return [ReadResourceContents(content=content, mime_type="application/json")]
 
-        # URI 파싱: project://project_id 또는 project://project_id/stats
-        if not uri_str.startswith("project://"):
-            raise ValueError(f"Invalid resource URI: {uri_str}")
+    else:
+        raise ValueError(f"Invalid resource path: {uri_str}")
 
-        path = uri_str[len("project://"):]
-        parts = path.split("/")
-        project_id = parts[0]
 
-        if len(parts) == 1:
-            # project://project_id - 프로젝트 정보
-            projects_result = await api_client.list_projects()
+async def _dump_metrics(path: str, interval: float) -> None:
+    """Prometheus 텍스트 덤프를 주기적으로 파일에 기록"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            metrics.write_prometheus(path)
+        except OSError as e:
+            logger.warning("Failed to write metrics dump", path=path, error=str(e))
 
-            if projects_result.get("projects"):
-                project = next(
-                    (p for p in projects_result["projects"] if p["id"] == project_id),
-                    None
-                )
-                if project:
-                    content = json.dumps(project, indent=2)
-                    return [ReadResourceContents(content=content, mime_type="application/json")]
 
-            raise ValueError(f"Project not found: {project_id}")
+def _configure_logging() -> None:
+    """structlog 출력을 stderr로 (stdout은 stdio 전송의 JSON-RPC 스트림 전용)"""
+    level = logging.getLevelName(config.logging.level.upper())
+    renderer = (
+        structlog.processors.JSONRenderer()
+        if config.logging.format == "json"
+        else structlog.dev.ConsoleRenderer(colors=False)
+    )
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            renderer
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level if isinstance(level, int) else logging.INFO),
+        logger_factory=structlog.PrintLoggerFactory(file=sys.stderr),
+        cache_logger_on_first_use=True
+    )
 
-        elif len(parts) == 2 and parts[1] == "stats":
-            # project://project_id/stats - 프로젝트 통계
-            stats_result = await api_client.get_project_stats(project_id)
-            content = json.dumps(stats_result, indent=2)
-            return [ReadResourceContents(content=content, mime_type="application/json")]
 
-        else:
-            raise ValueError(f"Invalid resource path: {uri_str}")
+# 지원하는 전송 방식
+TRANSPORTS = ("stdio", "http")
 
-    except Exception as e:
-        logger.error("Failed to read resource", uri=str(uri), error=str(e))
-        raise
+# 로컬 전용 바인딩으로 볼 호스트 (DNS rebinding 방지 적용 대상)
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def _transport_security(host: str):
+    """루프백 바인딩이면 Host/Origin 헤더를 로컬 주소로 제한 (DNS rebinding 방지)"""
+    from mcp.server.transport_security import TransportSecuritySettings
+
+    if host not in _LOOPBACK_HOSTS:
+        return TransportSecuritySettings(enable_dns_rebinding_protection=False)
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=["127.0.0.1:*", "localhost:*", "[::1]:*"],
+        allowed_origins=["http://127.0.0.1:*", "http://localhost:*", "http://[::1]:*"]
+    )
+
+
+def create_http_app():
+    """streamable HTTP 전송용 ASGI 앱
+
+    모든 MCP 세션이 한 프로세스의 api_client(커넥션 풀), 검색/프롬프트 캐시, 심볼
+    인덱스를 공유한다. 세션 매니저는 앱 lifespan 동안 실행된다.
+    """
+    from contextlib import asynccontextmanager
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+
+    session_manager = StreamableHTTPSessionManager(
+        app=app,
+        json_response=config.server.json_response,
+        security_settings=_transport_security(config.server.host)
+    )
+
+    class _MCPEndpoint:
+        """세션 매니저로 요청을 넘기는 ASGI 엔드포인트"""
+
+        async def __call__(self, scope, receive, send):
+            await session_manager.handle_request(scope, receive, send)
+
+    @asynccontextmanager
+    async def lifespan(_):
+        async with session_manager.run():
+            yield
+
+    return Starlette(routes=[Route(config.server.http_path, endpoint=_MCPEndpoint())], lifespan=lifespan)
+
+
+async def _serve_stdio() -> None:
+    async with stdio_server() as (read_stream, write_stream):
+        print(f"[MCP] stdio_server initialized", file=sys.stderr, flush=True)
+        await app.run(read_stream, write_stream, app.create_initialization_options())
+
+
+async def _serve_http() -> None:
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_http_app(),
+        host=config.server.host,
+        port=config.server.port,
+        log_level=config.logging.level.lower(),
+        access_log=False
+    ))
+    print(
+        f"[MCP] streamable HTTP listening on "
+        f"http://{config.server.host}:{config.server.port}{config.server.http_path}",
+        file=sys.stderr, flush=True
+    )
+    await server.serve()
 
 
 async def run_server():
-    """MCP 서버 비동기 실행"""
-    import sys
+    """MCP 서버 비동기 실행 (config.server.transport: stdio 또는 http)"""
     import os
+    _configure_logging()
     print(f"[MCP] Starting server from: {os.getcwd()}", file=sys.stderr, flush=True)
     print(f"[MCP] Python path: {sys.executable}", file=sys.stderr, flush=True)
     print(f"[MCP] API URL: {config.api.base_url}", file=sys.stderr, flush=True)
 
-    async with stdio_server() as (read_stream, write_stream):
-        print(f"[MCP] stdio_server initialized", file=sys.stderr, flush=True)
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
+    watcher = None
+    if config.tools.resources_poll_interval > 0:
+        watcher = asyncio.create_task(_watch_projects(config.tools.resources_poll_interval))
+
+    metrics_dumper = None
+    if config.tools.metrics_prometheus_path and config.tools.metrics_dump_interval > 0:
+        metrics_dumper = asyncio.create_task(
+            _dump_metrics(config.tools.metrics_prometheus_path, config.tools.metrics_dump_interval)
         )
 
+    if config.server.transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport: {config.server.transport!r} (expected one of {TRANSPORTS})")
 
-def main():
+    try:
+        if config.server.transport == "http":
+            await _serve_http()
+        else:
+            await _serve_stdio()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if metrics_dumper is not None:
+            metrics_dumper.cancel()
+            try:
+                metrics.write_prometheus(config.tools.metrics_prometheus_path)
+            except OSError as e:
+                logger.warning("Failed to write metrics dump", error=str(e))
+        symbol_index.save()
+
+
+def main(argv=None):
     """MCP 서버 진입점 (entry point for uvx/pip)"""
-    import asyncio
+    parser = argparse.ArgumentParser(description="MCP server for code-embedding-ai")
+    parser.add_argument(
+        "--transport", choices=TRANSPORTS,
+        help="stdio (one process per agent session) or http (streamable HTTP, many sessions per process)"
+    )
+    parser.add_argument("--host", help="Bind address for the http transport")
+    parser.add_argument("--port", type=int, help="Port for the http transport")
+    args = parser.parse_args(argv)
+
+    if args.transport:
+        config.server.transport = args.transport
+    if args.host:
+        config.server.host = args.host
+    if args.port:
+        config.server.port = args.port
     asyncio.run(run_server())
 
 
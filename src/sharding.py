@@ -0,0 +1,309 @@
+"""
+Sharded client fanning calls out over several code-embedding-ai backends
+"""
+import asyncio
+import heapq
+import itertools
+import os
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+import httpx
+import structlog
+from .api_client import FastAPIClient
+from .config import APIConfig
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# 소유 샤드를 모르는 프로젝트 때문에 목록을 다시 조회하는 최소 간격 (초)
+OWNER_REFRESH_INTERVAL = 30.0
+
+
+def _similarity(result: Dict[str, Any]) -> float:
+    return result.get("similarity") or 0.0
+
+
+def merge_by_similarity(result_lists: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+    """샤드별 결과 목록을 유사도 내림차순으로 k-way merge 해 상위 top_k개 반환"""
+    ordered = [sorted(results, key=_similarity, reverse=True) for results in result_lists]
+    merged = heapq.merge(*ordered, key=_similarity, reverse=True)
+    return list(itertools.islice(merged, max(0, int(top_k))))
+
+
+@dataclass
+class Shard:
+    """백엔드 샤드 하나 (이름 + 클라이언트)"""
+    name: str
+    client: FastAPIClient
+
+
+class ShardedClient:
+    """여러 백엔드에 걸친 FastAPIClient 호환 클라이언트
+
+    프로젝트 범위 호출은 프로젝트를 소유한 샤드로 보내고(소유 정보는 list_projects
+    결과로 학습), 프로젝트 범위가 없는 검색은 모든 샤드에 병렬로 보낸 뒤 유사도 순으로
+    병합한다. 샤드별 타임아웃을 적용하며, 일부 샤드가 실패하면 나머지 결과와 함께
+    실패한 샤드 이름을 "failed_shards"에 담아 반환한다. 모든 샤드가 실패하면 예외를 던진다.
+    """
+
+    def __init__(self, config: APIConfig):
+        self.config = config
+        self.base_url = config.base_url
+        self.shards: List[Shard] = []
+        for i, backend in enumerate(config.backends):
+            name = backend.get("name") or f"shard-{i}"
+            self.shards.append(Shard(name=name, client=FastAPIClient(
+                base_url=backend["base_url"],
+                config=self._shard_config(config, name, backend)
+            )))
+        if not self.shards:
+            raise ValueError("ShardedClient requires at least one backend in api.backends")
+        self._by_name = {shard.name: shard for shard in self.shards}
+        # 프로젝트 ID → 소유 샤드 이름
+        self.owners: Dict[str, str] = {}
+        self._owners_refreshed_at: Optional[float] = None
+
+    @staticmethod
+    def _shard_config(config: APIConfig, name: str, backend: Dict[str, Any]) -> APIConfig:
+        """샤드용 설정 (디스크 캐시는 샤드별 하위 디렉터리로 분리, 레플리카는 샤드별로 지정)"""
+        disk_cache_dir = os.path.join(config.disk_cache_dir, name) if config.disk_cache_dir else ""
+        return replace(
+            config,
+            base_url=backend["base_url"],
+            backends=[],
+            replicas=list(backend.get("replicas") or []),
+            disk_cache_dir=disk_cache_dir
+        )
+
+    async def _call_shard(self, shard: Shard, call: Callable[[FastAPIClient], Awaitable[T]]) -> T:
+        """샤드 타임아웃을 적용한 단일 샤드 호출"""
+        timeout = self.config.shard_timeout or None
+        if timeout is None:
+            return await call(shard.client)
+        try:
+            return await asyncio.wait_for(call(shard.client), timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Shard '{shard.name}' timed out after {timeout}s") from None
+
+    async def _fan_out(
+        self,
+        operation: str,
+        call: Callable[[FastAPIClient], Awaitable[T]],
+        shards: Optional[List[Shard]] = None
+    ) -> Tuple[Dict[str, T], Dict[str, BaseException]]:
+        """모든 (또는 지정한) 샤드에 병렬 호출 → (성공 결과, 실패 예외) 샤드 이름별 매핑"""
+        shards = shards or self.shards
+        outcomes = await asyncio.gather(
+            *(self._call_shard(shard, call) for shard in shards),
+            return_exceptions=True
+        )
+        succeeded: Dict[str, T] = {}
+        failed: Dict[str, BaseException] = {}
+        for shard, outcome in zip(shards, outcomes):
+            if isinstance(outcome, BaseException):
+                failed[shard.name] = outcome
+            else:
+                succeeded[shard.name] = outcome
+
+        if failed:
+            logger.warning(
+                "Shard calls failed",
+                operation=operation,
+                failed={name: str(e) for name, e in failed.items()}
+            )
+        if not succeeded:
+            raise next(iter(failed.values()))
+        return succeeded, failed
+
+    async def _owner(self, project_id: str) -> Optional[Shard]:
+        """프로젝트 소유 샤드 (모르면 프로젝트 목록을 한 번 갱신, 그래도 모르면 None)"""
+        name = self.owners.get(project_id)
+        loop = asyncio.get_running_loop()
+        if name is None and (
+            self._owners_refreshed_at is None
+            or loop.time() - self._owners_refreshed_at > OWNER_REFRESH_INTERVAL
+        ):
+            try:
+                await self.list_projects()
+            except Exception as e:
+                logger.warning("Failed to refresh shard ownership", error=str(e))
+            name = self.owners.get(project_id)
+        return self._by_name.get(name) if name else None
+
+    async def _merged_search(
+        self,
+        operation: str,
+        project_id: Optional[str],
+        top_k: int,
+        call: Callable[[FastAPIClient], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """프로젝트 소유 샤드로 보내거나, 전체 샤드에 보내 결과를 유사도 순으로 병합"""
+        if project_id:
+            shard = await self._owner(project_id)
+            if shard is not None:
+                return await self._call_shard(shard, call)
+
+        succeeded, failed = await self._fan_out(operation, call)
+        merged = merge_by_similarity(
+            [result.get("results") or [] for result in succeeded.values()],
+            top_k
+        )
+        result: Dict[str, Any] = {"results": merged}
+        if failed:
+            result["failed_shards"] = sorted(failed)
+        return result
+
+    async def search_semantic(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        top_k: int = 10,
+        min_similarity: float = 0.7
+    ) -> Dict[str, Any]:
+        """시맨틱 검색 (프로젝트 범위가 없으면 전체 샤드 fan-out + 병합)"""
+        return await self._merged_search(
+            "search_semantic", project_id, top_k,
+            lambda client: client.search_semantic(
+                query=query, project_id=project_id, top_k=top_k, min_similarity=min_similarity
+            )
+        )
+
+    async def search_semantic_stream(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        top_k: int = 10,
+        min_similarity: float = 0.7
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """시맨틱 검색 결과 스트리밍
+
+        프로젝트 소유 샤드가 있으면 그 샤드의 스트림을 그대로 전달하고, 전체 검색은
+        샤드 결과를 병합해야 순서가 정해지므로 병합 후 하나씩 반환한다.
+        """
+        shard = await self._owner(project_id) if project_id else None
+        if shard is not None:
+            async for r in shard.client.search_semantic_stream(
+                query=query, project_id=project_id, top_k=top_k, min_similarity=min_similarity
+            ):
+                yield r
+            return
+
+        result = await self.search_semantic(
+            query=query, project_id=project_id, top_k=top_k, min_similarity=min_similarity
+        )
+        for r in result["results"]:
+            yield r
+
+    # 배치 검색은 self.search_semantic만 사용하므로 샤드 병합 검색에 그대로 적용됨
+    search_semantic_batch = FastAPIClient.search_semantic_batch
+
+    async def find_similar_code(
+        self,
+        code_snippet: str,
+        language: str,
+        project_id: Optional[str] = None,
+        top_k: int = 5
+    ) -> Dict[str, Any]:
+        """유사 코드 검색 (프로젝트 범위가 없으면 전체 샤드 fan-out + 병합)"""
+        return await self._merged_search(
+            "find_similar_code", project_id, top_k,
+            lambda client: client.find_similar_code(
+                code_snippet=code_snippet, language=language, project_id=project_id, top_k=top_k
+            )
+        )
+
+    async def search_by_metadata(
+        self,
+        filters: Dict[str, Any],
+        top_k: int = 10
+    ) -> Dict[str, Any]:
+        """메타데이터 검색 (필터에 project_id가 없으면 전체 샤드 fan-out)"""
+        return await self._merged_search(
+            "search_by_metadata", filters.get("project_id"), top_k,
+            lambda client: client.search_by_metadata(filters=filters, top_k=top_k)
+        )
+
+    async def list_projects(self) -> Dict[str, Any]:
+        """전체 샤드의 프로젝트 목록 병합 (소유 샤드 정보 갱신)"""
+        succeeded, failed = await self._fan_out(
+            "list_projects", lambda client: client.list_projects()
+        )
+        # 응답하지 않은 샤드의 소유 정보만 유지하고 나머지는 새 목록으로 교체
+        owners = {pid: name for pid, name in self.owners.items() if name in failed}
+        projects = []
+        for shard in self.shards:
+            if shard.name not in succeeded:
+                continue
+            for project in succeeded[shard.name].get("projects") or []:
+                project_id = project.get("id")
+                if owners.get(project_id, shard.name) != shard.name:
+                    logger.warning("Project registered on several shards", project_id=project_id,
+                                   shards=[owners[project_id], shard.name])
+                    continue
+                owners[project_id] = shard.name
+                projects.append(project)
+        self.owners = owners
+        self._owners_refreshed_at = asyncio.get_running_loop().time()
+
+        result: Dict[str, Any] = {"projects": projects}
+        if failed:
+            result["failed_shards"] = sorted(failed)
+        return result
+
+    async def get_project(self, project_id: str) -> Dict[str, Any]:
+        """단일 프로젝트 정보 조회 (소유 샤드를 모르면 전체 샤드에 문의)"""
+        name = self.owners.get(project_id)
+        if name is not None:
+            return await self._call_shard(self._by_name[name], lambda client: client.get_project(project_id))
+
+        succeeded, failed = await self._fan_out(
+            "get_project", lambda client: client.get_project(project_id)
+        )
+        for shard in self.shards:
+            if succeeded.get(shard.name):
+                self.owners[project_id] = shard.name
+                return succeeded[shard.name]
+
+        # 어느 샤드에도 없음 - 404를 그대로 전달해 호출자가 목록 조회로 대체할 수 있게 함
+        for error in failed.values():
+            if isinstance(error, httpx.HTTPStatusError):
+                raise error
+        return {}
+
+    async def get_project_stats(self, project_id: str) -> Dict[str, Any]:
+        """프로젝트 통계 조회 (소유 샤드로 라우팅)"""
+        shard = await self._owner(project_id)
+        if shard is None:
+            raise ValueError(f"Project not found on any backend: {project_id}")
+        return await self._call_shard(shard, lambda client: client.get_project_stats(project_id))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """샤드 캐시 통계 합계 + 샤드별 통계"""
+        per_shard = {shard.name: shard.client.cache_stats() for shard in self.shards}
+        totals: Dict[str, Union[int, float]] = {}
+        for stats in per_shard.values():
+            for key in ("entries", "bytes", "hits", "misses", "evictions"):
+                totals[key] = totals.get(key, 0) + stats.get(key, 0)
+        lookups = totals.get("hits", 0) + totals.get("misses", 0)
+        totals["hit_rate"] = round(totals.get("hits", 0) / lookups, 3) if lookups else 0.0
+        return {**totals, **per_shard}
+
+    def circuit_states(self) -> Dict[str, str]:
+        """샤드/엔드포인트별 circuit breaker 상태"""
+        return {
+            f"{shard.name}:{endpoint}": state
+            for shard in self.shards
+            for endpoint, state in shard.client.circuit_states().items()
+        }
+
+    async def close(self):
+        """모든 샤드 클라이언트 종료"""
+        await asyncio.gather(*(shard.client.close() for shard in self.shards))
+
+
+def create_api_client(config: APIConfig) -> Union[FastAPIClient, ShardedClient]:
+    """설정에 맞는 백엔드 클라이언트 (api.backends가 있으면 샤드 클라이언트)"""
+    if config.backends:
+        return ShardedClient(config)
+    return FastAPIClient(base_url=config.base_url, config=config)
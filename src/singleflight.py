@@ -0,0 +1,53 @@
+"""
+Single-flight request coalescing for concurrent identical calls
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """동일 키로 동시에 들어온 요청을 하나의 in-flight 작업으로 합치는 헬퍼
+
+    먼저 들어온 호출이 작업을 시작하고, 이후 호출은 같은 작업의 결과(또는 예외)를
+    공유한다. 대기자가 모두 취소되면 공유 작업도 취소된다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """key에 대한 in-flight 작업이 있으면 합류하고, 없으면 fn()을 실행"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.shared += 1
+
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters[task] - 1
+            if remaining:
+                self._waiters[task] = remaining
+            else:
+                del self._waiters[task]
+                if not task.done():
+                    # 마지막 대기자가 취소됨 - 새 호출이 취소 중인 작업에 합류하지 않도록 분리
+                    self._forget(key, task)
+                    task.cancel()
+
+    def in_flight(self) -> int:
+        """현재 진행 중인 고유 요청 수"""
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
@@ -0,0 +1,72 @@
+"""
+Incremental JSON parsing for streamed backend responses
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+async def iter_json_array(
+    chunks: AsyncIterator[bytes],
+    key: str = "results"
+) -> AsyncIterator[Any]:
+    """응답 본문 청크에서 최상위 객체의 key 배열 원소를 도착하는 대로 하나씩 파싱
+
+    배열 전체를 메모리에 올리지 않고 원소 단위로 yield 한다. 원소 하나가 여러 청크에
+    걸쳐 있으면 다음 청크를 받을 때까지 기다린다.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    array_start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    buffer = ""
+    pos = 0
+    in_array = False
+    exhausted = False
+    chunk_iter = chunks.__aiter__()
+
+    while True:
+        if not in_array:
+            match = array_start.search(buffer)
+            if match:
+                in_array = True
+                buffer = buffer[match.end():]
+                pos = 0
+                continue
+        else:
+            # 원소 사이의 공백과 쉼표 건너뛰기
+            while pos < len(buffer) and (buffer[pos] in _WHITESPACE or buffer[pos] == ","):
+                pos += 1
+            if pos < len(buffer):
+                if buffer[pos] == "]":
+                    return
+                try:
+                    item, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                    end = -1
+                if end == len(buffer) and not exhausted and not isinstance(item, (dict, list)):
+                    # 청크 경계에서 잘린 스칼라일 수 있으므로 다음 청크를 기다림
+                    end = -1
+                if end >= 0:
+                    yield item
+                    # 소비한 부분은 버퍼에서 제거해 메모리 사용량 유지
+                    buffer = buffer[end:]
+                    pos = 0
+                    continue
+
+        if exhausted:
+            if in_array:
+                raise ValueError(f"Unterminated '{key}' array in streamed response")
+            return
+
+        try:
+            chunk = await chunk_iter.__anext__()
+        except StopAsyncIteration:
+            exhausted = True
+            buffer += text_decoder.decode(b"", final=True)
+            continue
+        buffer += text_decoder.decode(chunk)
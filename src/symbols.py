@@ -0,0 +1,312 @@
+"""
+Local symbol index for serving function/class lookups from memory
+"""
+import bisect
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import structlog
+from .projects import project_version
+
+logger = structlog.get_logger(__name__)
+
+# 심볼로 인덱싱하는 청크 타입
+SYMBOL_CHUNK_TYPES = ("function", "method", "class")
+
+
+class SymbolIndex:
+    """프로젝트별 심볼 이름 → (파일, 라인, 청크 ID, 내용) 인덱스
+
+    백엔드 메타데이터 조회 결과를 받을 때마다 갱신되고(write-through), 프로젝트 단위로
+    전체 재적재할 수 있다. 프로젝트의 인덱싱 버전이 바뀌면 해당 프로젝트 심볼은 폐기한다.
+    스냅샷 경로가 주어지면 시작 시 로드하고 save() 시 디스크에 기록한다.
+
+    인덱스는 일부만 채워져 있을 수 있으므로, 백엔드 답을 전부 담고 있는 조회 범위
+    (프로젝트, 이름, 클래스)와 전체 적재된 프로젝트를 따로 기록한다. covers()가 참인
+    범위만 메모리에서 답할 수 있다.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None, max_entries: int = 50000):
+        self.snapshot_path = Path(snapshot_path).expanduser() if snapshot_path else None
+        self.max_entries = max_entries
+        self.versions: Dict[str, Optional[str]] = {}
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._lower: Dict[str, set] = {}
+        self._sorted: Optional[List[str]] = None
+        # 백엔드 답을 전부 담고 있는 조회 범위 (project_id 또는 None, 이름, class_name 또는 None)
+        self._complete: Set[Tuple[Optional[str], str, Optional[str]]] = set()
+        # 심볼을 상한에 걸리지 않고 전부 적재한 프로젝트
+        self._loaded_projects: Set[str] = set()
+        self._size = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """심볼 항목 추가 (같은 청크는 교체, 항목 수 상한으로 저장하지 못하면 False)"""
+        name = entry.get("name")
+        if not name:
+            return False
+
+        entries = self._entries.get(name, [])
+        key = self._entry_key(entry)
+        for i, existing in enumerate(entries):
+            if self._entry_key(existing) == key:
+                entries[i] = entry
+                self._dirty = True
+                return True
+
+        if self._size >= self.max_entries:
+            return False
+        self._entries.setdefault(name, entries).append(entry)
+        self._lower.setdefault(name.lower(), set()).add(name)
+        self._size += 1
+        self._sorted = None
+        self._dirty = True
+        return True
+
+    def observe(
+        self,
+        results: Iterable[Dict[str, Any]],
+        project_id: Optional[str] = None,
+        name: Optional[str] = None,
+        class_name: Optional[str] = None,
+        complete: bool = False
+    ) -> int:
+        """백엔드 검색 결과에서 심볼 항목을 추출해 인덱스에 반영
+
+        결과에 name 필드가 없으면 조회에 사용한 name을 사용한다. complete이면 결과가
+        (project_id, name, class_name) 조회의 전체 답이라는 뜻으로, 모두 저장됐을 때
+        그 범위를 메모리에서 답할 수 있는 범위로 기록한다.
+        """
+        added, stored_all = self._observe(results, project_id, name, class_name)
+        if complete and name and stored_all:
+            self._complete.add((project_id, name, class_name))
+            self._dirty = True
+        return added
+
+    def _observe(
+        self,
+        results: Iterable[Dict[str, Any]],
+        project_id: Optional[str],
+        name: Optional[str],
+        class_name: Optional[str]
+    ) -> Tuple[int, bool]:
+        """결과를 심볼 항목으로 반영 (반영한 수, 모두 저장됐는지)"""
+        added = 0
+        stored_all = True
+        for r in results:
+            chunk_type = r.get("chunk_type") or "function"
+            if chunk_type not in SYMBOL_CHUNK_TYPES:
+                continue
+            symbol = r.get("name") or name
+            if not symbol:
+                continue
+            stored_all = self.add({
+                "name": symbol,
+                "class_name": r.get("class_name") or class_name,
+                "chunk_type": chunk_type,
+                "chunk_id": r.get("chunk_id") or r.get("id"),
+                "project_id": r.get("project_id") or project_id,
+                "file_path": r.get("file_path", ""),
+                "line_start": r.get("line_start"),
+                "line_end": r.get("line_end"),
+                "content": r.get("content", ""),
+                "indexed_at": time.time()
+            }) and stored_all
+            added += 1
+        return added, stored_all
+
+    def lookup(
+        self,
+        name: str,
+        class_name: Optional[str] = None,
+        project_id: Optional[str] = None,
+        case_insensitive: bool = False
+    ) -> List[Dict[str, Any]]:
+        """이름으로 심볼 조회 (정확 일치, 선택적으로 대소문자 무시)"""
+        if case_insensitive:
+            names = self._lower.get(name.lower(), ())
+        else:
+            names = (name,) if name in self._entries else ()
+
+        return [
+            e for n in names for e in self._entries[n]
+            if self._matches(e, class_name, project_id)
+        ]
+
+    def covers(self, name: str, class_name: Optional[str] = None, project_id: Optional[str] = None) -> bool:
+        """이 조회의 전체 답이 인덱스에 있는지 (같거나 더 넓은 범위가 완전하게 적재됨)"""
+        if project_id is not None and project_id in self._loaded_projects:
+            return True
+        return any(
+            (scope_project, name, scope_class) in self._complete
+            for scope_project in {project_id, None}
+            for scope_class in {class_name, None}
+        )
+
+    def prefix(
+        self,
+        prefix: str,
+        project_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[str]:
+        """접두사로 시작하는 심볼 이름 (대소문자 무시, 정렬 순)"""
+        if self._sorted is None:
+            self._sorted = sorted(self._lower)
+
+        lowered = prefix.lower()
+        names = []
+        i = bisect.bisect_left(self._sorted, lowered)
+        while i < len(self._sorted) and self._sorted[i].startswith(lowered) and len(names) < limit:
+            for n in sorted(self._lower[self._sorted[i]]):
+                if any(self._matches(e, None, project_id) for e in self._entries[n]):
+                    names.append(n)
+            i += 1
+        return names[:limit]
+
+    def load_project(self, project_id: str, results: Iterable[Dict[str, Any]], complete: bool = False) -> int:
+        """프로젝트 심볼 전체 교체 (complete이면 프로젝트의 모든 심볼로 간주)"""
+        self.invalidate_project(project_id)
+        added, stored_all = self._observe(results, project_id, None, None)
+        if complete and stored_all:
+            self._loaded_projects.add(project_id)
+            self._dirty = True
+        return added
+
+    async def refresh_project(self, client, project_id: str, top_k: int = 1000) -> int:
+        """백엔드 메타데이터 검색으로 프로젝트 심볼 재적재
+
+        청크 타입 중 하나라도 top_k개를 꽉 채워 받으면 잘렸을 수 있으므로 전체 적재로 보지 않는다.
+        """
+        results = []
+        capped = False
+        for chunk_type in SYMBOL_CHUNK_TYPES:
+            result = await client.search_by_metadata(
+                filters={"project_id": project_id, "chunk_type": chunk_type},
+                top_k=top_k
+            )
+            chunk_results = result.get("results") or []
+            capped = capped or len(chunk_results) >= top_k
+            results.extend(chunk_results)
+        return self.load_project(project_id, results, complete=not capped)
+
+    def invalidate_project(self, project_id: str) -> int:
+        """프로젝트 심볼 폐기 (폐기한 항목 수 반환)
+
+        프로젝트 범위와 프로젝트 구분 없는 범위는 더 이상 전체 답이 아니므로 함께 잊는다.
+        """
+        self._loaded_projects.discard(project_id)
+        self._drop_scopes(project_id)
+        total_removed = 0
+        for name in list(self._entries):
+            kept = [e for e in self._entries[name] if e.get("project_id") != project_id]
+            removed = len(self._entries[name]) - len(kept)
+            if not removed:
+                continue
+            total_removed += removed
+            self._size -= removed
+            self._dirty = True
+            if kept:
+                self._entries[name] = kept
+            else:
+                del self._entries[name]
+                lowered = self._lower[name.lower()]
+                lowered.discard(name)
+                if not lowered:
+                    del self._lower[name.lower()]
+                self._sorted = None
+        return total_removed
+
+    def sync_versions(self, projects: Iterable[Dict[str, Any]]) -> List[str]:
+        """프로젝트 인덱싱 버전이 바뀐 프로젝트의 심볼 폐기
+
+        Returns:
+            심볼이 폐기되어 재적재가 필요한 프로젝트 ID 목록
+        """
+        invalidated = []
+        for project in projects:
+            project_id = project["id"]
+            version = project_version(project)
+            if project_id in self.versions and self.versions[project_id] != version:
+                logger.info("Project re-indexed, dropping symbols", project_id=project_id)
+                if self.invalidate_project(project_id):
+                    invalidated.append(project_id)
+            elif project_id not in self.versions:
+                # 새 프로젝트 - 프로젝트 구분 없는 범위의 답에 빠져 있음
+                self._drop_scopes(None)
+            if self.versions.get(project_id) != version:
+                self.versions[project_id] = version
+                self._dirty = True
+        return invalidated
+
+    def load(self) -> int:
+        """스냅샷 파일에서 인덱스 로드"""
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to load symbol snapshot", path=str(self.snapshot_path), error=str(e))
+            return 0
+
+        self.versions = data.get("versions", {})
+        stored_all = True
+        for entry in data.get("symbols", []):
+            stored_all = self.add(entry) and stored_all
+        # 항목 수 상한으로 일부만 로드됐으면 완전성 기록은 믿을 수 없음
+        if stored_all:
+            self._complete = {tuple(scope) for scope in data.get("complete", [])}
+            self._loaded_projects = set(data.get("loaded_projects", []))
+        self._dirty = False
+        return self._size
+
+    def save(self) -> None:
+        """변경이 있으면 스냅샷 파일에 원자적으로 저장"""
+        if self.snapshot_path is None or not self._dirty:
+            return
+
+        data = {
+            "versions": self.versions,
+            "symbols": [e for entries in self._entries.values() for e in entries],
+            "complete": [list(scope) for scope in sorted(self._complete, key=repr)],
+            "loaded_projects": sorted(self._loaded_projects)
+        }
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning("Failed to save symbol snapshot", path=str(self.snapshot_path), error=str(e))
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self._dirty = False
+
+    def _drop_scopes(self, project_id: Optional[str]) -> None:
+        """project_id 범위와 프로젝트 구분 없는 범위의 완전성 기록 제거"""
+        dropped = {scope for scope in self._complete if scope[0] in (project_id, None)}
+        if dropped:
+            self._complete -= dropped
+            self._dirty = True
+
+    @staticmethod
+    def _entry_key(entry: Dict[str, Any]) -> tuple:
+        if entry.get("chunk_id"):
+            return ("id", entry["chunk_id"])
+        return (entry.get("project_id"), entry.get("file_path"), entry.get("line_start"))
+
+    @staticmethod
+    def _matches(entry: Dict[str, Any], class_name: Optional[str], project_id: Optional[str]) -> bool:
+        if class_name and entry.get("class_name") != class_name:
+            return False
+        if project_id and entry.get("project_id") != project_id:
+            return False
+        return True
@@ -2,10 +2,37 @@
 Pytest configuration and shared fixtures for MCP server tests
 """
 
+import atexit
+import json
+import os
+import shutil
+import tempfile
 import pytest
 import asyncio
 from typing import AsyncGenerator
 
+from src.config import CONFIG_PATH_ENV, MCPConfig
+
+
+def _isolate_persistent_state() -> None:
+    """저장소 설정의 디스크 캐시/심볼 스냅샷 경로를 임시 디렉터리로 돌린 설정 파일 사용
+
+    src.server는 import 시점에 설정을 읽으므로 테스트 모듈보다 먼저 로드되는 여기서 지정한다.
+    """
+    state_dir = tempfile.mkdtemp(prefix="code-agent-mcp-tests-")
+    atexit.register(shutil.rmtree, state_dir, True)
+
+    data = MCPConfig.from_file().to_dict()
+    data["api"]["disk_cache_dir"] = os.path.join(state_dir, "cache")
+    data["tools"]["symbol_index_path"] = os.path.join(state_dir, "symbols.json")
+    path = os.path.join(state_dir, "mcp_config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.environ[CONFIG_PATH_ENV] = path
+
+
+_isolate_persistent_state()
+
 
 @pytest.fixture(scope="session")
 def event_loop():
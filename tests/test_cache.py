@@ -0,0 +1,153 @@
+"""
+Tests for the in-process and on-disk result caches
+"""
+
+import pytest
+from unittest.mock import patch
+from src.cache import DiskCache, TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTL + LRU cache"""
+
+    def test_hit_and_miss_counters(self):
+        """Test hit/miss accounting"""
+        cache = TTLCache(ttl=60, max_entries=10)
+        assert cache.get("a") is None
+        cache.set("a", {"results": []})
+        assert cache.get("a") == {"results": []}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl_expiry(self):
+        """Test entries expire after TTL"""
+        cache = TTLCache(ttl=10, max_entries=10)
+        with patch("src.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("src.cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") == 1
+        with patch("src.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction_by_entries(self):
+        """Test least recently used entry is evicted first"""
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        """Test byte bound is enforced"""
+        cache = TTLCache(ttl=60, max_entries=100, max_bytes=100)
+        cache.set("a", "x", size=60)
+        cache.set("b", "y", size=60)
+
+        assert "a" not in cache
+        assert "b" in cache
+        assert cache.stats()["bytes"] == 60
+
+    def test_oversized_value_not_cached(self):
+        """Test values larger than the byte bound are skipped"""
+        cache = TTLCache(ttl=60, max_entries=100, max_bytes=10)
+        cache.set("a", "x" * 100)
+        assert "a" not in cache
+
+    def test_disabled_cache(self):
+        """Test ttl=0 disables caching"""
+        cache = TTLCache(ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+class TestDiskCache:
+    """Tests for SQLite-backed persistent cache"""
+
+    def test_round_trip_and_persistence(self, tmp_path):
+        """Test entries survive reopening the cache"""
+        cache = DiskCache(str(tmp_path))
+        assert cache.get(("search", "auth")) is None
+        cache.set(("search", "auth"), {"results": [{"file_path": "a.py"}]}, project_id="p1")
+        cache.close()
+
+        reopened = DiskCache(str(tmp_path))
+        assert reopened.get(("search", "auth")) == {"results": [{"file_path": "a.py"}]}
+        stats = reopened.stats()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["bytes"] > 0
+        reopened.close()
+
+    def test_opened_lazily_and_byte_total_persisted(self, tmp_path):
+        """Test nothing touches disk until first use and the byte total survives reopening"""
+        directory = tmp_path / "cache"
+        cache = DiskCache(str(directory))
+        assert not directory.exists()
+        cache.close()
+
+        cache = DiskCache(str(directory))
+        cache.set("a", "x" * 20)
+        cache.set("b", "y" * 20)
+        total = cache.stats()["bytes"]
+        cache.close()
+
+        reopened = DiskCache(str(directory))
+        assert reopened.stats()["bytes"] == total > 0
+        assert reopened._conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone() == (total,)
+        reopened.close()
+
+    def test_version_change_invalidates_project(self, tmp_path):
+        """Test a new index version drops project and unscoped entries"""
+        cache = DiskCache(str(tmp_path))
+        assert cache.sync_version("p1", "v1") is False
+        cache.set("p1-key", 1, project_id="p1")
+        cache.set("p2-key", 2, project_id="p2")
+        cache.set("all-key", 3)
+
+        assert cache.sync_version("p1", "v1") is False
+        assert cache.get("p1-key") == 1
+
+        assert cache.sync_version("p1", "v2") is True
+        assert cache.get("p1-key") is None
+        assert cache.get("all-key") is None
+        assert cache.get("p2-key") == 2
+        cache.close()
+
+    def test_eviction_by_bytes(self, tmp_path):
+        """Test least recently read entries are evicted first"""
+        cache = DiskCache(str(tmp_path), max_bytes=50)
+        cache.set("a", "x" * 20)
+        cache.set("b", "y" * 20)
+        with patch("src.cache.time.time", return_value=cache._conn.execute(
+            "SELECT MAX(accessed_at) FROM entries"
+        ).fetchone()[0] + 1):
+            cache.get("a")
+        cache.set("c", "z" * 20)
+
+        assert cache.get("a") == "x" * 20
+        assert cache.get("b") is None
+        assert cache.stats()["bytes"] <= 50
+        cache.close()
+
+    def test_ttl_expiry(self, tmp_path):
+        """Test expired entries are treated as misses"""
+        cache = DiskCache(str(tmp_path), ttl=10)
+        with patch("src.cache.time.time", return_value=1000.0):
+            cache.set("a", 1)
+        with patch("src.cache.time.time", return_value=1011.0):
+            assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
+        cache.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Tests for search result deduplication and overlap collapsing
+"""
+
+from src.dedupe import collapse_results, content_hash, overfetch_k
+
+
+def chunk(path, start, end, similarity, content=None, **extra):
+    if content is None:
+        content = "\n".join(f"line {n}" for n in range(start, end + 1))
+    return {"file_path": path, "line_start": start, "line_end": end,
+            "similarity": similarity, "content": content, **extra}
+
+
+class TestCollapse:
+    """Tests for hash dedupe and line range merging"""
+
+    def test_overfetch_k(self):
+        assert overfetch_k(10, 1.5) == 15
+        assert overfetch_k(3, 1.5) == 5
+        assert overfetch_k(10, 0.5) == 10
+
+    def test_content_hash_ignores_trailing_whitespace(self):
+        assert content_hash({"content": "a = 1  \nb = 2\n\n"}) == content_hash({"content": "a = 1\nb = 2"})
+        assert content_hash({"content": "  "}) is None
+
+    def test_identical_content_dropped(self):
+        results = [
+            chunk("a.py", 1, 2, 0.9, content="x = 1\ny = 2"),
+            chunk("b.py", 10, 11, 0.8, content="x = 1  \ny = 2\n"),
+            chunk("c.py", 1, 1, 0.7, content="z = 3"),
+        ]
+        deduped = collapse_results(results)
+
+        assert [r["file_path"] for r in deduped.results] == ["a.py", "c.py"]
+        assert deduped.details() == {"deduplicated": {"duplicates": 1, "merged": 0}}
+
+    def test_contained_chunk_collapses_into_class(self):
+        """A method chunk inside its class chunk keeps the class at the better rank"""
+        results = [
+            chunk("a.py", 12, 15, 0.95),
+            chunk("b.py", 1, 3, 0.9),
+            chunk("a.py", 10, 30, 0.8),
+        ]
+        deduped = collapse_results(results)
+
+        assert [(r["file_path"], r["line_start"], r["line_end"]) for r in deduped.results] == [
+            ("a.py", 10, 30), ("b.py", 1, 3)
+        ]
+        assert deduped.results[0]["similarity"] == 0.95
+        assert deduped.merged == 1
+
+    def test_partial_overlap_spliced(self):
+        """Overlapping ranges join into one chunk, transitively"""
+        results = [
+            chunk("a.py", 1, 5, 0.9),
+            chunk("a.py", 9, 12, 0.85),
+            chunk("a.py", 4, 10, 0.8),
+        ]
+        deduped = collapse_results(results)
+
+        assert len(deduped.results) == 1
+        merged = deduped.results[0]
+        assert (merged["line_start"], merged["line_end"]) == (1, 12)
+        assert merged["content"] == "\n".join(f"line {n}" for n in range(1, 13))
+        assert deduped.merged == 2
+
+    def test_unmergeable_overlap_kept(self):
+        """Content that does not match its line range is not spliced"""
+        results = [
+            chunk("a.py", 1, 5, 0.9, content="short"),
+            chunk("a.py", 4, 8, 0.8),
+        ]
+        deduped = collapse_results(results)
+
+        assert len(deduped.results) == 2
+        assert deduped.details() == {}
+
+    def test_other_project_not_merged(self):
+        results = [
+            chunk("a.py", 1, 5, 0.9, project_id="p1"),
+            chunk("a.py", 1, 5, 0.8, project_id="p2", content="other"),
+        ]
+
+        assert len(collapse_results(results).results) == 2
+
+    def test_top_k_and_inputs_untouched(self):
+        results = [chunk("a.py", 1, 5, 0.9), chunk("a.py", 3, 8, 0.8), chunk("b.py", 1, 1, 0.7)]
+        snapshot = [dict(r) for r in results]
+
+        deduped = collapse_results(results, top_k=1)
+
+        assert [r["line_end"] for r in deduped.results] == [8]
+        assert results == snapshot
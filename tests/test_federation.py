@@ -0,0 +1,109 @@
+"""
+Tests for federated multi-project search
+"""
+
+import asyncio
+import pytest
+from src.federation import federated_search, merge_top_k, normalized_score
+
+
+class FakeClient:
+    """search_semantic over fixed per-project similarity lists"""
+
+    def __init__(self, scores, fail=(), delay=0.0):
+        self.scores = scores
+        self.fail = set(fail)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def search_semantic(self, query, project_id=None, top_k=10, min_similarity=0.7):
+        self.calls.append((project_id, top_k, min_similarity))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if project_id in self.fail:
+                raise RuntimeError("backend down")
+            hits = [s for s in sorted(self.scores[project_id], reverse=True) if s >= min_similarity]
+            return {"results": [
+                {"chunk_id": f"{project_id}:{i}", "similarity": s} for i, s in enumerate(hits[:top_k])
+            ]}
+        finally:
+            self.in_flight -= 1
+
+
+class TestMerge:
+    """Tests for score normalization and k-way merge"""
+
+    def test_normalized_score(self):
+        """Test scores are clamped to [0, 1] and missing scores rank last"""
+        assert normalized_score({"similarity": 1.2}) == 1.0
+        assert normalized_score({"similarity": -0.3}) == 0.0
+        assert normalized_score({}) == 0.0
+
+    def test_merge_top_k(self):
+        """Test results from several projects interleave by score"""
+        merged = merge_top_k([
+            [{"id": "a", "similarity": 0.9}, {"id": "b", "similarity": 0.6}],
+            [{"id": "c", "similarity": 0.7}]
+        ], top_k=2)
+        assert [r["id"] for r in merged] == ["a", "c"]
+
+
+class TestFederatedSearch:
+    """Tests for federated_search"""
+
+    @pytest.mark.asyncio
+    async def test_early_stop(self):
+        """Test projects that cannot beat the k-th score are not searched deeply"""
+        client = FakeClient({
+            "a": [0.95, 0.94, 0.93, 0.92],
+            "b": [0.9, 0.89],
+            "c": [0.55, 0.54],
+            "d": [0.5]
+        })
+
+        result = await federated_search(
+            client, "auth", ["a", "b", "c", "d"], top_k=4, min_similarity=0.0, concurrency=1
+        )
+
+        assert [r["similarity"] for r in result["results"]] == [0.95, 0.94, 0.93, 0.92]
+        assert all(r["project_id"] == "a" for r in result["results"])
+        assert result["pruned"] == ["b", "c", "d"]
+        # 프로젝트별 1개 탐색 + a만 깊게 조회 (k번째 점수를 하한으로 전달)
+        assert client.calls[:4] == [(p, 1, 0.0) for p in "abcd"]
+        assert client.calls[4:] == [("a", 4, 0.5)]
+
+    @pytest.mark.asyncio
+    async def test_merges_across_projects(self):
+        """Test the top_k spans projects when scores interleave"""
+        client = FakeClient({"a": [0.9, 0.7, 0.5], "b": [0.8, 0.6]})
+
+        result = await federated_search(client, "auth", ["a", "b"], top_k=3, min_similarity=0.0)
+
+        assert [(r["project_id"], r["similarity"]) for r in result["results"]] == [
+            ("a", 0.9), ("b", 0.8), ("a", 0.7)
+        ]
+        assert result["searched"] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_partial_failure(self):
+        """Test a failing project is reported and the rest still merged"""
+        client = FakeClient({"a": [0.9], "b": [0.8]}, fail={"b"})
+
+        result = await federated_search(client, "auth", ["a", "b"], top_k=2, min_similarity=0.0)
+
+        assert [r["project_id"] for r in result["results"]] == ["a"]
+        assert result["failed_projects"] == ["b"]
+        assert result["searched"] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_bounded_parallelism(self):
+        """Test concurrent project searches stay under the semaphore"""
+        client = FakeClient({p: [0.9, 0.8] for p in "abcdef"}, delay=0.01)
+
+        await federated_search(client, "auth", list("abcdef"), top_k=6, concurrency=2)
+
+        assert client.max_in_flight == 2
@@ -4,7 +4,8 @@ Tests for MCP server functionality
 
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, AsyncMock, PropertyMock, patch
+from mcp.types import ListResourcesRequest, PaginatedRequestParams
 from src.api_client import FastAPIClient
 from src.config import MCPConfig, ServerConfig, APIConfig, LoggingConfig
 
@@ -24,6 +25,41 @@ class TestAPIClient:
         assert client.client is not None
         await client.close()
 
+    @pytest.mark.asyncio
+    async def test_http_client_created_lazily(self, client):
+        """Test the httpx client is only built on first use"""
+        assert client._client is None
+        # 사용하지 않은 클라이언트도 문제없이 종료
+        await client.close()
+
+        http = client.client
+        assert client.client is http
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_client_honours_http_config(self):
+        """Test pool limits and timeouts come from APIConfig"""
+        config = APIConfig(
+            timeout=12,
+            connect_timeout=2.0,
+            read_timeout=7.0,
+            max_connections=8,
+            max_keepalive_connections=4,
+            keepalive_expiry=15.0
+        )
+        client = FastAPIClient(base_url=config.base_url, config=config)
+
+        timeout = client.client.timeout
+        assert timeout.connect == 2.0
+        assert timeout.read == 7.0
+        assert timeout.write == 12
+
+        pool = client.client._transport._pool
+        assert pool._max_connections == 8
+        assert pool._max_keepalive_connections == 4
+        assert pool._keepalive_expiry == 15.0
+        await client.close()
+
     @pytest.mark.asyncio
     async def test_search_semantic(self, client):
         """Test semantic search"""
@@ -55,6 +91,319 @@ class TestAPIClient:
 
         await client.close()
 
+    @pytest.mark.asyncio
+    async def test_search_semantic_cached(self, client):
+        """Test repeated semantic search is served from cache"""
+        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
+            mock_response = Mock()
+            mock_response.json.return_value = {"results": [{"file_path": "test.py"}]}
+            mock_post.return_value = mock_response
+
+            first = await client.search_semantic(query="test function", top_k=10)
+            second = await client.search_semantic(query="test  function ", top_k=10)
+            await client.search_semantic(query="test function", top_k=5)
+
+            assert first == second
+            assert mock_post.call_count == 2
+            stats = client.cache_stats()
+            assert stats["hits"] == 1
+            assert stats["misses"] == 2
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_search_semantic_stream(self):
+        """Test streamed semantic search yields results and fills the cache"""
+        import httpx
+
+        payload = {"results": [{"file_path": "a.py"}, {"file_path": "b.py"}]}
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json=payload)
+
+        client = FastAPIClient(base_url="http://localhost:8000")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        streamed = [r async for r in client.search_semantic_stream(query="auth")]
+        assert streamed == payload["results"]
+
+        cached = await client.search_semantic(query="auth")
+        assert cached["results"] == payload["results"]
+        assert len(requests_seen) == 1
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_survives_restart(self, tmp_path):
+        """Test search results are served from disk after a restart until re-index"""
+        import httpx
+
+        calls = []
+        version = {"value": "v1"}
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path.startswith("/projects"):
+                return httpx.Response(200, json={
+                    "projects": [{"id": "p1", "index_version": version["value"]}]
+                })
+            return httpx.Response(200, json={"results": [{"file_path": "a.py"}]})
+
+        config = APIConfig(disk_cache_dir=str(tmp_path))
+        first = FastAPIClient(base_url="http://localhost:8000", config=config)
+        first.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await first.list_projects()
+        await first.search_semantic(query="auth", project_id="p1")
+        await first.close()
+
+        second = FastAPIClient(base_url="http://localhost:8000", config=config)
+        second.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await second.list_projects()
+        result = await second.search_semantic(query="auth", project_id="p1")
+        assert result == {"results": [{"file_path": "a.py"}]}
+        assert calls.count("/search/semantic") == 1
+        assert second.cache_stats()["disk"]["hits"] == 1
+        await second.close()
+
+        # 재시작 사이에 재인덱싱 - 버전을 확인하기 전에는 디스크 항목을 쓰지 않음
+        version["value"] = "v2"
+        third = FastAPIClient(base_url="http://localhost:8000", config=config)
+        third.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await third.search_semantic(query="auth", project_id="p1")
+        assert calls.count("/search/semantic") == 2
+        assert third.cache_stats()["disk"]["hits"] == 0
+
+        version["value"] = "v3"
+        await third.list_projects()
+        await third.search_semantic(query="auth", project_id="p1")
+        assert calls.count("/search/semantic") == 3
+        await third.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_unscoped_needs_full_project_list(self, tmp_path):
+        """Test unscoped searches only use disk entries after the full project list is synced"""
+        import httpx
+
+        calls = []
+        projects = [{"id": "p1", "index_version": "v1"}, {"id": "p2", "index_version": "v1"}]
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path == "/projects/":
+                return httpx.Response(200, json={"projects": projects})
+            if request.url.path.startswith("/projects/"):
+                return httpx.Response(200, json=projects[0])
+            return httpx.Response(200, json={"results": [{"file_path": "a.py"}]})
+
+        config = APIConfig(disk_cache_dir=str(tmp_path))
+        first = FastAPIClient(base_url="http://localhost:8000", config=config)
+        first.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await first.list_projects()
+        await first.search_semantic(query="auth")
+        await first.close()
+
+        # 단일 프로젝트 조회만으로는 전체 검색의 디스크 항목을 쓰지 않음
+        second = FastAPIClient(base_url="http://localhost:8000", config=config)
+        second.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await second.get_project("p1")
+        await second.search_semantic(query="auth")
+        assert calls.count("/search/semantic") == 2
+        await second.close()
+
+        # 버전을 모르는 프로젝트가 있으면 전체 검색은 디스크 캐시를 쓰지 않음
+        projects[1] = {"id": "p2"}
+        third = FastAPIClient(base_url="http://localhost:8000", config=config)
+        third.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await third.list_projects()
+        await third.search_semantic(query="auth")
+        assert calls.count("/search/semantic") == 3
+        assert third.cache_stats()["disk"]["hits"] == 0
+        await third.close()
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retried(self):
+        """Test 503 and connection resets are retried with backoff"""
+        import httpx
+
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("connection reset")
+            if len(attempts) == 2:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"results": []})
+
+        config = APIConfig(max_retries=2, retry_backoff_base=0.001)
+        client = FastAPIClient(base_url="http://localhost:8000", config=config)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        result = await client.search_semantic(query="auth")
+        assert result == {"results": []}
+        assert len(attempts) == 3
+        assert client.circuit_states() == {"/search/semantic": "closed"}
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_fails_fast(self):
+        """Test an endpoint that keeps failing opens its circuit"""
+        import httpx
+        from src.resilience import CircuitOpenError
+
+        attempts = []
+
+        def handler(request):
+            attempts.append(request.url.path)
+            if request.url.path == "/search/similar-code":
+                return httpx.Response(500)
+            return httpx.Response(200, json={"projects": []})
+
+        config = APIConfig(max_retries=0, circuit_failure_threshold=2)
+        client = FastAPIClient(base_url="http://localhost:8000", config=config)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.find_similar_code(code_snippet="x", language="python")
+        with pytest.raises(CircuitOpenError):
+            await client.find_similar_code(code_snippet="x", language="python")
+        assert attempts.count("/search/similar-code") == 2
+
+        # 다른 엔드포인트는 영향받지 않음
+        assert await client.list_projects() == {"projects": []}
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_find_similar_code_embedding_cache(self):
+        """Test a repeated snippet sends the cached query embedding instead of re-embedding"""
+        import json
+        import httpx
+
+        bodies = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            bodies.append(body)
+            result = {"results": [{"file_path": "a.py", "similarity": 0.9}]}
+            if body.get("return_embedding"):
+                result["query_embedding"] = [0.1, 0.2, 0.3]
+            return httpx.Response(200, json=result)
+
+        client = FastAPIClient(base_url="http://localhost:8000")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        first = await client.find_similar_code(code_snippet="def f():\n    return 1\n", language="python")
+        # 들여쓰기/줄 끝 공백만 다른 스니펫은 같은 캐시 항목
+        second = await client.find_similar_code(code_snippet="    def f():  \r\n        return 1", language="python")
+        await client.find_similar_code(code_snippet="def f():\n    return 1", language="go")
+
+        assert first == second == {"results": [{"file_path": "a.py", "similarity": 0.9}]}
+        assert bodies[0]["return_embedding"] is True and "query_embedding" not in bodies[0]
+        assert bodies[1]["query_embedding"] == [0.1, 0.2, 0.3] and "return_embedding" not in bodies[1]
+        assert bodies[2]["return_embedding"] is True
+        assert client.cache_stats()["embedding"]["hits"] == 1
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_find_similar_code_embedding_fields_rejected(self):
+        """Test a backend that rejects the embedding fields falls back to raw snippets"""
+        import json
+        import httpx
+
+        bodies = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            bodies.append(body)
+            if "return_embedding" in body or "query_embedding" in body:
+                return httpx.Response(422, json={"detail": "extra fields not permitted"})
+            return httpx.Response(200, json={"results": []})
+
+        client = FastAPIClient(base_url="http://localhost:8000")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        assert await client.find_similar_code(code_snippet="x", language="python") == {"results": []}
+        assert await client.find_similar_code(code_snippet="x", language="python") == {"results": []}
+        assert len(bodies) == 3
+        assert "return_embedding" not in bodies[2]
+        assert client.embedding_protocol is False
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_find_similar_code_not_found_keeps_embedding_protocol(self):
+        """Test a 404 for an unknown project does not disable the embedding fields"""
+        import httpx
+
+        def handler(request):
+            return httpx.Response(404, json={"detail": "project not found"})
+
+        client = FastAPIClient(base_url="http://localhost:8000")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.find_similar_code(code_snippet="x", language="python", project_id="missing")
+        assert client.embedding_protocol is True
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_search_semantic_batch(self, client):
+        """Test batch search dedupes queries and bounds concurrency"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_post(url, json):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if json["query"] == "broken":
+                raise RuntimeError("backend down")
+            response = Mock()
+            response.json.return_value = {"results": [{"file_path": f"{json['query']}.py"}]}
+            return response
+
+        with patch.object(client.client, 'post', side_effect=fake_post) as mock_post:
+            results = await client.search_semantic_batch(
+                queries=["a", "b", "a ", "c", "broken"],
+                concurrency=2
+            )
+
+            assert list(results) == ["a", "b", "c", "broken"]
+            assert results["b"]["results"][0]["file_path"] == "b.py"
+            assert isinstance(results["broken"], RuntimeError)
+            assert mock_post.call_count == 4
+            assert max_in_flight == 2
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_search_semantic_batch_deadline(self, client):
+        """Test batch search returns finished queries when the deadline expires"""
+        async def fake_post(url, json):
+            if json["query"] == "slow":
+                await asyncio.sleep(10)
+            response = Mock()
+            response.json.return_value = {"results": [{"file_path": f"{json['query']}.py"}]}
+            return response
+
+        with patch.object(client.client, 'post', side_effect=fake_post):
+            results = await client.search_semantic_batch(
+                queries=["fast", "slow"],
+                deadline=0.05
+            )
+
+        assert results["fast"] == {"results": [{"file_path": "fast.py"}]}
+        assert isinstance(results["slow"], asyncio.TimeoutError)
+        assert client.inflight.in_flight() == 0
+        await client.close()
+
     @pytest.mark.asyncio
     async def test_list_projects(self, client):
         """Test list projects"""
@@ -79,6 +428,27 @@ class TestAPIClient:
 
         await client.close()
 
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_coalesced(self, client):
+        """Test concurrent identical calls share one backend request"""
+        async def slow_get(url):
+            await asyncio.sleep(0.01)
+            response = Mock()
+            response.json.return_value = {"total_chunks": 100}
+            return response
+
+        with patch.object(client.client, 'get', side_effect=slow_get) as mock_get:
+            results = await asyncio.gather(
+                client.get_project_stats("proj_1"),
+                client.get_project_stats("proj_1"),
+                client.get_project_stats("proj_2")
+            )
+
+            assert results[0] is results[1]
+            assert mock_get.call_count == 2
+
+        await client.close()
+
 
 class TestConfig:
     """Tests for configuration management"""
@@ -122,6 +492,21 @@ class TestConfig:
         assert config.api.base_url == "http://localhost:8000"
         assert config.logging.level == "INFO"
 
+    def test_mcp_config_env_overrides(self, tmp_path, monkeypatch):
+        """Test config path and backend URL can be overridden from the environment"""
+        import json
+
+        path = tmp_path / "mcp_config.json"
+        path.write_text(json.dumps({"api": {"base_url": "http://backend:9000", "timeout": 7}}))
+        monkeypatch.setenv("CODE_AGENT_MCP_CONFIG", str(path))
+
+        config = MCPConfig.from_file()
+        assert config.api.base_url == "http://backend:9000"
+        assert config.api.timeout == 7
+
+        monkeypatch.setenv("CODE_AGENT_MCP_API_URL", "http://127.0.0.1:8123")
+        assert MCPConfig.from_file().api.base_url == "http://127.0.0.1:8123"
+
     def test_mcp_config_to_dict(self):
         """Test config serialization"""
         config = MCPConfig(
@@ -139,6 +524,15 @@ class TestConfig:
 class TestMCPTools:
     """Tests for MCP tool handlers"""
 
+    @pytest.fixture(autouse=True)
+    def fresh_symbol_index(self):
+        """Isolate the server-wide symbol index per test"""
+        from src import server
+        from src.symbols import SymbolIndex
+
+        with patch.object(server, 'symbol_index', SymbolIndex()):
+            yield
+
     @pytest.fixture
     def mock_api_client(self):
         """Create mock API client"""
@@ -185,6 +579,272 @@ class TestMCPTools:
             assert "Found 1 results" in result[0]["text"]
             assert "test.py" in result[0]["text"]
 
+    @pytest.mark.asyncio
+    async def test_search_code_reports_failed_shards(self, mock_api_client):
+        """Test partial sharded results carry a note naming the missing shards"""
+        from src import server
+
+        mock_api_client.search_semantic.return_value = {
+            "results": [{"file_path": "a.py", "content": "x", "similarity": 0.9,
+                         "line_start": 1, "line_end": 1, "chunk_type": "function"}],
+            "failed_shards": ["shard-b"]
+        }
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool("search_code", {"query": "test"})
+
+        assert "a.py" in result[0]["text"]
+        assert "backend shard(s) shard-b did not respond" in result[0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_get_function_implementation_exact_match(self, mock_api_client):
+        """Test exact metadata hits win and cancel the semantic fallback"""
+        from src import server
+
+        semantic_cancelled = asyncio.Event()
+
+        async def slow_semantic(**kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                semantic_cancelled.set()
+                raise
+
+        mock_api_client.search_semantic.side_effect = slow_semantic
+        mock_api_client.search_by_metadata = AsyncMock(return_value={
+            "results": [{"file_path": "auth.py", "content": "def login(): pass",
+                         "line_start": 3, "line_end": 4}]
+        })
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "get_function_implementation",
+                {"function_name": "login", "project_id": "proj_1"}
+            )
+
+        assert "Found 1 implementations" in result[0]["text"]
+        assert "auth.py" in result[0]["text"]
+        _, kwargs = mock_api_client.search_by_metadata.call_args
+        assert kwargs["filters"]["project_id"] == "proj_1"
+        await asyncio.wait_for(semantic_cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_get_function_implementation_semantic_fallback(self, mock_api_client):
+        """Test a metadata miss returns the concurrent semantic results"""
+        from src import server
+
+        mock_api_client.search_by_metadata = AsyncMock(return_value={"results": []})
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "get_function_implementation",
+                {"function_name": "tst", "class_name": "Auth"}
+            )
+
+        assert "No exact match for 'tst'" in result[0]["text"]
+        assert "test.py" in result[0]["text"]
+        _, kwargs = mock_api_client.search_semantic.call_args
+        assert kwargs["query"] == "class Auth function tst"
+
+    @pytest.mark.asyncio
+    async def test_get_function_implementation_deadline(self, mock_api_client):
+        """Test the lookup gives up once the deadline expires"""
+        from src import server
+
+        async def hang(**kwargs):
+            await asyncio.sleep(10)
+
+        mock_api_client.search_by_metadata = AsyncMock(side_effect=hang)
+        mock_api_client.search_semantic.side_effect = hang
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await asyncio.wait_for(
+                server.call_tool(
+                    "get_function_implementation",
+                    {"function_name": "login", "deadline": 0.05}
+                ),
+                timeout=1
+            )
+
+        assert "Function 'login' not found." in result[0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_get_function_implementation_zero_deadline_unbounded(self, mock_api_client):
+        """Test a zero deadline waits for the lookup instead of giving up immediately"""
+        from src import server
+
+        async def slow_metadata(**kwargs):
+            await asyncio.sleep(0.05)
+            return {"results": [{"file_path": "auth.py", "content": "def login(): pass",
+                                 "name": "login", "chunk_id": "slow"}]}
+
+        mock_api_client.search_by_metadata = AsyncMock(side_effect=slow_metadata)
+
+        with patch.object(server.config.tools, 'symbol_lookup_deadline', 0), \
+                patch.object(server.config.tools, 'tool_deadline', 0), \
+                patch.object(server.config.tools, 'tool_deadlines', {}), \
+                patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool("get_function_implementation", {"function_name": "login"})
+
+        assert "auth.py" in result[0]["text"]
+        assert "No exact match" not in result[0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_get_function_implementation_local_index(self, mock_api_client):
+        """Test repeated symbol lookups are answered from the local index"""
+        from src import server
+
+        mock_api_client.search_by_metadata = AsyncMock(return_value={
+            "results": [{"file_path": "auth.py", "content": "def login(): pass",
+                         "line_start": 3, "line_end": 4, "chunk_id": "c1"}]
+        })
+
+        with patch.object(server, 'api_client', mock_api_client):
+            await server.call_tool("get_function_implementation", {"function_name": "login"})
+            result = await server.call_tool("get_function_implementation", {"function_name": "login"})
+
+            mock_api_client.search_by_metadata.return_value = {"results": []}
+            mock_api_client.search_semantic.return_value = {"results": []}
+            missing = await server.call_tool("get_function_implementation", {"function_name": "LOG"})
+
+        assert "auth.py" in result[0]["text"]
+        assert mock_api_client.search_by_metadata.await_count == 2  # login 1회 + LOG 1회
+        assert "Did you mean: login?" in missing[0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_get_function_implementation_broader_query_after_narrow(self, mock_api_client):
+        """Test a class-scoped hit does not answer a later lookup across all classes"""
+        from src import server
+
+        a_save = {"file_path": "a.py", "content": "def save(self): pass", "chunk_id": "a",
+                  "name": "save", "class_name": "A"}
+        b_save = {"file_path": "b.py", "content": "def save(self): pass", "chunk_id": "b",
+                  "name": "save", "class_name": "B"}
+
+        async def metadata(filters, top_k=10):
+            hits = [a_save, b_save]
+            if filters.get("class_name"):
+                hits = [h for h in hits if h["class_name"] == filters["class_name"]]
+            return {"results": hits}
+
+        mock_api_client.search_by_metadata = AsyncMock(side_effect=metadata)
+        with patch.object(server, 'api_client', mock_api_client):
+            await server.call_tool("get_function_implementation", {"function_name": "save", "class_name": "A"})
+            broad = await server.call_tool("get_function_implementation", {"function_name": "save"})
+            # 넓은 범위가 완전히 적재된 뒤에는 좁은 범위도 메모리에서 응답
+            await server.call_tool("get_function_implementation", {"function_name": "save", "class_name": "B"})
+
+        assert "a.py" in broad[0]["text"] and "b.py" in broad[0]["text"]
+        assert mock_api_client.search_by_metadata.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_code_token_budget(self, mock_api_client):
+        """Test max_tokens drops results that do not fit and reports them"""
+        from src import server
+
+        mock_api_client.search_semantic.return_value = {
+            "results": [
+                {"file_path": "big.py", "content": "x" * 2000, "similarity": 0.6,
+                 "line_start": 1, "line_end": 1, "chunk_type": "function"},
+                {"file_path": "small.py", "content": "def small(): pass", "similarity": 0.9,
+                 "line_start": 3, "line_end": 3, "chunk_type": "function"}
+            ]
+        }
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "search_code",
+                {"query": "small", "max_tokens": 60}
+            )
+
+        text = result[0]["text"]
+        assert "Found 1 results" in text
+        assert "small.py" in text
+        assert "dropped 1 result(s): big.py:1-1" in text
+
+    @pytest.mark.asyncio
+    async def test_search_code_stream_tool(self, mock_api_client):
+        """Test streaming mode emits one content item per result with progress"""
+        from src import server
+
+        async def fake_stream(**kwargs):
+            for i in range(3):
+                yield {"file_path": f"f{i}.py", "content": "x", "similarity": 0.9 - i / 10,
+                       "line_start": 1, "line_end": 2, "chunk_type": "function"}
+
+        mock_api_client.search_semantic_stream = fake_stream
+        session = Mock()
+        session.send_progress_notification = AsyncMock()
+        ctx = Mock(session=session, meta=Mock(progressToken="tok"))
+
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(type(server.app), 'request_context', new_callable=PropertyMock,
+                             return_value=ctx):
+            result = await server.call_tool(
+                "search_code",
+                {"query": "test", "top_k": 3, "stream": True}
+            )
+
+        assert len(result) == 4
+        assert result[0]["text"] == "Found 3 results:"
+        assert "f0.py" in result[1]["text"]
+        assert session.send_progress_notification.await_count == 3
+        _, kwargs = session.send_progress_notification.call_args
+        assert kwargs["progress"] == 3
+        assert kwargs["total"] == 3
+        mock_api_client.search_semantic.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_search_code_stream_token_budget(self, mock_api_client):
+        """Test streamed search_code results honour max_chars"""
+        from src import server
+
+        async def fake_stream(**kwargs):
+            for i in range(3):
+                yield {"file_path": f"f{i}.py", "content": "x" * 300, "similarity": 0.9 - i / 10,
+                       "line_start": 1, "line_end": 1}
+
+        mock_api_client.search_semantic_stream = fake_stream
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "search_code", {"query": "test", "stream": True, "max_chars": 500}
+            )
+            _, structured = await server.call_tool(
+                "search_code", {"query": "test", "stream": True, "max_chars": 500, "format": "json"}
+            )
+
+        assert result[0]["text"] == "Found 1 results:"
+        assert "f0.py" in result[1]["text"]
+        assert "Token budget reached" in result[-1]["text"]
+        assert [r["file_path"] for r in structured["results"]] == ["f0.py"]
+        assert structured["partial"] is False
+
+    @pytest.mark.asyncio
+    async def test_search_code_batch_tool(self, mock_api_client):
+        """Test search_code_batch labels results per query"""
+        from src import server
+
+        mock_api_client.search_semantic_batch = AsyncMock(return_value={
+            "auth": {"results": [{"file_path": "auth.py", "content": "def login(): pass",
+                                  "similarity": 0.9, "line_start": 1, "line_end": 1}]},
+            "payment": {"results": []},
+            "cache": RuntimeError("timeout")
+        })
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "search_code_batch",
+                {"queries": ["auth", "payment", "cache"]}
+            )
+
+            assert len(result) == 1
+            text = result[0]["text"]
+            assert "Batch search (3 queries)" in text
+            assert "## Query 1: auth" in text
+            assert "auth.py" in text
+            assert "## Query 2: payment\n\nNo results found." in text
+            assert "## Query 3: cache\n\nError: timeout" in text
+
     @pytest.mark.asyncio
     async def test_list_projects_tool(self, mock_api_client):
         """Test list_projects tool execution"""
@@ -226,10 +886,406 @@ class TestMCPTools:
             assert result[0]["type"] == "text"
             assert "Error" in result[0]["text"]
 
+    @pytest.mark.asyncio
+    async def test_search_code_json_format(self, mock_api_client):
+        """Test json format returns backend results as structured content"""
+        import json
+        from src import server
+
+        mock_api_client.search_semantic.return_value = {
+            "results": [{"file_path": "a.py", "content": "x = 1", "similarity": 0.912345}]
+        }
+        with patch.object(server, 'api_client', mock_api_client):
+            content, structured = await server.call_tool("search_code", {"query": "x", "format": "json"})
+
+        assert structured == {"results": [{"file_path": "a.py", "content": "x = 1", "similarity": 0.912345}]}
+        assert json.loads(content[0].text) == structured
+
+    @pytest.mark.asyncio
+    async def test_search_code_dedupes_results(self, mock_api_client):
+        """Test search_code over-fetches and collapses overlapping chunks"""
+        from src import server
+
+        mock_api_client.search_semantic.return_value = {"results": [
+            {"file_path": "a.py", "line_start": 10, "line_end": 12, "content": "a\nb\nc", "similarity": 0.9},
+            {"file_path": "a.py", "line_start": 11, "line_end": 11, "content": "b", "similarity": 0.85},
+            {"file_path": "b.py", "line_start": 1, "line_end": 1, "content": "a\nb\nc", "similarity": 0.8},
+            {"file_path": "c.py", "line_start": 1, "line_end": 1, "content": "d", "similarity": 0.75},
+        ]}
+        with patch.object(server, 'api_client', mock_api_client):
+            _, structured = await server.call_tool("search_code", {"query": "x", "top_k": 2, "format": "json"})
+            raw = await server.call_tool("search_code", {"query": "x", "top_k": 2, "dedupe": False})
+
+        calls = mock_api_client.search_semantic.call_args_list
+        assert calls[0].kwargs["top_k"] == 3
+        assert calls[1].kwargs["top_k"] == 2
+        assert [r["file_path"] for r in structured["results"]] == ["a.py", "c.py"]
+        assert structured["deduplicated"] == {"duplicates": 1, "merged": 1}
+        assert raw[0]["text"].startswith("Found 2 results:")
+
+    @pytest.mark.asyncio
+    async def test_search_code_rerank(self, mock_api_client):
+        """Test rerank over-fetches top_k x N and re-scores locally"""
+        from src import server
+
+        mock_api_client.search_semantic.return_value = {"results": [
+            {"file_path": "util.py", "content": "def helper(x):\n    return x", "similarity": 0.86},
+            {"file_path": "repo.py", "content": "def load_user(user_id):\n    return db.get(user_id)", "similarity": 0.82},
+        ]}
+        with patch.object(server, 'api_client', mock_api_client):
+            _, structured = await server.call_tool(
+                "search_code", {"query": "load_user by id", "top_k": 1, "rerank": True, "format": "json"}
+            )
+            # 예산이 있어도 재정렬 순서 유지
+            _, budgeted = await server.call_tool(
+                "search_code", {"query": "load_user by id", "top_k": 2, "rerank": True, "max_chars": 10000, "format": "json"}
+            )
+
+        assert mock_api_client.search_semantic.call_args_list[0].kwargs["top_k"] == 5
+        assert [r["file_path"] for r in structured["results"]] == ["repo.py"]
+        assert "rerank_score" in structured["results"][0]
+        assert [r["file_path"] for r in budgeted["results"]] == ["repo.py", "util.py"]
+
+    @pytest.mark.asyncio
+    async def test_json_format_from_config(self, mock_api_client):
+        """Test the server-wide output format and structured errors"""
+        from src import server
+
+        mock_api_client.get_project_stats.side_effect = RuntimeError("backend down")
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(server.config.tools, 'output_format', 'json'):
+            _, projects = await server.call_tool("list_projects", {})
+            _, error = await server.call_tool("get_project_stats", {"project_id": "proj_1"})
+            # 인자로 마크다운 지정 가능, server_metrics는 structured 대상 아님
+            markdown = await server.call_tool("list_projects", {"format": "markdown"})
+            metrics_result = await server.call_tool("server_metrics", {})
+
+        assert projects == {"projects": [{"id": "proj_1", "name": "Test", "path": "/test"}]}
+        assert "backend down" in error["error"]
+        assert "Registered projects" in markdown[0]["text"]
+        assert isinstance(metrics_result, list)
+
+    @pytest.mark.asyncio
+    async def test_json_format_structured_content(self, mock_api_client):
+        """Test the SDK returns structuredContent for json format"""
+        from mcp import types
+        from src import server
+
+        request = types.CallToolRequest(params=types.CallToolRequestParams(
+            name="get_function_implementation",
+            arguments={"function_name": "missing", "format": "json"}
+        ))
+        mock_api_client.search_by_metadata = AsyncMock(return_value={"results": []})
+        mock_api_client.search_semantic.return_value = {"results": []}
+        with patch.object(server, 'api_client', mock_api_client):
+            response = await server.app.request_handlers[types.CallToolRequest](request)
+
+        assert response.root.structuredContent == {
+            "function_name": "missing", "match": "none", "results": [], "suggestions": []
+        }
+
+    @pytest.mark.asyncio
+    async def test_search_code_project_tag(self, mock_api_client):
+        """Test search_code fans out over tagged projects and merges results"""
+        from src import server
+        from src.projects import ProjectIndex
+
+        async def search(query, project_id=None, top_k=10, min_similarity=0.7):
+            score = {"proj_1": 0.9, "proj_2": 0.8, "proj_3": 0.7}[project_id]
+            return {"results": [{"file_path": f"{project_id}.py", "content": f"# {project_id}", "similarity": score}]}
+
+        mock_api_client.search_semantic = AsyncMock(side_effect=search)
+        mock_api_client.list_projects.return_value = {"projects": [
+            {"id": "proj_1", "name": "A", "tags": ["Backend"]},
+            {"id": "proj_2", "name": "B", "tags": ["frontend"]},
+        ]}
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(server, 'project_index', ProjectIndex()), \
+                patch.object(server.config.tools, 'project_tags', {"backend": ["proj_3"]}):
+            result = await server.call_tool("search_code", {"query": "x", "project_tag": "backend", "top_k": 5})
+            _, structured = await server.call_tool(
+                "search_code", {"query": "x", "project_ids": ["proj_2", "proj_3"], "format": "json"}
+            )
+            missing = await server.call_tool("search_code", {"query": "x", "project_tag": "nope"})
+
+        text = result[0]["text"]
+        assert "across 2 project(s)" in text
+        assert text.index("[proj_1]") < text.index("[proj_3]")
+        assert "proj_2.py" not in text
+        assert [r["project_id"] for r in structured["results"]] == ["proj_2", "proj_3"]
+        assert "No projects tagged 'nope'" in missing[0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_server_metrics_tool(self, mock_api_client):
+        """Test tool calls are instrumented and reported by server_metrics"""
+        import json
+        from src import server
+        from src.metrics import Metrics
+
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(server, 'metrics', Metrics()):
+            await server.call_tool("search_code", {"query": "test"})
+            await server.call_tool("unknown_tool", {})
+            result = await server.call_tool("server_metrics", {})
+            prometheus = await server.call_tool("server_metrics", {"format": "prometheus"})
+
+        snapshot = json.loads(result[0]["text"])
+        search = snapshot["handlers"]["tool"]["search_code"]
+        assert search["calls"] == 1
+        assert search["errors"] == 0
+        assert search["in_flight"] == 0
+        assert search["response_bytes"]["count"] == 1
+        assert snapshot["handlers"]["tool"]["unknown_tool"]["errors"] == 1
+        assert snapshot["handlers"]["tool"]["server_metrics"]["in_flight"] == 1
+        assert "prompt" in server.metrics.cache_stats()
+        assert 'code_agent_mcp_handler_errors_total{kind="tool",name="unknown_tool"} 1' in prometheus[0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_tool_deadline_cancels_backend_call(self, mock_api_client):
+        """Test a slow backend call is cancelled when the tool deadline expires"""
+        from src import server
+
+        cancelled = asyncio.Event()
+
+        async def slow_similar(**kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        mock_api_client.find_similar_code = AsyncMock(side_effect=slow_similar)
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "find_similar_code",
+                {"code_snippet": "x", "language": "python", "deadline": 0.05}
+            )
+
+        assert "timed out after 0.05s" in result[0]["text"]
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_stream_deadline_returns_partial_results(self, mock_api_client):
+        """Test streamed search returns results received before the deadline"""
+        from src import server
+
+        closed = asyncio.Event()
+
+        async def slow_stream(**kwargs):
+            try:
+                yield {"file_path": "fast.py", "content": "x", "similarity": 0.9,
+                       "line_start": 1, "line_end": 1, "chunk_type": "function"}
+                await asyncio.sleep(10)
+                yield {"file_path": "slow.py"}
+            finally:
+                closed.set()
+
+        mock_api_client.search_semantic_stream = slow_stream
+
+        with patch.object(server, 'api_client', mock_api_client):
+            result = await server.call_tool(
+                "search_code",
+                {"query": "test", "stream": True, "deadline": 0.05}
+            )
+
+        assert result[0]["text"] == "Found 1 results:"
+        assert "fast.py" in result[1]["text"]
+        assert "returning 1 partial result(s)" in result[-1]["text"]
+        assert closed.is_set()
+
+    @pytest.mark.asyncio
+    async def test_config_deadline_per_tool(self, mock_api_client):
+        """Test per-tool deadline overrides the default and arguments override both"""
+        from src import server
+
+        with patch.object(server.config.tools, 'tool_deadline', 30.0), \
+                patch.object(server.config.tools, 'tool_deadlines', {"find_similar_code": 5.0}):
+            assert server._tool_deadline("find_similar_code", {}) == 5.0
+            assert server._tool_deadline("search_code", {}) == 30.0
+            assert server._tool_deadline("search_code", {"deadline": 2}) == 2.0
+            assert server._tool_deadline("search_code", {"deadline": 0}) is None
+
+        # get_function_implementation은 전역 기본값보다 symbol_lookup_deadline을 먼저 사용
+        with patch.object(server.config.tools, 'tool_deadline', 20.0), \
+                patch.object(server.config.tools, 'symbol_lookup_deadline', 5.0), \
+                patch.object(server.config.tools, 'tool_deadlines', {}):
+            assert server._tool_deadline("get_function_implementation", {}) == 5.0
+            assert server._tool_deadline("get_function_implementation", {"deadline": 8}) == 8.0
+            with patch.object(server.config.tools, 'tool_deadlines', {"get_function_implementation": 3.0}):
+                assert server._tool_deadline("get_function_implementation", {}) == 3.0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_cancels_http_call(self):
+        """Test cancelling the MCP handler aborts the in-flight httpx request"""
+        import httpx
+        from src import server
+
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def handler(request):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return httpx.Response(200, json={"results": []})
+
+        client = FastAPIClient(base_url="http://localhost:8000")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with patch.object(server, 'api_client', client):
+            task = asyncio.ensure_future(server.call_tool("search_code", {"query": "auth"}))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert cancelled.is_set()
+        assert client.inflight.in_flight() == 0
+        await client.close()
+
+
+class TestMCPPrompts:
+    """Tests for MCP prompt handlers"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_prompt_cache(self):
+        """Isolate the server-wide prompt cache per test"""
+        from src import server
+        from src.cache import TTLCache
+
+        with patch.object(server, 'prompt_cache', TTLCache(ttl=60)):
+            yield
+
+    @pytest.fixture
+    def mock_api_client(self):
+        """Create mock API client"""
+        client = Mock(spec=FastAPIClient)
+        client.search_semantic = AsyncMock(return_value={
+            "results": [{"file_path": "auth.py", "content": "def login(): pass",
+                         "line_start": 1, "line_end": 1, "similarity": 0.9}]
+        })
+        client.search_by_metadata = AsyncMock(return_value={
+            "results": [{"file_path": "auth.py", "content": "def login(): pass"}]
+        })
+        client.get_project_stats = AsyncMock(return_value={
+            "total_chunks": 100, "total_files": 10, "languages": ["python"]
+        })
+        return client
+
+    @pytest.mark.asyncio
+    async def test_prompt_sources_gathered_concurrently(self, mock_api_client):
+        """Test prompt context sources run in parallel"""
+        from src import server
+
+        started = []
+
+        async def slow_search(**kwargs):
+            started.append("search")
+            await asyncio.sleep(0.05)
+            return {"results": []}
+
+        async def slow_stats(project_id):
+            started.append("stats")
+            await asyncio.sleep(0.05)
+            return {"total_files": 3, "languages": ["go"]}
+
+        mock_api_client.search_semantic.side_effect = slow_search
+        mock_api_client.get_project_stats.side_effect = slow_stats
+
+        with patch.object(server, 'api_client', mock_api_client):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            prompt = await server.get_prompt(
+                "code-review", {"code_query": "auth", "project_id": "proj_1"}
+            )
+            elapsed = loop.time() - start
+
+        assert sorted(started) == ["search", "stats"]
+        assert elapsed < 0.09
+        text = prompt["messages"][0]["content"]["text"]
+        assert "Project context: 3 files" in text
+
+    @pytest.mark.asyncio
+    async def test_prompt_cached_per_arguments(self, mock_api_client):
+        """Test repeated renders with the same arguments hit the cache"""
+        from src import server
+
+        with patch.object(server, 'api_client', mock_api_client):
+            first = await server.get_prompt("explain-code", {"code_description": "login"})
+            second = await server.get_prompt("explain-code", {"code_description": "login"})
+            await server.get_prompt("explain-code", {"code_description": "logout"})
+
+        assert first is second
+        assert mock_api_client.search_semantic.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_degraded_prompt_not_cached(self, mock_api_client):
+        """Test a prompt rendered after a failed context source is not cached"""
+        from src import server
+
+        mock_api_client.search_semantic.side_effect = [RuntimeError("circuit open"), {"results": []}]
+
+        with patch.object(server, 'api_client', mock_api_client):
+            await server.get_prompt("explain-code", {"code_description": "login"})
+            await server.get_prompt("explain-code", {"code_description": "login"})
+            await server.get_prompt("explain-code", {"code_description": "login"})
+
+        # 실패한 첫 렌더링은 캐시되지 않고, 성공한 두 번째 렌더링부터 캐시 사용
+        assert mock_api_client.search_semantic.await_count == 2
+        assert len(server.prompt_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_project_context_left_blank(self, mock_api_client):
+        """Test a failed stats source leaves no placeholder in the prompt text"""
+        from src import server
+
+        mock_api_client.get_project_stats.side_effect = RuntimeError("stats unavailable")
+
+        with patch.object(server, 'api_client', mock_api_client):
+            prompt = await server.get_prompt(
+                "code-review", {"code_query": "auth", "project_id": "proj_1"}
+            )
+
+        text = prompt["messages"][0]["content"]["text"]
+        assert "{}" not in text
+        assert "Project context" not in text
+        assert "auth.py" in text
+
+    @pytest.mark.asyncio
+    async def test_write_tests_scoped_to_project(self, mock_api_client):
+        """Test write-tests honours project_id and tolerates a failing source"""
+        from src import server
+
+        mock_api_client.search_semantic.side_effect = RuntimeError("timeout")
+
+        with patch.object(server, 'api_client', mock_api_client):
+            prompt = await server.get_prompt(
+                "write-tests", {"function_or_class": "login", "project_id": "proj_1"}
+            )
+
+        _, kwargs = mock_api_client.search_by_metadata.call_args
+        assert kwargs["filters"] == {"name": "login", "project_id": "proj_1"}
+        text = prompt["messages"][0]["content"]["text"]
+        assert "auth.py" in text
+        assert "No existing tests found." in text
+
 
 class TestMCPResources:
     """Tests for MCP resource handlers"""
 
+    @pytest.fixture(autouse=True)
+    def fresh_project_index(self):
+        """Isolate the server-wide project index per test"""
+        from src import server
+        from src.projects import ProjectIndex
+
+        with patch.object(server, 'project_index', ProjectIndex(ttl=60)):
+            yield
+
     @pytest.fixture
     def mock_api_client(self):
         """Create mock API client"""
@@ -239,6 +1295,9 @@ class TestMCPResources:
                 {"id": "proj_1", "name": "Test Project", "path": "/test"}
             ]
         })
+        client.get_project = AsyncMock(return_value={
+            "id": "proj_1", "name": "Test Project", "path": "/test"
+        })
         client.get_project_stats = AsyncMock(return_value={
             "total_chunks": 100,
             "total_files": 10
@@ -251,11 +1310,134 @@ class TestMCPResources:
         from src import server
 
         with patch.object(server, 'api_client', mock_api_client):
-            resources = await server.list_resources()
+            result = await server.list_resources(ListResourcesRequest(method="resources/list"))
+            resources = result.resources
 
-            assert len(resources) == 2  # project info + stats
-            assert resources[0]["uri"] == "project://proj_1"
-            assert resources[1]["uri"] == "project://proj_1/stats"
+            assert len(resources) == 3  # project info + stats + server metrics
+            assert str(resources[0].uri) == "project://proj_1"
+            assert str(resources[1].uri) == "project://proj_1/stats"
+            assert str(resources[2].uri) == "metrics://server"
+            assert result.nextCursor is None
+
+    @pytest.mark.asyncio
+    async def test_list_resources_paginated(self, mock_api_client):
+        """Test resources are paged with a cursor over a cached snapshot"""
+        from src import server
+
+        mock_api_client.list_projects.return_value = {
+            "projects": [{"id": f"proj_{i}", "name": f"P{i}"} for i in range(5)]
+        }
+
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(server.config.tools, 'resources_page_size', 2):
+            uris = []
+            cursor = None
+            pages = 0
+            while True:
+                request = ListResourcesRequest(
+                    method="resources/list",
+                    params=PaginatedRequestParams(cursor=cursor) if cursor else None
+                )
+                result = await server.list_resources(request)
+                uris.extend(str(r.uri) for r in result.resources)
+                pages += 1
+                cursor = result.nextCursor
+                if cursor is None:
+                    break
+
+            assert pages == 3
+            assert len(uris) == 11
+            assert uris[-2] == "project://proj_4/stats"
+            assert uris[-1] == "metrics://server"
+            mock_api_client.list_projects.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_list_resources_invalid_cursor(self, mock_api_client):
+        """Test a malformed cursor is an invalid-params error, not an empty page"""
+        from mcp import types
+        from mcp.shared.exceptions import McpError
+        from src import server
+
+        request = ListResourcesRequest(
+            method="resources/list", params=PaginatedRequestParams(cursor="not-a-cursor")
+        )
+        with patch.object(server, 'api_client', mock_api_client):
+            with pytest.raises(McpError) as excinfo:
+                await server.list_resources(request)
+
+        assert excinfo.value.error.code == types.INVALID_PARAMS
+        assert "Invalid cursor" in excinfo.value.error.message
+        mock_api_client.list_projects.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_list_resources_stale_cursor(self, mock_api_client):
+        """Test a cursor from an older snapshot is rejected instead of reusing its offset"""
+        from mcp import types
+        from mcp.shared.exceptions import McpError
+        from src import server
+
+        mock_api_client.list_projects.return_value = {
+            "projects": [{"id": f"proj_{i}", "name": f"P{i}"} for i in range(3)]
+        }
+
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(server.config.tools, 'resources_page_size', 2):
+            first = await server.list_resources(ListResourcesRequest(method="resources/list"))
+
+            mock_api_client.list_projects.return_value = {
+                "projects": [{"id": f"proj_{i}", "name": f"P{i}"} for i in range(1, 4)]
+            }
+            server.project_index._refreshed_at = None  # 스냅샷 만료
+            request = ListResourcesRequest(
+                method="resources/list", params=PaginatedRequestParams(cursor=first.nextCursor)
+            )
+            with pytest.raises(McpError) as excinfo:
+                await server.list_resources(request)
+
+        assert excinfo.value.error.code == types.INVALID_PARAMS
+        assert "Stale cursor" in excinfo.value.error.message
+
+    @pytest.mark.asyncio
+    async def test_list_resources_notifies_on_change(self, mock_api_client):
+        """Test registry changes push resources/list_changed to listing sessions"""
+        from src import server
+
+        session = Mock()
+        session.send_resource_list_changed = AsyncMock()
+
+        with patch.object(server, 'api_client', mock_api_client), \
+                patch.object(server, '_current_session', return_value=session), \
+                patch.object(server, '_resource_sessions', set()):
+            await server.list_resources(ListResourcesRequest(method="resources/list"))
+            session.send_resource_list_changed.assert_not_awaited()
+
+            mock_api_client.list_projects.return_value = {
+                "projects": [{"id": "proj_2", "name": "New Project"}]
+            }
+            server.project_index._refreshed_at = None  # 스냅샷 만료
+            result = await server.list_resources(ListResourcesRequest(method="resources/list"))
+
+            session.send_resource_list_changed.assert_awaited_once()
+            assert str(result.resources[0].uri) == "project://proj_2"
+
+    @pytest.mark.asyncio
+    async def test_read_metrics_resource(self, mock_api_client):
+        """Test metrics resource reports handler latencies"""
+        import json
+        from src import server
+
+        with patch.object(server, 'api_client', mock_api_client):
+            await server.read_resource("project://proj_1/stats")
+            content = await server.read_resource("metrics://server")
+            prometheus = await server.read_resource("metrics://server/prometheus")
+
+        snapshot = json.loads(content[0].content)
+        stats = snapshot["handlers"]["resource"]["project://{id}/stats"]
+        assert stats["calls"] >= 1
+        assert stats["latency_seconds"]["p50"] is not None
+        assert content[0].mime_type == "application/json"
+        assert prometheus[0].mime_type == "text/plain"
+        assert 'name="project://{id}/stats"' in prometheus[0].content
 
     @pytest.mark.asyncio
     async def test_read_resource_project(self, mock_api_client):
@@ -265,8 +1447,44 @@ class TestMCPResources:
         with patch.object(server, 'api_client', mock_api_client):
             content = await server.read_resource("project://proj_1")
 
-            assert "proj_1" in content
-            assert "Test Project" in content
+            assert "proj_1" in content[0].content
+            assert "Test Project" in content[0].content
+            mock_api_client.get_project.assert_awaited_once_with("proj_1")
+            mock_api_client.list_projects.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_read_resource_project_uses_index(self, mock_api_client):
+        """Test project reads after listing are served from the index"""
+        from src import server
+
+        with patch.object(server, 'api_client', mock_api_client):
+            await server.list_resources(ListResourcesRequest(method="resources/list"))
+            await server.read_resource("project://proj_1")
+            await server.read_resource("project://proj_1")
+
+            mock_api_client.list_projects.assert_awaited_once()
+            mock_api_client.get_project.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_read_resource_project_fallback_to_list(self, mock_api_client):
+        """Test backends without single-project fetch fall back to the listing"""
+        import httpx
+        from src import server
+
+        request = httpx.Request("GET", "http://localhost:8000/projects/proj_1")
+        mock_api_client.get_project.side_effect = httpx.HTTPStatusError(
+            "Not Found", request=request, response=httpx.Response(404, request=request)
+        )
+
+        with patch.object(server, 'api_client', mock_api_client):
+            content = await server.read_resource("project://proj_1")
+            assert "Test Project" in content[0].content
+
+            with pytest.raises(ValueError, match="Project not found"):
+                await server.read_resource("project://missing")
+
+            # 전체 목록은 TTL 동안 한 번만 조회
+            mock_api_client.list_projects.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_read_resource_stats(self, mock_api_client):
@@ -276,8 +1494,108 @@ class TestMCPResources:
         with patch.object(server, 'api_client', mock_api_client):
             content = await server.read_resource("project://proj_1/stats")
 
-            assert "100" in content  # total_chunks
-            assert "10" in content  # total_files
+            assert "100" in content[0].content  # total_chunks
+            assert "10" in content[0].content  # total_files
+
+
+class TestHTTPTransport:
+    """Tests for the streamable HTTP transport"""
+
+    @pytest.fixture
+    async def http_server(self):
+        """Run the streamable HTTP app on a free local port in the test loop"""
+        import socket
+        import uvicorn
+        from src import server
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        http = uvicorn.Server(uvicorn.Config(
+            server.create_http_app(), host="127.0.0.1", port=port, log_level="warning"
+        ))
+        task = asyncio.create_task(http.serve())
+        while not http.started:
+            await asyncio.sleep(0.01)
+        yield f"http://127.0.0.1:{port}{server.config.server.http_path}"
+        http.should_exit = True
+        await task
+
+    @pytest.mark.asyncio
+    async def test_sessions_share_api_client(self, http_server):
+        """Test concurrent sessions are served by one process and one API client"""
+        from mcp import ClientSession
+        try:
+            from mcp.client.streamable_http import streamable_http_client
+        except ImportError:
+            # mcp < 1.24의 이름
+            from mcp.client.streamable_http import streamablehttp_client as streamable_http_client
+        from src import server
+
+        client = Mock(spec=FastAPIClient)
+        client.list_projects = AsyncMock(return_value={
+            "projects": [{"id": "proj_1", "name": "Shared", "path": "/shared"}]
+        })
+
+        async def session_call():
+            async with streamable_http_client(http_server) as (read_stream, write_stream, _):
+                async with ClientSession(read_stream, write_stream) as session:
+                    init = await session.initialize()
+                    assert init.capabilities.resources.listChanged
+                    result = await session.call_tool("list_projects", {})
+                    return result.content[0].text
+
+        with patch.object(server, 'api_client', client):
+            texts = await asyncio.gather(session_call(), session_call())
+
+        assert all("Shared" in text for text in texts)
+        assert client.list_projects.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_foreign_host(self, http_server):
+        """Test DNS rebinding protection on a loopback bind"""
+        import httpx
+
+        async with httpx.AsyncClient() as http:
+            response = await http.post(
+                http_server,
+                headers={"Host": "evil.example:80", "Content-Type": "application/json"},
+                json={"jsonrpc": "2.0", "id": 1, "method": "ping"}
+            )
+        assert response.status_code in (400, 421)
+
+    def test_main_transport_flags(self):
+        """Test command line flags select the transport"""
+        from src import server
+
+        with patch.object(server, 'run_server', Mock(return_value=None)), \
+                patch.object(server.asyncio, 'run') as run, \
+                patch.object(server.config, 'server', ServerConfig()):
+            server.main(["--transport", "http", "--port", "9999"])
+            assert server.config.server.transport == "http"
+            assert server.config.server.port == 9999
+            run.assert_called_once()
+
+
+class TestStartup:
+    """Tests for deferred startup work"""
+
+    def test_symbol_snapshot_loaded_on_first_use(self, tmp_path):
+        """Test the symbol snapshot is read lazily instead of at startup"""
+        from src import server
+        from src.symbols import SymbolIndex
+
+        path = tmp_path / "symbols.json"
+        saved = SymbolIndex(snapshot_path=str(path))
+        saved.add({"name": "parse", "project_id": "p", "file_path": "a.py", "content": "def parse(): ..."})
+        saved.save()
+
+        index = SymbolIndex(snapshot_path=str(path))
+        with patch.object(server, 'symbol_index', index), patch.object(server, '_symbols_loaded', False):
+            assert len(index) == 0
+            assert server._symbols().lookup("parse")
+            assert server._symbols_loaded
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""
+Tests for latency and cache instrumentation
+"""
+
+import asyncio
+import pytest
+from src.metrics import Histogram, Metrics
+
+
+class TestHistogram:
+    """Tests for bucketed histogram with percentile window"""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles over recent samples"""
+        hist = Histogram((1, 10, 100))
+        for value in range(1, 101):
+            hist.observe(value)
+
+        assert hist.percentile(50) == 50
+        assert hist.percentile(95) == 95
+        assert hist.percentile(99) == 99
+        assert hist.count == 100
+        assert hist.cumulative() == [("1", 1), ("10", 10), ("100", 100), ("+Inf", 100)]
+
+    def test_window_bounds_percentiles(self):
+        """Test percentiles use only the most recent window"""
+        hist = Histogram((1,), window=3)
+        for value in (100, 100, 1, 2, 3):
+            hist.observe(value)
+        assert hist.percentile(99) == 3
+        assert hist.count == 5
+
+    def test_empty(self):
+        """Test empty histogram has no percentiles"""
+        assert Histogram((1,)).percentile(50) is None
+
+
+class TestMetrics:
+    """Tests for the metrics registry"""
+
+    def test_track_records_latency_and_errors(self):
+        """Test track() counts calls, errors and payload sizes"""
+        metrics = Metrics()
+        with metrics.track("tool", "search_code") as span:
+            span.response_bytes = 512
+        with pytest.raises(ValueError):
+            with metrics.track("tool", "search_code"):
+                raise ValueError("boom")
+
+        stats = metrics.snapshot()["handlers"]["tool"]["search_code"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["response_bytes"]["sum"] == 512
+
+    @pytest.mark.asyncio
+    async def test_track_in_flight_and_cancelled(self):
+        """Test in-flight gauge and cancellation counter"""
+        metrics = Metrics()
+        started = asyncio.Event()
+
+        async def handler():
+            with metrics.track("backend", "/search/semantic"):
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(handler())
+        await started.wait()
+        assert metrics.snapshot()["handlers"]["backend"]["/search/semantic"]["in_flight"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        stats = metrics.snapshot()["handlers"]["backend"]["/search/semantic"]
+        assert stats["in_flight"] == 0
+        assert stats["cancelled"] == 1
+        assert stats["errors"] == 0
+
+    def test_cache_stats_flattened(self):
+        """Test nested cache stats are flattened and failures skipped"""
+        metrics = Metrics()
+        metrics.register_cache("search", lambda: {"hits": 3, "misses": 1, "disk": {"hits": 2}})
+        metrics.register_cache("broken", lambda: 1 / 0)
+
+        caches = metrics.cache_stats()
+        assert caches == {"search": {"hits": 3, "misses": 1}, "search_disk": {"hits": 2}}
+
+    def test_prometheus_dump(self, tmp_path):
+        """Test Prometheus text exposition output"""
+        metrics = Metrics()
+        metrics.register_cache("search", lambda: {"hits": 3, "hit_rate": 0.75})
+        with metrics.track("resource", 'project://"x"'):
+            pass
+
+        text = metrics.prometheus()
+        assert "# TYPE code_agent_mcp_handler_latency_seconds histogram" in text
+        assert 'name="project://\\"x\\""' in text
+        assert 'code_agent_mcp_handler_latency_seconds_count{kind="resource",name="project://\\"x\\""} 1' in text
+        assert 'code_agent_mcp_cache_hit_ratio{cache="search"} 0.75' in text
+
+        path = tmp_path / "metrics" / "mcp.prom"
+        metrics.write_prometheus(str(path))
+        assert path.read_text() == text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Tests for token-budget-aware result packing
+"""
+
+import pytest
+from src.packing import budget_chars, pack_results, trim_content, CHARS_PER_TOKEN
+
+
+def _result(name, similarity, lines=5, width=40, line_start=1):
+    content = "\n".join(f"{name}_line_{i} " + "x" * width for i in range(lines))
+    return {
+        "file_path": f"{name}.py",
+        "content": content,
+        "similarity": similarity,
+        "line_start": line_start,
+        "line_end": line_start + lines - 1
+    }
+
+
+class TestBudget:
+    """Tests for budget conversion"""
+
+    def test_unlimited(self):
+        assert budget_chars() is None
+        assert budget_chars(max_tokens=0) is None
+
+    def test_smaller_budget_wins(self):
+        assert budget_chars(max_tokens=100) == 100 * CHARS_PER_TOKEN
+        assert budget_chars(max_tokens=100, max_chars=50) == 50
+
+
+class TestTrimContent:
+    """Tests for relevance-centred trimming"""
+
+    def test_keeps_most_relevant_line(self):
+        content = "\n".join(["import os"] * 20 + ["def validate_token(token):"] + ["pass"] * 20)
+        text, first, last = trim_content(content, 60, query="validateToken")
+
+        assert "def validate_token(token):" in text
+        assert first <= 20 <= last
+        assert text.startswith("...")
+        assert text.endswith("...")
+
+    def test_fits_without_trimming(self):
+        text, first, last = trim_content("a\nb", 100)
+        assert text == "a\nb"
+        assert (first, last) == (0, 1)
+
+
+class TestPackResults:
+    """Tests for greedy packing"""
+
+    def test_no_budget_returns_all(self):
+        results = [_result("a", 0.9), _result("b", 0.8)]
+        packed = pack_results(results, None)
+        assert packed.results == results
+        assert packed.summary() is None
+
+    def test_fills_by_similarity_and_reports_drops(self):
+        low, high = _result("low", 0.5), _result("high", 0.95)
+        one = len(high["content"]) + 80 + len(high["file_path"])
+        packed = pack_results([low, high], one + 10, min_chunk_chars=50)
+
+        assert [r["file_path"] for r in packed.results] == ["high.py"]
+        assert packed.dropped == [low]
+        assert "dropped 1 result(s): low.py:1-5" in packed.summary()
+
+    def test_trims_long_chunk_without_mutating_input(self):
+        big = _result("big", 0.9, lines=100, line_start=10)
+        original = dict(big)
+        packed = pack_results([big], 800, query="big_line_50", min_chunk_chars=100)
+
+        assert packed.trimmed == 1
+        trimmed = packed.results[0]
+        assert trimmed["trimmed"] is True
+        assert "big_line_50" in trimmed["content"]
+        assert trimmed["line_start"] > 10
+        assert packed.used_chars <= 800 + 10
+        assert big == original
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+    def test_keeps_rerank_order(self):
+        """Reranked results are packed by rerank_score, not raw similarity"""
+        from src.rerank import rerank_results
+
+        boilerplate = {"file_path": "a.py", "content": "def helper(x):\n    return x" + " " * 300, "similarity": 0.9}
+        match = {"file_path": "b.py", "content": "def load_user(user_id):\n    return db.get(user_id)" + " " * 300,
+                 "similarity": 0.8}
+        reranked = rerank_results([boilerplate, match], "load_user by user id")
+
+        assert [r["file_path"] for r in pack_results(reranked, 10000).results] == ["b.py", "a.py"]
+        packed = pack_results(reranked, 450, min_chunk_chars=1000)
+        assert [r["file_path"] for r in packed.results] == ["b.py"]
+        assert [r["file_path"] for r in packed.dropped] == ["a.py"]
@@ -0,0 +1,52 @@
+"""
+Performance tests driving the MCP server over stdio against the fake backend
+"""
+
+import pytest
+
+pytest.importorskip("uvicorn")
+pytest.importorskip("starlette")
+
+from benchmarks.fake_backend import BackendProfile
+from benchmarks.stdio_bench import SCENARIOS, run_benchmark
+
+
+@pytest.fixture(scope="module")
+async def report():
+    """Run a short benchmark once for all assertions"""
+    return await run_benchmark(
+        scenarios=SCENARIOS,
+        concurrency_levels=(1, 4),
+        requests=12,
+        profile=BackendProfile(latency_ms=50.0, jitter_ms=0.0, results=10, content_chars=400)
+    )
+
+
+@pytest.mark.performance
+class TestStdioBenchmark:
+    """Smoke benchmark of tool, prompt and resource hot paths"""
+
+    def test_all_requests_succeed(self, report):
+        """Test every scenario completes without errors"""
+        assert {r["scenario"] for r in report["results"]} == set(SCENARIOS)
+        for r in report["results"]:
+            assert r["errors"] == 0, r
+
+    def test_latency_bounded(self, report):
+        """Test tail latency stays within a generous multiple of backend latency"""
+        for r in report["results"]:
+            assert r["p95_ms"] < 2000, r
+
+    def test_concurrency_scales_throughput(self, report):
+        """Test concurrent calls are not serialized somewhere in the server"""
+        by_level = {
+            (r["scenario"], r["concurrency"]): r["throughput"] for r in report["results"]
+        }
+        for scenario in ("search_code", "resource:project_stats"):
+            assert by_level[(scenario, 4)] > 1.5 * by_level[(scenario, 1)], scenario
+
+    def test_server_metrics_reported(self, report):
+        """Test the server's own metrics see the benchmark traffic"""
+        handlers = report["server"]["handlers"]
+        assert handlers["tool"]["search_code"]["calls"] == 24
+        assert handlers["backend"]["/search/semantic"]["latency_seconds"]["p50"] >= 0.05
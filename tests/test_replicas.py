@@ -0,0 +1,182 @@
+"""
+Tests for replica balancing and hedged requests
+"""
+
+import asyncio
+import httpx
+import pytest
+from src.api_client import HEDGE_MIN_SAMPLES, FastAPIClient
+from src.config import APIConfig
+from src.replicas import ReplicaSet
+
+
+def _client(handler, replicas=("http://r1:8000",), **overrides):
+    config = APIConfig(
+        base_url="http://r0:8000",
+        replicas=list(replicas),
+        max_retries=0,
+        **overrides
+    )
+    client = FastAPIClient(base_url=config.base_url, config=config)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestReplicaSet:
+    """Tests for least-outstanding selection"""
+
+    def test_pick_least_outstanding(self):
+        """Test the replica with fewer requests in flight is chosen"""
+        replicas = ReplicaSet(["http://a", "http://b"])
+        a, b = replicas.replicas
+
+        with replicas.acquire(a):
+            assert replicas.pick() is b
+            with replicas.acquire(b), replicas.acquire(b):
+                assert replicas.pick() is a
+        assert a.outstanding == 0 and b.outstanding == 0
+
+    def test_pick_round_robin_on_ties(self):
+        """Test idle replicas take turns and duplicates are dropped"""
+        replicas = ReplicaSet(["http://a", "http://b", "http://a"])
+
+        assert len(replicas) == 2
+        picked = {replicas.pick().base_url for _ in range(4)}
+        assert picked == {"http://a", "http://b"}
+
+    def test_pick_respects_exclude_and_availability(self):
+        """Test excluded and unavailable replicas are skipped"""
+        replicas = ReplicaSet(["http://a", "http://b"])
+        a, b = replicas.replicas
+
+        assert replicas.pick(exclude=(a,)) is b
+        assert replicas.pick(available=lambda r: r is a) is a
+        assert replicas.pick(exclude=(a,), available=lambda r: r is a) is None
+
+
+class TestReplicaClient:
+    """Tests for FastAPIClient over a replica set"""
+
+    @pytest.mark.asyncio
+    async def test_requests_spread_over_replicas(self):
+        """Test concurrent searches are balanced across replicas"""
+        hosts = []
+
+        async def handler(request):
+            hosts.append(request.url.host)
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"results": []})
+
+        client = _client(handler)
+        await asyncio.gather(*(client.search_semantic(f"query {i}") for i in range(4)))
+
+        assert sorted(hosts) == ["r0", "r0", "r1", "r1"]
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_replica(self):
+        """Test a failing replica is taken out while the other keeps serving"""
+        async def handler(request):
+            if request.url.host == "r0":
+                return httpx.Response(503)
+            return httpx.Response(200, json={"results": [{"id": "ok"}]})
+
+        client = _client(handler, circuit_failure_threshold=1, circuit_reset_timeout=60.0)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.search_semantic("first")
+
+        result = await client.search_semantic("second")
+        assert result["results"] == [{"id": "ok"}]
+        assert client.circuit_states()["http://r0:8000/search/semantic"] == "open"
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_hedge_slow_request(self):
+        """Test a request slower than the percentile is duplicated and the loser cancelled"""
+        slow = {"on": False}
+        cancelled = []
+
+        async def handler(request):
+            try:
+                if slow["on"] and request.url.host == "r0":
+                    await asyncio.sleep(5)
+                else:
+                    await asyncio.sleep(0.005)
+            except asyncio.CancelledError:
+                cancelled.append(request.url.host)
+                raise
+            return httpx.Response(200, json={"results": [{"host": request.url.host}]})
+
+        client = _client(handler, hedge_percentile=95.0, hedge_min_delay=0.01)
+        for i in range(HEDGE_MIN_SAMPLES):
+            await client.search_semantic(f"warmup {i}")
+        assert client.hedged_requests == 0
+
+        slow["on"] = True
+        # 유휴 상태에서는 라운드 로빈이므로 r0가 먼저 선택될 때까지 반복
+        for i in range(2):
+            result = await asyncio.wait_for(client.search_semantic(f"slow {i}"), 1.0)
+            assert result["results"] == [{"host": "r1"}]
+
+        assert client.hedged_requests >= 1
+        assert client.hedge_wins == client.hedged_requests
+        await asyncio.sleep(0)
+        assert cancelled == ["r0"] * client.hedged_requests
+        assert all(r.outstanding == 0 for r in client.replicas.replicas)
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_hedge_loser_error_retrieved(self):
+        """Test a failure finishing together with the winning response is not left unretrieved"""
+        import gc
+
+        async def handler(request):
+            return httpx.Response(200, json={"results": []})
+
+        client = _client(handler)
+        client._hedge_delay = lambda endpoint: 0.01
+        release = asyncio.Event()
+
+        async def send(replica, method, endpoint, path, **kwargs):
+            await release.wait()
+            if replica.base_url == "http://r0:8000":
+                raise httpx.ConnectError("replica down")
+            return httpx.Response(200, json={"results": [{"host": "r1"}]})
+
+        client._send = send
+        client.replicas.pick = lambda exclude=(), available=None: next(
+            r for r in client.replicas.replicas if r not in exclude
+        )
+        unretrieved = []
+        loop = asyncio.get_running_loop()
+        previous = loop.get_exception_handler()
+        loop.set_exception_handler(lambda _, context: unretrieved.append(context))
+        try:
+            request = asyncio.ensure_future(client._hedged_send("get", "/projects/", "/projects/"))
+            await asyncio.sleep(0.05)
+            release.set()
+            response = await request
+            assert response.json() == {"results": [{"host": "r1"}]}
+            del request
+            gc.collect()
+        finally:
+            loop.set_exception_handler(previous)
+
+        assert unretrieved == []
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_without_samples(self):
+        """Test hedging waits until enough latency samples exist"""
+        async def handler(request):
+            return httpx.Response(200, json={"results": []})
+
+        client = _client(handler, hedge_percentile=95.0)
+        assert client._hedge_delay("/search/semantic") is None
+        for i in range(HEDGE_MIN_SAMPLES):
+            await client.search_semantic(f"q {i}")
+        assert client._hedge_delay("/search/semantic") == pytest.approx(
+            max(0.05, client.latencies["/search/semantic"].percentile(95.0))
+        )
+        assert client._hedge_delay("/projects/") is None
+        await client.close()
@@ -0,0 +1,73 @@
+"""
+Tests for local lexical re-ranking
+"""
+
+import time
+from src.rerank import bm25_scores, query_identifiers, query_terms, rerank_results
+
+
+class TestRerank:
+    """Tests for BM25 + identifier overlap re-ranking"""
+
+    def test_query_terms_split_identifiers(self):
+        assert query_terms("getUserById HTTPServer user_id v2") == ["get", "user", "by", "id", "http", "server"]
+        assert query_identifiers("find getUserById in db") == ["find", "getUserById"]
+
+    def test_bm25_prefers_rarer_terms(self):
+        documents = ["user user config", "config value", "config user"]
+        scores = bm25_scores(["user", "config"], documents)
+
+        assert scores[0] > scores[2] > scores[1]
+        assert bm25_scores(["missing"], documents) == [0.0, 0.0, 0.0]
+
+    def test_lexical_match_outranks_boilerplate(self):
+        """A chunk naming the queried identifier moves above generic code"""
+        results = [
+            {"file_path": "util.py", "content": "def helper(x):\n    return x", "similarity": 0.86},
+            {"file_path": "repo.py", "content": "def load_user(user_id):\n    return db.get(user_id)", "similarity": 0.82},
+        ]
+        reranked = rerank_results(results, "load_user by user id")
+
+        assert [r["file_path"] for r in reranked] == ["repo.py", "util.py"]
+        assert reranked[0]["rerank_score"] > reranked[1]["rerank_score"]
+        assert "rerank_score" not in results[0]
+
+    def test_substring_does_not_count_as_term(self):
+        """A term buried inside another word must not outrank a real identifier hit"""
+        documents = ["budget = target + gadget", "def get(key):", "getUser() HTTPServer"]
+        scores = bm25_scores(["get", "server"], documents)
+
+        assert scores[0] == 0.0
+        assert scores[1] > 0.0 and scores[2] > 0.0
+
+        results = [
+            {"file_path": "a.py", "content": "budget = target - gadget\nbudget += gadget", "similarity": 0.8},
+            {"file_path": "b.py", "content": "def get(key):\n    return cache[key]", "similarity": 0.8},
+        ]
+        reranked = rerank_results(results, "get")
+
+        assert [r["file_path"] for r in reranked] == ["b.py", "a.py"]
+        assert reranked[1]["rerank_score"] < reranked[0]["rerank_score"]
+
+    def test_weight_zero_keeps_similarity_order(self):
+        results = [
+            {"content": "a", "similarity": 0.9},
+            {"content": "load_user", "similarity": 0.8},
+            {"content": "b", "similarity": 0.8},
+        ]
+        reranked = rerank_results(results, "load_user", lexical_weight=0.0, top_k=2)
+
+        assert [r["content"] for r in reranked] == ["a", "load_user"]
+        assert rerank_results([], "x") == []
+
+    def test_500_candidates_fast(self):
+        """Re-ranking a 500-candidate over-fetch stays well within a tool call budget"""
+        results = [
+            {"file_path": f"src/m{i}.py", "content": "def handler(request):\n    return fetch_user(request.user_id)\n" * 8,
+             "similarity": 0.9 - i / 1000}
+            for i in range(500)
+        ]
+        start = time.perf_counter()
+        rerank_results(results, "fetch user by id", top_k=10)
+
+        assert time.perf_counter() - start < 0.5
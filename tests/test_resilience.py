@@ -0,0 +1,99 @@
+"""
+Tests for retry policy and circuit breaker
+"""
+
+import pytest
+import httpx
+from unittest.mock import patch
+from src.resilience import CircuitBreaker, RetryPolicy, is_backend_failure, is_retryable
+
+
+def _status_error(status, headers=None):
+    request = httpx.Request("POST", "http://localhost:8000/search/semantic")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestRetryPolicy:
+    """Tests for backoff retry policy"""
+
+    def test_retryable_errors(self):
+        """Test only transient failures are retried"""
+        assert is_retryable(_status_error(503))
+        assert is_retryable(_status_error(429))
+        assert is_retryable(httpx.ConnectError("reset"))
+        assert not is_retryable(_status_error(404))
+        assert not is_retryable(_status_error(500))
+        assert not is_retryable(ValueError("bad json"))
+
+        assert is_backend_failure(_status_error(500))
+        assert not is_backend_failure(_status_error(429))
+
+    def test_retry_budget(self):
+        """Test retries stop after max_retries"""
+        policy = RetryPolicy(max_retries=2)
+        error = httpx.ReadTimeout("slow")
+        assert policy.should_retry(error, 0)
+        assert policy.should_retry(error, 1)
+        assert not policy.should_retry(error, 2)
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test delay stays within the exponential cap"""
+        policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+        for attempt in range(6):
+            assert 0 <= policy.delay(attempt) <= min(2.0, 0.5 * 2 ** attempt)
+
+    def test_retry_after_header(self):
+        """Test Retry-After is honoured up to max_delay"""
+        policy = RetryPolicy(max_delay=2.0)
+        assert policy.delay(0, _status_error(503, {"retry-after": "1.5"})) == 1.5
+        assert policy.delay(0, _status_error(503, {"retry-after": "60"})) == 2.0
+
+
+class TestCircuitBreaker:
+    """Tests for per-endpoint circuit breaker"""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert 0 < breaker.retry_after() <= 30
+
+    def test_half_open_single_probe(self):
+        """Test half-open lets one probe through and closes on success"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch("src.resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("src.resilience.time.monotonic", return_value=111.0):
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.allow()
+            assert not breaker.allow()
+            breaker.record_success()
+            assert breaker.state == CircuitBreaker.CLOSED
+            assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        """Test a failed probe re-opens the circuit"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+        with patch("src.resilience.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                breaker.record_failure()
+        with patch("src.resilience.time.monotonic", return_value=111.0):
+            assert breaker.allow()
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+
+    def test_disabled(self):
+        """Test threshold 0 never opens"""
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+        assert breaker.allow()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
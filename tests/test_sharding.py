@@ -0,0 +1,151 @@
+"""
+Tests for multi-backend sharding
+"""
+
+import asyncio
+import httpx
+import pytest
+from src.config import APIConfig
+from src.sharding import ShardedClient, create_api_client, merge_by_similarity
+from src.api_client import FastAPIClient
+
+
+def _backend(projects, results, delay=0.0, fail=False):
+    """Mock backend owning `projects` and returning `results` for every search"""
+    seen = []
+
+    async def handler(request):
+        seen.append((request.url.path, request.content))
+        if fail:
+            return httpx.Response(503)
+        if delay:
+            await asyncio.sleep(delay)
+        if request.url.path == "/projects/":
+            return httpx.Response(200, json={"projects": [{"id": p, "name": p} for p in projects]})
+        if request.url.path.endswith("/stats"):
+            return httpx.Response(200, json={"total_files": len(projects)})
+        return httpx.Response(200, json={"results": results})
+
+    return handler, seen
+
+
+def _client(*handlers, shard_timeout=1.0):
+    config = APIConfig(
+        backends=[{"name": f"s{i}", "base_url": f"http://s{i}:8000"} for i in range(len(handlers))],
+        shard_timeout=shard_timeout,
+        max_retries=0
+    )
+    client = ShardedClient(config)
+    for shard, handler in zip(client.shards, handlers):
+        shard.client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestMerge:
+    """Tests for k-way merge"""
+
+    def test_merge_by_similarity(self):
+        """Test results are interleaved by similarity and cut to top_k"""
+        a = [{"id": "a1", "similarity": 0.9}, {"id": "a2", "similarity": 0.5}]
+        b = [{"id": "b2", "similarity": 0.6}, {"id": "b1", "similarity": 0.95}]
+
+        merged = merge_by_similarity([a, b], top_k=3)
+        assert [r["id"] for r in merged] == ["b1", "a1", "b2"]
+
+
+class TestShardedClient:
+    """Tests for routing and fan-out"""
+
+    def test_factory(self):
+        """Test a plain client is used without backends"""
+        assert isinstance(create_api_client(APIConfig()), FastAPIClient)
+        assert isinstance(
+            create_api_client(APIConfig(backends=[{"base_url": "http://a:8000"}])),
+            ShardedClient
+        )
+
+    def test_disk_cache_per_shard(self, tmp_path):
+        """Test shards never share a disk cache"""
+        client = ShardedClient(APIConfig(
+            disk_cache_dir=str(tmp_path),
+            backends=[{"name": "a", "base_url": "http://a"}, {"name": "b", "base_url": "http://b"}]
+        ))
+        paths = {shard.client.disk_cache.path for shard in client.shards}
+        assert len(paths) == 2
+
+    @pytest.mark.asyncio
+    async def test_unscoped_search_fans_out_and_merges(self):
+        """Test unscoped search queries every shard and merges by similarity"""
+        h0, seen0 = _backend(["p0"], [{"file_path": "a.py", "similarity": 0.8}])
+        h1, seen1 = _backend(["p1"], [{"file_path": "b.py", "similarity": 0.9},
+                                      {"file_path": "c.py", "similarity": 0.7}])
+        client = _client(h0, h1)
+
+        result = await client.search_semantic(query="auth", top_k=2)
+
+        assert [r["file_path"] for r in result["results"]] == ["b.py", "a.py"]
+        assert "failed_shards" not in result
+        assert len(seen0) == 1 and len(seen1) == 1
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_project_scoped_search_routed_to_owner(self):
+        """Test project-scoped calls only hit the owning shard"""
+        h0, seen0 = _backend(["p0"], [{"file_path": "a.py", "similarity": 0.8}])
+        h1, seen1 = _backend(["p1"], [{"file_path": "b.py", "similarity": 0.9}])
+        client = _client(h0, h1)
+
+        result = await client.search_semantic(query="auth", project_id="p1")
+        stats = await client.get_project_stats("p1")
+
+        assert [r["file_path"] for r in result["results"]] == ["b.py"]
+        assert stats == {"total_files": 1}
+        assert [path for path, _ in seen0] == ["/projects/"]
+        assert [path for path, _ in seen1] == ["/projects/", "/search/semantic", "/projects/p1/stats"]
+        assert client.owners == {"p0": "s0", "p1": "s1"}
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_and_timeout(self):
+        """Test failing and slow shards are reported while others still answer"""
+        h0, _ = _backend(["p0"], [{"file_path": "a.py", "similarity": 0.8}])
+        h1, _ = _backend(["p1"], [], fail=True)
+        h2, _ = _backend(["p2"], [{"file_path": "slow.py", "similarity": 0.99}], delay=1.0)
+        client = _client(h0, h1, h2, shard_timeout=0.05)
+
+        result = await client.find_similar_code(code_snippet="x", language="python")
+        projects = await client.list_projects()
+
+        assert [r["file_path"] for r in result["results"]] == ["a.py"]
+        assert result["failed_shards"] == ["s1", "s2"]
+        assert [p["id"] for p in projects["projects"]] == ["p0"]
+        assert projects["failed_shards"] == ["s1", "s2"]
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_all_shards_failing_raises(self):
+        """Test an error is raised when no shard answers"""
+        h0, _ = _backend([], [], fail=True)
+        h1, _ = _backend([], [], fail=True)
+        client = _client(h0, h1)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.search_semantic(query="auth")
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_merged_search(self):
+        """Test batch search runs the sharded search per query"""
+        h0, _ = _backend(["p0"], [{"file_path": "a.py", "similarity": 0.8}])
+        h1, _ = _backend(["p1"], [{"file_path": "b.py", "similarity": 0.9}])
+        client = _client(h0, h1)
+
+        results = await client.search_semantic_batch(queries=["one", "two"], top_k=5)
+
+        assert [r["file_path"] for r in results["one"]["results"]] == ["b.py", "a.py"]
+        assert set(results) == {"one", "two"}
+        await client.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
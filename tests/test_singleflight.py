@@ -0,0 +1,101 @@
+"""
+Tests for single-flight request coalescing
+"""
+
+import pytest
+import asyncio
+from src.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        """Test identical concurrent calls run once"""
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": calls}
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+        assert calls == 1
+        assert all(r is results[0] for r in results)
+        assert flight.shared == 4
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_not_shared(self):
+        """Test different keys run independently"""
+        flight = SingleFlight()
+
+        async def fetch_a():
+            return "a"
+
+        async def fetch_b():
+            return "b"
+
+        results = await asyncio.gather(flight.do("a", fetch_a), flight.do("b", fetch_b))
+        assert results == ["a", "b"]
+        assert flight.shared == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        """Test every waiter receives the shared exception"""
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(
+            flight.do("key", fetch), flight.do("key", fetch),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancel_one_waiter_keeps_shared_call(self):
+        """Test cancelling one waiter does not cancel the others"""
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_cancel_last_waiter_cancels_call(self):
+        """Test the shared call is cancelled once nobody waits for it"""
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert flight.in_flight() == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,75 @@
+"""
+Tests for incremental JSON parsing of streamed responses
+"""
+
+import pytest
+import json
+from src.streaming import iter_json_array
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _collect(chunks, key="results"):
+    return [item async for item in iter_json_array(chunks, key=key)]
+
+
+class TestIterJsonArray:
+    """Tests for iter_json_array"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    async def test_items_across_chunk_boundaries(self, chunk_size):
+        """Test items split across chunks are parsed intact"""
+        payload = {
+            "query": "results",
+            "results": [
+                {"file_path": "a.py", "content": "def a(): return [1, 2]", "similarity": 0.9},
+                {"file_path": "한글.py", "content": "x = '}]'", "similarity": 0.8}
+            ],
+            "total": 2
+        }
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+        items = await _collect(_chunks(data, chunk_size))
+
+        assert items == payload["results"]
+
+    @pytest.mark.asyncio
+    async def test_yields_before_body_complete(self):
+        """Test first item is available before the rest of the body arrives"""
+        received = []
+
+        async def slow_chunks():
+            yield b'{"results": [{"file_path": "a.py"}, '
+            received.append("first chunk consumed")
+            yield b'{"file_path": "b.py"}]}'
+
+        stream = iter_json_array(slow_chunks())
+        first = await stream.__anext__()
+
+        assert first == {"file_path": "a.py"}
+        assert received == []
+        assert [item async for item in stream] == [{"file_path": "b.py"}]
+
+    @pytest.mark.asyncio
+    async def test_missing_key_yields_nothing(self):
+        """Test responses without the array yield no items"""
+        assert await _collect(_chunks(b'{"error": "none"}', 3)) == []
+
+    @pytest.mark.asyncio
+    async def test_empty_array(self):
+        """Test empty arrays"""
+        assert await _collect(_chunks(b'{"results": []}', 5)) == []
+
+    @pytest.mark.asyncio
+    async def test_truncated_body_raises(self):
+        """Test truncated responses raise instead of silently dropping items"""
+        with pytest.raises(ValueError):
+            await _collect(_chunks(b'{"results": [{"file_path": "a.py"}, {"file', 4))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
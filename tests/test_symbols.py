@@ -0,0 +1,147 @@
+"""
+Tests for the local symbol index
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.symbols import SymbolIndex
+
+
+def _chunk(name, file_path="a.py", project_id="p1", chunk_id=None, **extra):
+    chunk = {
+        "name": name,
+        "chunk_type": "function",
+        "file_path": file_path,
+        "line_start": 1,
+        "line_end": 3,
+        "content": f"def {name}(): pass",
+        "project_id": project_id
+    }
+    if chunk_id:
+        chunk["chunk_id"] = chunk_id
+    chunk.update(extra)
+    return chunk
+
+
+class TestSymbolIndex:
+    """Tests for SymbolIndex"""
+
+    def test_exact_and_case_insensitive_lookup(self):
+        """Test exact vs case-insensitive lookup"""
+        index = SymbolIndex()
+        index.observe([_chunk("getUser"), _chunk("getuser", file_path="b.py")])
+
+        assert [e["file_path"] for e in index.lookup("getUser")] == ["a.py"]
+        assert len(index.lookup("GETUSER", case_insensitive=True)) == 2
+        assert index.lookup("GETUSER") == []
+
+    def test_filters_by_class_and_project(self):
+        """Test class_name and project_id filters"""
+        index = SymbolIndex()
+        index.observe([
+            _chunk("save", class_name="User"),
+            _chunk("save", class_name="Order", file_path="o.py"),
+            _chunk("save", project_id="p2", file_path="p2.py")
+        ])
+
+        assert [e["file_path"] for e in index.lookup("save", class_name="Order")] == ["o.py"]
+        assert len(index.lookup("save", project_id="p1")) == 2
+
+    def test_prefix_lookup(self):
+        """Test prefix search is sorted and case-insensitive"""
+        index = SymbolIndex()
+        index.observe([_chunk(n, chunk_id=n) for n in ["getUser", "getOrder", "setUser", "GetAll"]])
+
+        assert index.prefix("get") == ["GetAll", "getOrder", "getUser"]
+        assert index.prefix("get", limit=1) == ["GetAll"]
+        assert index.prefix("zzz") == []
+
+    def test_same_chunk_replaced(self):
+        """Test re-observing a chunk updates instead of duplicating"""
+        index = SymbolIndex()
+        index.observe([_chunk("run", chunk_id="c1")])
+        index.observe([_chunk("run", chunk_id="c1", line_start=10)])
+
+        assert len(index) == 1
+        assert index.lookup("run")[0]["line_start"] == 10
+
+    def test_version_change_invalidates_project(self):
+        """Test re-indexed projects drop their symbols"""
+        index = SymbolIndex()
+        index.sync_versions([{"id": "p1", "indexed_at": "v1"}, {"id": "p2", "indexed_at": "v1"}])
+        index.observe([_chunk("run"), _chunk("run", project_id="p2", file_path="b.py")])
+
+        assert index.sync_versions([{"id": "p1", "indexed_at": "v2"}, {"id": "p2", "indexed_at": "v1"}]) == ["p1"]
+        assert [e["project_id"] for e in index.lookup("run")] == ["p2"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_project(self):
+        """Test project reload pulls symbols from the metadata endpoint"""
+        client = Mock()
+        client.search_by_metadata = AsyncMock(side_effect=lambda filters, top_k: {
+            "results": [_chunk(f"{filters['chunk_type']}_sym", chunk_type=filters["chunk_type"],
+                               chunk_id=filters["chunk_type"])]
+        })
+        index = SymbolIndex()
+        index.observe([_chunk("stale")])
+
+        assert await index.refresh_project(client, "p1") == 3
+        assert index.lookup("stale") == []
+        assert len(index.lookup("class_sym")) == 1
+
+    def test_covers_only_fully_loaded_scopes(self):
+        """Test partially filled scopes are not treated as complete answers"""
+        index = SymbolIndex()
+        index.observe([_chunk("save", class_name="A")], name="save", class_name="A", complete=True)
+        index.observe([_chunk("load", project_id="p2")], project_id="p2", name="load", complete=True)
+
+        assert index.covers("save", class_name="A")
+        assert index.covers("save", class_name="A", project_id="p1")
+        assert not index.covers("save")
+        assert index.covers("load", project_id="p2")
+        assert not index.covers("load")
+
+        # 새 프로젝트가 생기거나 프로젝트가 재인덱싱되면 관련 범위는 더 이상 완전하지 않음
+        index.sync_versions([{"id": "p1", "indexed_at": "v1"}])
+        assert not index.covers("save", class_name="A")
+        index.sync_versions([{"id": "p2", "indexed_at": "v1"}])
+        assert index.covers("load", project_id="p2")
+        index.invalidate_project("p2")
+        assert not index.covers("load", project_id="p2")
+
+    @pytest.mark.asyncio
+    async def test_refresh_project_capped_not_complete(self):
+        """Test a project reload that hit top_k does not claim every symbol"""
+        client = Mock()
+        client.search_by_metadata = AsyncMock(side_effect=lambda filters, top_k: {
+            "results": [_chunk(f"{filters['chunk_type']}_{i}", chunk_type=filters["chunk_type"],
+                               chunk_id=f"{filters['chunk_type']}_{i}") for i in range(2)]
+        })
+        index = SymbolIndex()
+
+        await index.refresh_project(client, "p1", top_k=2)
+        assert not index.covers("anything", project_id="p1")
+        await index.refresh_project(client, "p1", top_k=5)
+        assert index.covers("anything", project_id="p1")
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test snapshot persistence"""
+        path = tmp_path / "symbols" / "index.json"
+        index = SymbolIndex(snapshot_path=str(path))
+        index.sync_versions([{"id": "p1", "indexed_at": "v1"}])
+        index.observe([_chunk("run")], name="run", complete=True)
+        index.save()
+
+        restored = SymbolIndex(snapshot_path=str(path))
+        assert restored.load() == 1
+        assert restored.lookup("run")[0]["content"] == "def run(): pass"
+        assert restored.versions == {"p1": "v1"}
+        assert restored.covers("run")
+
+    def test_missing_snapshot(self, tmp_path):
+        """Test loading without a snapshot is a no-op"""
+        assert SymbolIndex(snapshot_path=str(tmp_path / "none.json")).load() == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])